@@ -0,0 +1,329 @@
+"""
+Admission control for Abhishek Ambi's Portfolio Chatbot
+Token-bucket rate limiting per client and for the whole server, with a
+bounded wait queue, so one noisy client cannot spend the shared model quota.
+"""
+
+import asyncio
+import hashlib
+import ipaddress
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, NamedTuple, Optional, Set, Tuple
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations.
+
+    Reserving may take the bucket below zero; the deficit is the time the
+    caller has to wait before its request may run, which is what lets
+    requests queue instead of being rejected outright.
+    """
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+            now: Current time
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float):
+        """Add the tokens earned since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, cost: float, now: float) -> float:
+        """Seconds until ``cost`` tokens would be available (inf if it exceeds the capacity)."""
+        if cost > self.capacity:
+            return math.inf
+        self.refill(now)
+        return max(0.0, (cost - self.tokens) / self.rate)
+
+    def reserve(self, cost: float, now: float):
+        """Take ``cost`` tokens, possibly going into deficit."""
+        self.refill(now)
+        self.tokens -= cost
+
+
+class ClientIdentifier:
+    """
+    Works out which client a request is rate limited as.
+
+    Only API keys from the configured set identify a client; any other
+    X-API-Key value is ignored, so rotating made-up keys cannot buy fresh
+    buckets. X-Forwarded-For is only read when the connecting peer is a
+    configured trusted proxy, and then the nearest address that is not
+    itself a trusted proxy is used, so clients cannot spoof the header.
+    """
+
+    def __init__(self, api_keys: Iterable[str] = (), trusted_proxies: Iterable[str] = ()):
+        """
+        Initialize the identifier.
+
+        Args:
+            api_keys: API keys accepted as client identities (only their hashes are kept)
+            trusted_proxies: Addresses or networks (CIDR) of the reverse proxies in front of the server
+        """
+        self._key_hashes: Set[str] = {self._hash(key) for key in api_keys if key}
+        self._proxies = [ipaddress.ip_network(proxy, strict=False) for proxy in trusted_proxies if proxy]
+
+    @staticmethod
+    def _hash(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+    def is_trusted_proxy(self, address: Optional[str]) -> bool:
+        try:
+            ip = ipaddress.ip_address((address or '').strip())
+        except ValueError:
+            return False
+        return any(ip in network for network in self._proxies)
+
+    def identify(self, api_key: Optional[str], forwarded_for: Optional[str], remote_addr: Optional[str]) -> str:
+        """
+        Identify the client a request is rate limited as.
+
+        Args:
+            api_key: Value of the X-API-Key header, if any
+            forwarded_for: Value of the X-Forwarded-For header, if any
+            remote_addr: Address of the connecting peer
+
+        Returns:
+            'key:<hash>' for holders of a configured API key (the key itself
+            is never stored), else 'ip:<address>'
+        """
+        if api_key:
+            key_hash = self._hash(api_key)
+            if key_hash in self._key_hashes:
+                return 'key:' + key_hash
+
+        address = remote_addr
+        if forwarded_for and self.is_trusted_proxy(remote_addr):
+            # Walk back from our side of the chain past the trusted proxies
+            for hop in reversed([hop.strip() for hop in forwarded_for.split(',') if hop.strip()]):
+                address = hop
+                if not self.is_trusted_proxy(hop):
+                    break
+        return 'ip:' + (address or 'unknown')
+
+
+class ClientUsage:
+    """Token bucket and counters for one client."""
+
+    __slots__ = ('bucket', 'admitted', 'queued', 'rejected', 'last_seen')
+
+    def __init__(self, bucket: TokenBucket, now: float):
+        self.bucket = bucket
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.last_seen = now
+
+
+class Admission(NamedTuple):
+    """Outcome of an admission check."""
+    admitted: bool
+    wait: float         # seconds the admitted request must wait first
+    retry_after: float  # seconds a rejected client should wait before retrying
+
+
+class AdmissionController:
+    """
+    Thread-safe per-client and global rate limiter with a bounded queue.
+
+    A request needs a token from its client's bucket and from the global
+    bucket. If either is empty the request waits for the later of the two,
+    as long as the wait is short enough and fewer than ``max_queue_depth``
+    requests are already waiting; otherwise it is rejected with the number
+    of seconds after which a retry would succeed.
+    """
+
+    def __init__(self, client_rate: float = 10 / 60, client_burst: float = 5,
+                 global_rate: float = 1.0, global_burst: float = 20,
+                 max_queue_depth: int = 32, max_queue_wait: float = 10.0,
+                 max_clients: int = 10000):
+        """
+        Initialize the controller.
+
+        Args:
+            client_rate: Requests per second allowed per client
+            client_burst: Requests a client may send at once
+            global_rate: Requests per second allowed across all clients
+            global_burst: Requests the server accepts at once
+            max_queue_depth: Maximum number of requests waiting for a token
+            max_queue_wait: Longest wait (seconds) before a request is rejected instead
+            max_clients: Clients tracked before the least recently seen is dropped
+        """
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_queue_depth = max_queue_depth
+        self.max_queue_wait = max_queue_wait
+        self.max_clients = max_clients
+
+        now = time.time()
+        self.global_bucket = TokenBucket(global_rate, global_burst, now)
+        self._clients: "OrderedDict[str, ClientUsage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.queue_depth = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    @property
+    def max_cost(self) -> float:
+        """Largest request cost that can ever be admitted (the smaller of the two burst sizes)."""
+        return min(self.client_burst, self.global_bucket.capacity)
+
+    def split_rates(self, parts: int):
+        """
+        Divide the per-client and global rates between ``parts`` worker processes.
+
+        Each worker enforces its share, so the server as a whole keeps
+        roughly the configured rates. Burst sizes are kept, so a request
+        that fits the limits of one process still fits each worker.
+        """
+        with self._lock:
+            self.client_rate /= parts
+            self.global_bucket.rate /= parts
+            for usage in self._clients.values():
+                usage.bucket.rate /= parts
+
+    def _client(self, client_id: str, now: float) -> ClientUsage:
+        """Get or create a client's record, dropping the least recently seen (lock must be held)."""
+        usage = self._clients.get(client_id)
+        if usage is None:
+            usage = ClientUsage(TokenBucket(self.client_rate, self.client_burst, now), now)
+            self._clients[client_id] = usage
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(client_id)
+        usage.last_seen = now
+        return usage
+
+    def check(self, client_id: str, cost: float = 1) -> Admission:
+        """
+        Reserve tokens for a request, or reject it.
+
+        An admitted request with ``wait > 0`` counts towards the queue
+        depth until ``dequeue`` is called; ``admit`` and ``admit_async``
+        do that automatically.
+
+        Args:
+            client_id: Identity of the caller (IP address or API key)
+            cost: Tokens the request uses (e.g. the number of questions in a batch)
+
+        Returns:
+            The admission outcome
+        """
+        now = time.time()
+        with self._lock:
+            client = self._client(client_id, now)
+            wait = max(client.bucket.wait_for(cost, now), self.global_bucket.wait_for(cost, now))
+
+            if wait > self.max_queue_wait or (wait > 0 and self.queue_depth >= self.max_queue_depth):
+                client.rejected += 1
+                self.rejected += 1
+                retry_after = wait if math.isfinite(wait) else cost / self.client_rate
+                return Admission(False, 0.0, max(1.0, retry_after))
+
+            client.bucket.reserve(cost, now)
+            self.global_bucket.reserve(cost, now)
+            client.admitted += 1
+            self.admitted += 1
+            if wait > 0:
+                client.queued += 1
+                self.queued += 1
+                self.queue_depth += 1
+            return Admission(True, wait, 0.0)
+
+    def dequeue(self):
+        """Mark a queued request as done waiting."""
+        with self._lock:
+            self.queue_depth -= 1
+
+    def admit(self, client_id: str, cost: float = 1) -> Tuple[bool, float]:
+        """
+        Admit a request, sleeping through its queue wait.
+
+        Args:
+            client_id: Identity of the caller
+            cost: Tokens the request uses
+
+        Returns:
+            (admitted, seconds a rejected client should wait before retrying)
+        """
+        admission = self.check(client_id, cost)
+        if admission.wait > 0:
+            try:
+                time.sleep(admission.wait)
+            finally:
+                self.dequeue()
+        return admission.admitted, admission.retry_after
+
+    async def admit_async(self, client_id: str, cost: float = 1) -> Tuple[bool, float]:
+        """Async counterpart of ``admit`` (waits without blocking the event loop)."""
+        admission = self.check(client_id, cost)
+        if admission.wait > 0:
+            try:
+                await asyncio.sleep(admission.wait)
+            finally:
+                self.dequeue()
+        return admission.admitted, admission.retry_after
+
+    def stats(self, top: Optional[int] = 50) -> Dict[str, Any]:
+        """
+        Get admission statistics.
+
+        Args:
+            top: Number of most active clients to include (None for all)
+
+        Returns:
+            Limits, global counters and per-client usage
+        """
+        now = time.time()
+        with self._lock:
+            clients = sorted(self._clients.items(), key=lambda item: item[1].admitted + item[1].rejected,
+                             reverse=True)
+            if top is not None:
+                clients = clients[:top]
+
+            per_client = {}
+            for client_id, usage in clients:
+                usage.bucket.refill(now)
+                per_client[client_id] = {
+                    'admitted': usage.admitted,
+                    'queued': usage.queued,
+                    'rejected': usage.rejected,
+                    'tokens_available': round(usage.bucket.tokens, 2),
+                    'idle_seconds': round(now - usage.last_seen, 1)
+                }
+
+            self.global_bucket.refill(now)
+            return {
+                'limits': {
+                    'client_requests_per_minute': round(self.client_rate * 60, 2),
+                    'client_burst': self.client_burst,
+                    'global_requests_per_minute': round(self.global_bucket.rate * 60, 2),
+                    'global_burst': self.global_bucket.capacity,
+                    'max_queue_depth': self.max_queue_depth,
+                    'max_queue_wait_seconds': self.max_queue_wait
+                },
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected': self.rejected,
+                'queue_depth': self.queue_depth,
+                'global_tokens_available': round(self.global_bucket.tokens, 2),
+                'tracked_clients': len(self._clients),
+                'clients': per_client
+            }
@@ -0,0 +1,199 @@
+"""
+Answer caching for Abhishek Ambi's Portfolio Chatbot
+Keeps recently generated answers in memory so repeated and reworded
+questions never have to reach the upstream model.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, FrozenSet, Hashable, Optional, Tuple
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+# Filler words that carry no meaning for matching reworded questions
+_STOPWORDS = frozenset([
+    'a', 'about', 'all', 'an', 'and', 'are', 'can', 'could', 'do', 'does', 'for',
+    'give', 'has', 'have', 'he', 'his', 'i', 'is', 'me', 'my', 'of', 'on', 'please',
+    'share', 'show', 'some', 'tell', 'the', 'to', 'us', 'what', 'which', 'you', 'your'
+])
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question so trivially different spellings share a cache entry.
+
+    Args:
+        question: The raw user question
+
+    Returns:
+        Lowercased question with collapsed whitespace and no trailing punctuation
+    """
+    normalized = _WHITESPACE_RE.sub(" ", question.strip().lower())
+    return normalized.rstrip("?!. ")
+
+
+class AnswerCache:
+    """
+    Thread-safe exact-match answer cache with LRU eviction and a TTL.
+
+    Entries are keyed on the normalized question plus the model that
+    produced the answer.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 3600):
+        """
+        Initialize the answer cache.
+
+        Args:
+            max_size: Maximum number of answers to keep (0 disables the cache)
+            ttl: Seconds an answer stays valid (0 or less means no expiry)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _key(self, question: str) -> Optional[Hashable]:
+        """The part of the cache key taken from the question (None means it cannot be cached)."""
+        return normalize_question(question)
+
+    def get(self, question: str, model: str) -> Optional[str]:
+        """
+        Look up a cached answer.
+
+        Args:
+            question: The user's question
+            model: The model the answer must have come from
+
+        Returns:
+            The cached answer, or None on a miss
+        """
+        if self.max_size <= 0:
+            return None
+
+        key = (self._key(question), model)
+        with self._lock:
+            entry = self._entries.get(key) if key[0] is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            answer, stored_at = entry
+            if self.ttl > 0 and time.time() - stored_at >= self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer
+
+    def set(self, question: str, model: str, answer: str, stored_at: Optional[float] = None):
+        """
+        Store an answer, evicting the least recently used entry if full.
+
+        Args:
+            question: The user's question
+            model: The model that produced the answer
+            answer: The answer text
+            stored_at: When the answer was produced (defaults to now; used when reloading answers)
+        """
+        if self.max_size <= 0:
+            return
+
+        key = (self._key(question), model)
+        if key[0] is None:
+            return
+        with self._lock:
+            self._entries[key] = (answer, stored_at or time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove every cached answer (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Size, limits and hit/miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def content_words(question: str) -> FrozenSet[str]:
+    """
+    Get the words of a question that carry its meaning.
+
+    Filler words are dropped and plurals are folded ("skills" -> "skill"),
+    so word order, filler and plural forms do not matter.
+
+    Args:
+        question: The user's question
+
+    Returns:
+        The question's content words
+    """
+    words = set()
+    for word in _WORD_RE.findall(question.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        words.add(word)
+    return frozenset(words)
+
+
+class RewordedAnswerCache(AnswerCache):
+    """
+    Answer cache for reworded questions, keyed on their content words.
+
+    A question is answered from an entry with exactly the same content
+    words, so filler words, word order and plurals do not matter: "What
+    are your technical skills?" and "Tell me his technical skills" share
+    an answer. Nothing looser is matched, so "Does he know React?" never
+    gets the answer to "Does he know React Native?", and paraphrases with
+    different words ("what tech do you know" and "list your skills") go to
+    the model. Questions made only of filler words are not cached.
+    """
+
+    def __init__(self, max_size: int = 512, ttl: float = 3600):
+        """
+        Initialize the reworded-question cache.
+
+        Args:
+            max_size: Maximum number of answers to keep (0 disables the cache)
+            ttl: Seconds an answer stays valid (0 or less means no expiry)
+        """
+        super().__init__(max_size=max_size, ttl=ttl)
+
+    def _key(self, question: str) -> Optional[FrozenSet[str]]:
+        return content_words(question) or None
@@ -4,13 +4,21 @@ Simple Chatbot API for Abhishek Ambi's Portfolio
 A simple Flask API that takes a question and returns an answer.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, g, stream_with_context
 from flask_cors import CORS
-from portfolio_chatbot import PortfolioChatbot
+from chatbot_common import AnswerTimeout, STREAM_RESET, UpstreamError
+from admission import AdmissionController, ClientIdentifier
+from keyword_matcher import KeywordMatcher
+from static_answers import PrecomputedResponses
+import metrics
+import tracing
 import os
+import json
 from dotenv import load_dotenv
 import re
 import time
+import math
+import threading
 
 # Load environment variables
 load_dotenv()
@@ -267,19 +275,21 @@ Each project demonstrates different technical skills and problem-solving abiliti
 Feel free to ask me anything about Abhishek's portfolio, hobbies, or career!"""
             }
         }
+        
+        # All category keywords compiled into one matcher; generic question
+        # words count for less than topic words
+        self.matcher = KeywordMatcher(
+            {category: data['keywords'] for category, data in self.knowledge_base.items()
+             if category != 'default'},
+            weights={'about': 0.5, 'who': 0.5}
+        )
     
     def ask(self, question):
         """Provide intelligent response based on question content."""
-        question_lower = question.lower()
-        
-        # Check each knowledge category
-        for category, data in self.knowledge_base.items():
-            if category == 'default':
-                continue
-                
-            for keyword in data['keywords']:
-                if keyword in question_lower:
-                    return data['response']
+        # Best scoring category, plus any runner-up that scores nearly as well
+        categories = self.matcher.match(question)
+        if categories:
+            return "\n\n".join(self.knowledge_base[category]['response'] for category in categories)
         
         # Handle unknown topics gracefully
         return self._handle_unknown_topic(question)
@@ -387,15 +397,48 @@ I don't have specific information about that topic, but based on Abhishek's back
 
 Feel free to ask me about his professional background, projects, skills, or career opportunities!"""
 
-# Initialize chatbot
-try:
-    chatbot = PortfolioChatbot(debug=False)
-    chatbot_available = True
-    print("✅ Chatbot initialized successfully!")
-except Exception as e:
-    print(f"❌ Failed to initialize chatbot: {e}")
-    chatbot_available = False
-    print("🔄 Using fallback response system...")
+# The AI chatbot (LangChain, Groq client, prompt, caches) loads in the
+# background; until it is ready every route answers from the fallback
+chatbot = None
+chatbot_available = False
+chatbot_status = 'loading'
+
+def load_chatbot(prewarm=True):
+    """Import and build the AI chatbot, then switch the routes over to it."""
+    global chatbot, chatbot_available, chatbot_status
+    started = time.time()
+    try:
+        if not os.getenv('GROQ_API_KEY') and os.getenv('LLM_BACKEND', '').lower() != 'fake':
+            # Skip the heavy imports entirely when the chatbot cannot start
+            raise ValueError("API key not found. Please set GROQ_API_KEY environment variable or pass it directly.")
+        
+        from portfolio_chatbot import PortfolioChatbot
+        
+        chatbot = PortfolioChatbot(
+            debug=False,
+            prewarm=prewarm,
+            hedge_percentile=float(os.getenv('HEDGE_PERCENTILE')) if os.getenv('HEDGE_PERCENTILE') else None,
+            hedge_max_fraction=float(os.getenv('HEDGE_MAX_FRACTION', 0.1)),
+            store_path=os.getenv('CHATBOT_STORE_PATH', 'chatbot_state.db') or None,
+            store_max_entries=int(os.getenv('CHATBOT_STORE_MAX_ENTRIES', 2000)),
+            max_sessions=int(os.getenv('MAX_SESSIONS', 10000)),
+            session_idle_timeout=float(os.getenv('SESSION_IDLE_TIMEOUT', 1800)),
+            history_token_budget=int(os.getenv('HISTORY_TOKEN_BUDGET', 600)),
+            request_threads=int(os.getenv('WEB_THREADS', 64)),
+            use_retrieval=os.getenv('KNOWLEDGE_RETRIEVAL', '1').lower() in ('1', 'true', 'yes')
+        )
+        chatbot_available = True
+        chatbot_status = 'ready'
+        print(f"✅ Chatbot initialized successfully in {time.time() - started:.1f}s!")
+    except Exception as e:
+        print(f"❌ Failed to initialize chatbot: {e}")
+        chatbot_status = 'failed'
+        print("🔄 Using fallback response system...")
+
+chatbot_loader = threading.Thread(target=load_chatbot, name="chatbot-loader", daemon=True)
+# serve.py loads the chatbot itself, once, before forking its workers
+if os.getenv('CHATBOT_PRELOAD') != '1':
+    chatbot_loader.start()
 
 # Initialize fallback chatbot
 fallback_chatbot = FallbackChatbot()
@@ -403,6 +446,134 @@ fallback_chatbot = FallbackChatbot()
 # Server start time for uptime tracking
 server_start_time = time.time()
 
+# Per-client and global rate limits for the routes that spend model quota
+admission = AdmissionController(
+    client_rate=float(os.getenv('RATE_LIMIT_PER_CLIENT', 10)) / 60,
+    client_burst=float(os.getenv('RATE_LIMIT_CLIENT_BURST', 5)),
+    global_rate=float(os.getenv('RATE_LIMIT_GLOBAL', 60)) / 60,
+    global_burst=float(os.getenv('RATE_LIMIT_GLOBAL_BURST', 20)),
+    max_queue_depth=int(os.getenv('ADMISSION_QUEUE_DEPTH', 32)),
+    max_queue_wait=float(os.getenv('ADMISSION_MAX_WAIT', 10))
+)
+RATE_LIMITED_ENDPOINTS = {'ask_question', 'ask_batch', 'ask_question_stream'}
+
+def env_list(name):
+    """Read a comma separated environment variable as a list of non-empty values."""
+    return [value.strip() for value in os.getenv(name, '').split(',') if value.strip()]
+
+# Clients are told apart by a configured API key, else by address; X-Forwarded-For
+# is only believed when the request comes through one of the trusted proxies
+client_identifier = ClientIdentifier(api_keys=env_list('API_KEYS'),
+                                     trusted_proxies=env_list('TRUSTED_PROXIES'))
+
+def request_cost():
+    """Rate limit tokens a request uses: one per question, so a batch costs its size."""
+    if request.endpoint == 'ask_batch':
+        data = request.get_json(silent=True)
+        questions = data.get('questions') if isinstance(data, dict) else None
+        if isinstance(questions, list) and questions:
+            return len(questions)
+    return 1
+
+def rate_limit_payload(retry_after):
+    """Build the JSON body returned when a client is over its rate limit."""
+    return {
+        'error': 'Too many requests, please slow down',
+        'status': 'error',
+        'retry_after_seconds': math.ceil(retry_after)
+    }
+
+def metrics_route():
+    """Route template of the current request (bounded label values, unlike raw paths)."""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+@app.before_request
+def start_request_metrics():
+    """Start timing the request and count it as in flight (runs before the rate limits)."""
+    g.metrics_started = time.perf_counter()
+    g.metrics_route = metrics_route()
+    metrics.REQUESTS_IN_FLIGHT.inc(g.metrics_route)
+
+@app.after_request
+def record_request_metrics(response):
+    """Record the request's latency by route, status and response source."""
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, g.metrics_route,
+                                        str(response.status_code), g.get('response_source', 'none'))
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    """Stop counting the request as in flight."""
+    route = g.pop('metrics_route', None)
+    if route is not None:
+        metrics.REQUESTS_IN_FLIGHT.dec(route)
+
+# Structured trace records for requests at least TRACE_LOG_MIN_MS long (TRACE_LOG=1 enables them)
+TRACE_LOG = os.getenv('TRACE_LOG', '').lower() in ('1', 'true', 'yes')
+TRACE_LOG_MIN_MS = float(os.getenv('TRACE_LOG_MIN_MS', 0))
+
+def log_trace(trace, **fields):
+    """Log a finished request's trace record, if trace logging is on and the request was slow enough."""
+    if TRACE_LOG and trace.elapsed() * 1000 >= TRACE_LOG_MIN_MS:
+        tracing.log_record(trace.record(**fields))
+
+@app.before_request
+def start_request_trace():
+    """Start collecting the request's stage timings."""
+    g.trace_token = tracing.start_trace(g.metrics_route)
+
+@app.after_request
+def finish_request_trace(response):
+    """Send the stage timings as a Server-Timing header (and log them if enabled)."""
+    trace = tracing.current_trace()
+    if trace is not None:
+        response.headers['Server-Timing'] = trace.server_timing()
+        log_trace(trace, method=request.method, status=response.status_code,
+                  response_source=g.get('response_source'))
+    return response
+
+@app.teardown_request
+def end_request_trace(error=None):
+    """Stop collecting stage timings for the request."""
+    token = g.pop('trace_token', None)
+    if token is not None:
+        tracing.end_trace(token)
+
+@app.before_request
+def apply_rate_limits():
+    """
+    Queue or reject requests to the question routes that exceed the rate limits.
+    
+    Runs before the body is validated, so a request later rejected with 400
+    still spends its client's tokens; invalid requests are not free.
+    """
+    if request.endpoint not in RATE_LIMITED_ENDPOINTS or request.method == 'OPTIONS':
+        return None
+    
+    cost = request_cost()
+    if cost > admission.max_cost:
+        # It could never be admitted, so a 429 with a Retry-After would be a lie
+        return jsonify({
+            'error': f'At most {admission.max_cost:g} questions fit within the rate limits per request',
+            'status': 'error'
+        }), 400
+    
+    client = client_identifier.identify(request.headers.get('X-API-Key'),
+                                        request.headers.get('X-Forwarded-For'),
+                                        request.remote_addr)
+    with tracing.span('admission'):
+        admitted, retry_after = admission.admit(client, cost)
+    if admitted:
+        return None
+    
+    metrics.RATE_LIMITED.inc(g.metrics_route)
+    response = jsonify(rate_limit_payload(retry_after))
+    response.status_code = 429
+    response.headers['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
 @app.route('/')
 def home():
     """Home endpoint with simple API documentation."""
@@ -423,43 +594,192 @@ def home():
         }
     })
 
+# Seconds /ask waits for the AI answer before answering from the fallback
+# engine (REQUEST_DEADLINE=0 waits indefinitely); requests may override it
+DEFAULT_DEADLINE = float(os.getenv('REQUEST_DEADLINE', 25)) or None
+MAX_DEADLINE = float(os.getenv('MAX_REQUEST_DEADLINE', 120))
+
+def request_deadline(data):
+    """
+    Read the per-request deadline override, falling back to the server default.
+    
+    Returns:
+        (deadline in seconds or None, error message or None)
+    """
+    deadline = data.get('deadline', DEFAULT_DEADLINE)
+    if deadline is None:
+        return None, None
+    if isinstance(deadline, bool) or not isinstance(deadline, (int, float)) or not 0 < deadline <= MAX_DEADLINE:
+        return None, f'deadline must be a number of seconds greater than 0 and at most {MAX_DEADLINE:g}'
+    return float(deadline), None
+
+# Longest session id accepted on /ask
+MAX_SESSION_ID_LENGTH = 128
+
+def request_session(data):
+    """
+    Read the optional conversation session id.
+    
+    Returns:
+        (session id or None, error message or None)
+    """
+    session_id = data.get('session_id')
+    if session_id is None:
+        return None, None
+    if not isinstance(session_id, str) or not 0 < len(session_id) <= MAX_SESSION_ID_LENGTH:
+        return None, f'session_id must be a string of 1 to {MAX_SESSION_ID_LENGTH} characters'
+    return session_id, None
+
+def request_question(value):
+    """
+    Validate a question taken from a request body.
+    
+    Returns:
+        (stripped question or None, error message or None)
+    """
+    if not isinstance(value, str):
+        return None, 'Question must be a string'
+    question = value.strip()
+    if not question:
+        return None, 'Question cannot be empty'
+    return question, None
+
+def answer_payload(question, answer, response_source, session_id=None):
+    """Build the JSON body returned for a successfully answered question."""
+    payload = {
+        'question': question,
+        'answer': answer,
+        'status': 'success',
+        'response_source': response_source,
+        'chatbot_available': chatbot_available
+    }
+    if session_id is not None:
+        payload['session_id'] = session_id
+    return payload
+
 @app.route('/ask', methods=['POST'])
 def ask_question():
     """
     Ask a question and get an answer.
     
     POST /ask
-    Body: {"question": "Your question here"}
+    Body: {"question": "Your question here", "deadline": 10, "session_id": "optional-conversation-id"}
+    
+    With a session_id, follow-up questions are answered in the context of
+    the earlier questions of that session.
+    """
+    try:
+        with tracing.span('parse'):
+            # Get JSON data from request
+            data = request.get_json(silent=True)
+            
+            if not data or not isinstance(data, dict):
+                return jsonify({
+                    'error': 'No JSON data provided',
+                    'status': 'error'
+                }), 400
+            
+            question, error = request_question(data.get('question', ''))
+            if not error:
+                deadline, error = request_deadline(data)
+            if not error:
+                session_id, error = request_session(data)
+            if error:
+                return jsonify({
+                    'error': error,
+                    'status': 'error'
+                }), 400
+        
+        # Get response from appropriate chatbot
+        if chatbot_available:
+            try:
+                with tracing.span('answer'):
+                    answer = chatbot.ask(question, timeout=deadline, session_id=session_id)
+                response_source = "AI-powered"
+            except AnswerTimeout:
+                with tracing.span('fallback'):
+                    answer = chatbot.record_turn(session_id, question, fallback_chatbot.ask(question))
+                response_source = "fallback-timeout"
+        else:
+            with tracing.span('fallback'):
+                answer = fallback_chatbot.ask(question)
+            response_source = "fallback"
+        
+        g.response_source = response_source
+        with tracing.span('serialize'):
+            return jsonify(answer_payload(question, answer, response_source, session_id))
+    
+    except Exception as e:
+        return jsonify({
+            'error': f'An error occurred: {str(e)}',
+            'status': 'error'
+        }), 500
+
+# Maximum number of questions accepted by /ask/batch in one request
+MAX_BATCH_SIZE = 50
+
+@app.route('/ask/batch', methods=['POST'])
+def ask_batch():
+    """
+    Ask several questions in one request.
+    
+    POST /ask/batch
+    Body: {"questions": ["First question", "Second question"], "max_concurrency": 4}
     """
     try:
-        # Get JSON data from request
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
-        if not data:
+        if not data or not isinstance(data, dict):
             return jsonify({
                 'error': 'No JSON data provided',
                 'status': 'error'
             }), 400
         
-        question = data.get('question', '').strip()
+        questions = data.get('questions')
         
-        if not question:
+        if not isinstance(questions, list) or not questions:
             return jsonify({
-                'error': 'Question cannot be empty',
+                'error': 'questions must be a non-empty list',
                 'status': 'error'
             }), 400
         
-        # Get response from appropriate chatbot
+        if len(questions) > MAX_BATCH_SIZE:
+            return jsonify({
+                'error': f'At most {MAX_BATCH_SIZE} questions are allowed per batch',
+                'status': 'error'
+            }), 400
+        
+        checked = [request_question(question) for question in questions]
+        errors = [f'questions[{index}]: {error}' for index, (_, error) in enumerate(checked) if error]
+        if errors:
+            return jsonify({
+                'error': '; '.join(errors),
+                'status': 'error'
+            }), 400
+        questions = [question for question, _ in checked]
+        
+        max_concurrency = data.get('max_concurrency', 4)
+        if isinstance(max_concurrency, bool) or not isinstance(max_concurrency, int) or max_concurrency < 1:
+            return jsonify({
+                'error': 'max_concurrency must be a positive integer',
+                'status': 'error'
+            }), 400
+        
+        # Get responses from appropriate chatbot
         if chatbot_available:
-            answer = chatbot.ask(question)
+            # Each batch runs its own upstream calls, so one request may not
+            # ask for more of them than the server has request threads
+            max_concurrency = min(max_concurrency, chatbot.request_threads)
+            results = chatbot.ask_many(questions, max_concurrency=max_concurrency)
             response_source = "AI-powered"
         else:
-            answer = fallback_chatbot.ask(question)
+            results = [{'question': question, 'answer': fallback_chatbot.ask(question), 'status': 'success'}
+                       for question in questions]
             response_source = "fallback"
         
+        g.response_source = response_source
         return jsonify({
-            'question': question,
-            'answer': answer,
+            'results': results,
             'status': 'success',
             'response_source': response_source,
             'chatbot_available': chatbot_available
@@ -471,6 +791,176 @@ def ask_question():
             'status': 'error'
         }), 500
 
+def _sse_event(data, event=None):
+    """Format one Server-Sent Event with a JSON payload."""
+    lines = f"event: {event}\n" if event else ""
+    return lines + f"data: {json.dumps(data)}\n\n"
+
+@app.route('/ask/stream', methods=['GET', 'POST'])
+def ask_question_stream():
+    """
+    Ask a question and stream the answer as Server-Sent Events.
+    
+    POST /ask/stream
+    Body: {"question": "Your question here"}
+    GET /ask/stream?question=Your+question+here
+    
+    Events: unnamed events carry {"token": "..."}; "reset" means discard the
+    text received so far; "done" closes a finished answer with its response
+    source; "error" ends a stream that could not be answered.
+    """
+    if request.method == 'POST':
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data, dict):
+            return jsonify({
+                'error': 'No JSON data provided',
+                'status': 'error'
+            }), 400
+        question, error = request_question(data.get('question', ''))
+    else:
+        question, error = request_question(request.args.get('question', ''))
+    
+    if error:
+        return jsonify({
+            'error': error,
+            'status': 'error'
+        }), 400
+    
+    def generate():
+        response_source = "AI-powered" if chatbot_available else "fallback"
+        try:
+            if chatbot_available:
+                try:
+                    for token in chatbot.ask_stream(question):
+                        if token == STREAM_RESET:
+                            yield _sse_event({}, event='reset')
+                        else:
+                            yield _sse_event({'token': token})
+                except UpstreamError:
+                    # Every model failed (any partial answer was already reset)
+                    response_source = "fallback"
+                    yield _sse_event({'token': fallback_chatbot.ask(question)})
+            else:
+                yield _sse_event({'token': fallback_chatbot.ask(question)})
+        except Exception as e:
+            yield _sse_event({'error': f'An error occurred: {str(e)}', 'status': 'error'}, event='error')
+            return
+        
+        yield _sse_event({
+            'status': 'success',
+            'response_source': response_source,
+            'chatbot_available': chatbot_available
+        }, event='done')
+    
+    # The latency metric is taken when the headers go out, before the
+    # answer is known, so it carries the source the stream starts with
+    g.response_source = "AI-powered" if chatbot_available else "fallback"
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+# Cache lifetimes of the precomputed GET answers: fallback answers only
+# change with a new release, canned AI answers with every warm refresh
+FALLBACK_CACHE_CONTROL = 'public, max-age=3600'
+CANNED_CACHE_CONTROL = 'public, max-age=300'
+
+fallback_responses = PrecomputedResponses(
+    lambda category, answer: {
+        'category': category,
+        'answer': answer,
+        'status': 'success',
+        'response_source': 'fallback'
+    },
+    dumps=app.json.dumps
+)
+fallback_responses.build({category: data['response'] for category, data in fallback_chatbot.knowledge_base.items()})
+
+canned_responses = PrecomputedResponses(
+    lambda name, answer: {
+        'name': name,
+        'question': chatbot.warm_answers.prompts[name],
+        'answer': answer,
+        'status': 'success',
+        'response_source': 'AI-powered'
+    },
+    dumps=app.json.dumps
+)
+
+def precomputed_response(entry, cache_control):
+    """Send a precomputed body, compressed as the client prefers, or 304 if its copy is current."""
+    encoding, body = entry.select(request.accept_encodings.quality)
+    headers = {
+        'ETag': entry.etag_for(encoding),
+        'Cache-Control': cache_control,
+        'Vary': 'Accept-Encoding'
+    }
+    if entry.matches(request.headers.get('If-None-Match')):
+        return Response(status=304, headers=headers)
+    
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return Response(body, content_type='application/json', headers=headers)
+
+@app.route('/answers', methods=['GET'])
+def list_answers():
+    """
+    List the answers available over GET.
+    
+    GET /answers
+    """
+    return jsonify({
+        'categories': list(fallback_chatbot.knowledge_base),
+        'canned': list(chatbot.warm_answers.prompts) if chatbot_available else [],
+        'status': 'success'
+    })
+
+@app.route('/answers/<category>', methods=['GET'])
+def category_answer(category):
+    """
+    Get the answer for one fallback category (e.g. projects, skills, contact).
+    
+    GET /answers/<category>
+    """
+    data = fallback_chatbot.knowledge_base.get(category)
+    if data is None:
+        return jsonify({
+            'error': f'Unknown category: {category}',
+            'status': 'error',
+            'categories': list(fallback_chatbot.knowledge_base)
+        }), 404
+    
+    g.response_source = 'fallback'
+    return precomputed_response(fallback_responses.get(category, data['response']), FALLBACK_CACHE_CONTROL)
+
+@app.route('/answers/canned/<name>', methods=['GET'])
+def canned_answer(name):
+    """
+    Get the precomputed AI answer to a canned question (e.g. list_projects, get_skills_summary).
+    
+    GET /answers/canned/<name>
+    """
+    answer = chatbot.get_canned_answer(name) if chatbot_available else None
+    if answer is None:
+        if chatbot_available and name not in chatbot.warm_answers.prompts:
+            return jsonify({
+                'error': f'Unknown canned question: {name}',
+                'status': 'error',
+                'canned': list(chatbot.warm_answers.prompts)
+            }), 404
+        
+        response = jsonify({
+            'error': 'This answer is not ready yet',
+            'status': 'error'
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    
+    g.response_source = 'AI-powered'
+    return precomputed_response(canned_responses.get(name, answer), CANNED_CACHE_CONTROL)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """
@@ -484,10 +974,103 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'chatbot_available': chatbot_available,
+        'chatbot_status': chatbot_status,
         'api_version': '1.0.0',
-        'uptime_seconds': int(uptime)
+        'uptime_seconds': int(uptime),
+        'worker_pid': os.getpid()
+    })
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """
+    Answer cache statistics.
+    
+    GET /cache/stats
+    """
+    if not chatbot_available:
+        return jsonify({
+            'error': 'AI chatbot is not available, no cache in use',
+            'status': 'error'
+        }), 503
+    
+    return jsonify({
+        'status': 'success',
+        'cache': chatbot.get_cache_stats(),
+        'precomputed': {
+            'fallback': fallback_responses.stats(),
+            'canned': canned_responses.stats()
+        }
     })
 
+@app.route('/retrieval/report', methods=['GET'])
+def retrieval_report():
+    """
+    Knowledge retrieval report (average prompt tokens saved per request).
+    
+    GET /retrieval/report
+    """
+    if not chatbot_available:
+        return jsonify({
+            'error': 'AI chatbot is not available, no retrieval in use',
+            'status': 'error'
+        }), 503
+    
+    return jsonify({
+        'status': 'success',
+        'retrieval': chatbot.get_retrieval_report()
+    })
+
+@app.route('/rate-limits/stats', methods=['GET'])
+def rate_limit_stats():
+    """
+    Rate limit and queue statistics, with usage of the most active clients.
+    
+    GET /rate-limits/stats
+    """
+    return jsonify({
+        'status': 'success',
+        'rate_limits': admission.stats()
+    })
+
+@app.route('/models/status', methods=['GET'])
+def models_status():
+    """
+    Model pool status (circuit breaker state, latency and token usage per model).
+    
+    GET /models/status
+    """
+    if not chatbot_available:
+        return jsonify({
+            'error': 'AI chatbot is not available, no models in use',
+            'status': 'error'
+        }), 503
+    
+    return jsonify({
+        'status': 'success',
+        'backend': chatbot.llm_backend,
+        'current_model': chatbot.current_model,
+        'models': chatbot.get_routing_stats(),
+        'usage': chatbot.get_usage_stats(),
+        'hedging': chatbot.get_hedge_stats(),
+        'deadlines': chatbot.get_deadline_stats()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Metrics in the Prometheus text format.
+    
+    GET /metrics
+    """
+    metrics.CHATBOT_READY.set(value=1 if chatbot_available else 0)
+    metrics.ADMISSION_QUEUE_DEPTH.set(value=admission.queue_depth)
+    if chatbot_available:
+        metrics.CONVERSATION_SESSIONS.set(value=len(chatbot.conversations))
+        for model, route in chatbot.get_routing_stats().items():
+            metrics.BREAKER_OPEN.set(model, value=0 if route['state'] == 'closed' else 1)
+    
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
 
 
 
@@ -503,7 +1086,17 @@ def not_found(error):
         'available_endpoints': [
             'GET /',
             'POST /ask',
-            'GET /health'
+            'POST /ask/stream',
+            'POST /ask/batch',
+            'GET /health',
+            'GET /cache/stats',
+            'GET /retrieval/report',
+            'GET /models/status',
+            'GET /rate-limits/stats',
+            'GET /metrics',
+            'GET /answers',
+            'GET /answers/<category>',
+            'GET /answers/canned/<name>'
         ]
     }), 404
 
@@ -526,5 +1119,6 @@ if __name__ == '__main__':
     print("❓ Send POST requests to /ask with your questions")
     print("🛑 Press Ctrl+C to stop the server")
     
-    # Start the Flask application
-    app.run(debug=True, host='0.0.0.0', port=7860) 
+    # Start the Flask application (the debugger and reloader only on request:
+    # the reloader would load the chatbot twice, and the debugger runs code)
+    app.run(debug=os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes'), host='0.0.0.0', port=7860)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Async Server Entry Point for Abhishek Ambi's Portfolio Chatbot
+Serves the existing Flask routes over ASGI and answers POST /ask natively
+with asyncio, so one process can keep hundreds of Groq calls in flight.
+
+Run with:
+    python asgi.py
+    uvicorn asgi:app --host 0.0.0.0 --port 7860
+"""
+
+import json
+import math
+import os
+import time
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as api
+import metrics
+import tracing
+from chatbot_common import AnswerTimeout
+
+# Every route except POST /ask runs in asgiref's thread pool, unchanged
+flask_asgi = WsgiToAsgi(api.app)
+
+
+async def app(scope, receive, send):
+    """ASGI application: native async /ask, everything else via Flask."""
+    if scope['type'] == 'http' and scope['path'] == '/ask' and scope['method'] == 'POST':
+        await instrumented(ask_question, scope, receive, send)
+    else:
+        await flask_asgi(scope, receive, send)
+
+
+async def instrumented(handler, scope, receive, send):
+    """Run a native handler with the same request metrics the Flask routes record."""
+    route = scope['path']
+    result = {'status': 500, 'response_source': 'none'}
+
+    async def send_recording(message):
+        if message['type'] == 'http.response.start':
+            result['status'] = message['status']
+        await send(message)
+
+    started = time.perf_counter()
+    metrics.REQUESTS_IN_FLIGHT.inc(route)
+    token = tracing.start_trace(route)
+    try:
+        result['response_source'] = await handler(scope, receive, send_recording) or 'none'
+    finally:
+        metrics.REQUESTS_IN_FLIGHT.dec(route)
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, route,
+                                        str(result['status']), result['response_source'])
+        api.log_trace(tracing.current_trace(), method=scope['method'], status=result['status'],
+                      response_source=result['response_source'])
+        tracing.end_trace(token)
+
+
+async def ask_question(scope, receive, send):
+    """
+    Ask a question and get an answer without tying up a worker thread.
+
+    POST /ask
+    Body: {"question": "Your question here", "deadline": 10, "session_id": "optional-conversation-id"}
+
+    Returns the response source of an answered question, for the request metrics.
+    """
+    try:
+        headers = {key.decode('latin-1').lower(): value.decode('latin-1')
+                   for key, value in scope.get('headers', [])}
+        client = api.client_identifier.identify(headers.get('x-api-key'), headers.get('x-forwarded-for'),
+                                                (scope.get('client') or [None])[0])
+        with tracing.span('admission'):
+            admitted, retry_after = await api.admission.admit_async(client)
+        if not admitted:
+            metrics.RATE_LIMITED.inc(scope['path'])
+            return await _send_json(send, api.rate_limit_payload(retry_after), 429,
+                                    [(b'retry-after', str(math.ceil(retry_after)).encode('ascii'))])
+        
+        with tracing.span('parse'):
+            body = await _read_body(receive)
+            try:
+                data = json.loads(body) if body else None
+            except ValueError:
+                data = None
+
+        if not data or not isinstance(data, dict):
+            return await _send_json(send, {
+                'error': 'No JSON data provided',
+                'status': 'error'
+            }, 400)
+
+        # Same checks as Flask's /ask
+        question, error = api.request_question(data.get('question', ''))
+        if not error:
+            deadline, error = api.request_deadline(data)
+        if not error:
+            session_id, error = api.request_session(data)
+        if error:
+            return await _send_json(send, {
+                'error': error,
+                'status': 'error'
+            }, 400)
+        
+        # Get response from appropriate chatbot
+        if api.chatbot_available:
+            try:
+                with tracing.span('answer'):
+                    answer = await api.chatbot.ask_async(question, timeout=deadline, session_id=session_id)
+                response_source = "AI-powered"
+            except AnswerTimeout:
+                with tracing.span('fallback'):
+                    answer = api.chatbot.record_turn(session_id, question, api.fallback_chatbot.ask(question))
+                response_source = "fallback-timeout"
+        else:
+            with tracing.span('fallback'):
+                answer = api.fallback_chatbot.ask(question)
+            response_source = "fallback"
+
+        await _send_json(send, api.answer_payload(question, answer, response_source, session_id))
+        return response_source
+
+    except Exception as e:
+        await _send_json(send, {
+            'error': f'An error occurred: {str(e)}',
+            'status': 'error'
+        }, 500)
+
+
+async def _read_body(receive) -> bytes:
+    """Read the full request body from the ASGI receive channel."""
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def _send_json(send, payload, status=200, extra_headers=()):
+    """Send a JSON response (with the same CORS header Flask-CORS adds, and the stage timings)."""
+    with tracing.span('serialize'):
+        body = json.dumps(payload).encode('utf-8')
+    trace = tracing.current_trace()
+    if trace is not None:
+        extra_headers = [*extra_headers, (b'server-timing', trace.server_timing().encode('latin-1'))]
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+            (b'access-control-allow-origin', b'*'),
+            *extra_headers
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("🚀 Starting Portfolio Chatbot API (async)...")
+    print("❓ Send POST requests to /ask with your questions")
+    print("🛑 Press Ctrl+C to stop the server")
+
+    uvicorn.run(app, host='0.0.0.0', port=int(os.getenv('PORT', 7860)))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the fallback chatbot's keyword matching
+Compares the compiled KeywordMatcher against the old per-keyword substring
+scan over a mix of realistic questions, and reports questions per second.
+
+Usage:
+    python bench_fallback.py            # 50,000 questions
+    python bench_fallback.py 200000     # custom count
+"""
+
+import os
+import random
+import string
+import sys
+import time
+
+# Benchmark the fallback path only; never start the AI chatbot on import
+os.environ['GROQ_API_KEY'] = ''
+
+from app import FallbackChatbot  # noqa: E402
+from keyword_matcher import KeywordMatcher  # noqa: E402
+
+QUESTIONS = [
+    "What are his technical skills?",
+    "Tell me about your projects",
+    "What work has Abhishek done?",
+    "Who is Abhishek Ambi?",
+    "How can I reach him on LinkedIn or GitHub?",
+    "Give me some career advice for a first job",
+    "What programming languages and frameworks does he know?",
+    "What are his hobbies and personal interests?",
+    "What is his expected salary?",
+    "Does he have any experience with cloud deployment and DevOps pipelines in production?",
+    "hi",
+    "Which of his portfolio projects were developed with Flutter and Firebase?"
+]
+
+
+def linear_scan(knowledge_base, question):
+    """The previous matching loop: first category with any keyword substring wins."""
+    question_lower = question.lower()
+    for category, data in knowledge_base.items():
+        if category == 'default':
+            continue
+        for keyword in data['keywords']:
+            if keyword in question_lower:
+                return category
+    return None
+
+
+def run(label, fn, questions):
+    started = time.perf_counter()
+    for question in questions:
+        fn(question)
+    elapsed = time.perf_counter() - started
+    print(f"   {label:<28} {len(questions) / elapsed:>12,.0f} questions/s   "
+          f"{elapsed / len(questions) * 1e6:>6.2f} µs/question")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(count)]
+    bot = FallbackChatbot()
+
+    print("⏱️ Fallback Matching Benchmark")
+    print("=" * 50)
+    print(f"{count:,} questions, {len(QUESTIONS)} distinct\n")
+
+    print("Category selection only:")
+    old = run("linear substring scan", lambda q: linear_scan(bot.knowledge_base, q), questions)
+    new = run("KeywordMatcher.match", bot.matcher.match, questions)
+    print(f"   speedup: {old / new:.2f}x\n")
+
+    print("Full FallbackChatbot.ask:")
+    run("ask (matcher + response)", bot.ask, questions)
+
+    # The old scan costs keywords x categories per question, the matcher
+    # only grows with the question length
+    print("\nScaling with knowledge base size (category selection only):")
+    rng = random.Random(42)
+    for categories, keywords_per_category in ((6, 6), (20, 25), (50, 40)):
+        knowledge_base = {
+            f"category{c}": {'keywords': [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 9)))
+                                          for _ in range(keywords_per_category)]}
+            for c in range(categories)
+        }
+        matcher = KeywordMatcher({name: data['keywords'] for name, data in knowledge_base.items()})
+        sample = questions[:20000]
+        print(f"   {categories} categories x {keywords_per_category} keywords:")
+        old = run("linear substring scan", lambda q: linear_scan(knowledge_base, q), sample)
+        new = run("KeywordMatcher.match", matcher.match, sample)
+        print(f"   speedup: {old / new:.2f}x")
+
+    print("\nCategories chosen:")
+    for question in QUESTIONS:
+        scores = bot.matcher.scores(question)
+        print(f"   {question[:60]:<60} old={linear_scan(bot.knowledge_base, question)} "
+              f"new={bot.matcher.match(question)} scores={scores}")
+
+
+if __name__ == "__main__":
+    main()
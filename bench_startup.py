@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the Portfolio Chatbot API
+Measures, in fresh interpreters, how long importing app.py takes before
+/health and the fallback path can answer, how long the AI chatbot then
+needs to finish loading in the background, and what each imported
+module costs (from python -X importtime).
+
+Usage:
+    python bench_startup.py          # 3 runs, top 15 modules
+    python bench_startup.py 5 25     # 5 runs, top 25 modules
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in the child interpreter; prints one JSON line with the timings.
+# The chatbot is loaded without warming the canned answers, which would
+# send requests with the placeholder key
+PROBE = r"""
+import io, json, sys, time, threading, contextlib
+started = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+    imported = time.perf_counter()
+    loader = threading.Thread(target=app.load_chatbot, kwargs={'prewarm': False}, daemon=True)
+    loader.start()
+    client = app.app.test_client()
+    health = client.get('/health')
+    first_answer = client.post('/ask', json={'question': 'What are his skills?'})
+    served = time.perf_counter()
+    loader.join()
+    loaded = time.perf_counter()
+print(json.dumps({
+    'import_app': imported - started,
+    'first_responses': served - started,
+    'health_status': health.status_code,
+    'first_answer_source': first_answer.get_json().get('response_source'),
+    'chatbot_ready': loaded - started,
+    'chatbot_status': app.chatbot_status
+}))
+"""
+
+
+def child_env(store_dir):
+    env = dict(os.environ)
+    # A placeholder key makes the loader build the full LLM stack; no request is needed for that
+    env.setdefault('GROQ_API_KEY', 'bench-startup')
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    # The probe starts the loader itself, without prewarming
+    env['CHATBOT_PRELOAD'] = '1'
+    # A fresh store per run: no answers from earlier runs, and nothing left in the repo
+    env['CHATBOT_STORE_PATH'] = os.path.join(store_dir, 'chatbot_state.db')
+    return env
+
+
+def time_startup():
+    """Run the probe in a fresh interpreter and return its timings."""
+    with tempfile.TemporaryDirectory() as store_dir:
+        result = subprocess.run([sys.executable, '-c', PROBE], cwd=HERE, env=child_env(store_dir),
+                                capture_output=True, text=True, timeout=300)
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(f"probe failed:\n{result.stderr[-2000:]}")
+
+
+def import_costs(module):
+    """
+    Import a module under -X importtime.
+
+    app.py's background loader does not run (CHATBOT_PRELOAD is set), so
+    its imports do not interleave with the ones measured.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        (self-time microseconds per top-level package, total microseconds)
+    """
+    with tempfile.TemporaryDirectory() as store_dir:
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=HERE,
+                                env=child_env(store_dir), capture_output=True, text=True, timeout=300)
+    per_package = defaultdict(int)
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        package = name.strip().split('.')[0]
+        per_package[package] += int(self_us)
+        if not name[1:].startswith(' '):
+            # Top-level entries (no indentation) add up to the whole import
+            total += int(cumulative_us)
+    return per_package, total
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+    print("⏱️ Startup Benchmark")
+    print("=" * 50)
+
+    samples = [time_startup() for _ in range(runs)]
+    best = {key: min(sample[key] for sample in samples)
+            for key in ('import_app', 'first_responses', 'chatbot_ready')}
+    print(f"\nBest of {runs} cold starts:")
+    print(f"   import app (server can accept requests)  {best['import_app'] * 1000:8.0f} ms")
+    print(f"   first /health + /ask answered            {best['first_responses'] * 1000:8.0f} ms"
+          f"   (/ask answered by: {samples[-1]['first_answer_source']})")
+    print(f"   AI chatbot ready in the background       {best['chatbot_ready'] * 1000:8.0f} ms"
+          f"   (status: {samples[-1]['chatbot_status']})")
+
+    for module in ('app', 'portfolio_chatbot'):
+        per_package, total = import_costs(module)
+        print(f"\nImport cost of '{module}': {total / 1000:.0f} ms total, top {top} packages (self time):")
+        for package, micros in sorted(per_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+            print(f"   {package:<28} {micros / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Chat prompt for Abhishek Ambi's Portfolio Chatbot
+A system message that is rendered once and sent unchanged with every
+request, followed by a small user message formatted per question, so the
+long start of every prompt is byte-identical (and eligible for a
+provider's prompt cache) and formatting only touches the short part.
+"""
+
+from typing import Any, List
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.prompt_values import ChatPromptValue
+from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
+
+from knowledge_base import estimate_tokens
+
+
+class StaticPrefixPrompt(ChatPromptTemplate):
+    """
+    Chat prompt of a fixed system message and one user message template.
+
+    Drop-in for the generic ChatPromptTemplate in an LLMChain. The user
+    message is filled with ``str.format`` rather than LangChain's checked
+    formatter, and the prompt value is built without re-validating the
+    messages, which is most of the per-request formatting cost.
+    """
+
+    @classmethod
+    def build(cls, system_prompt: str, user_template: str) -> "StaticPrefixPrompt":
+        """
+        Create the prompt.
+
+        Args:
+            system_prompt: Text of the system message, sent as is (braces need no escaping)
+            user_template: f-string style template of the user message
+
+        Returns:
+            The prompt
+        """
+        return cls.from_messages([
+            SystemMessage(content=system_prompt),
+            HumanMessagePromptTemplate.from_template(user_template)
+        ])
+
+    @property
+    def system_message(self) -> SystemMessage:
+        """The system message shared by every formatted prompt."""
+        return self.messages[0]
+
+    @property
+    def user_template(self) -> str:
+        return self.messages[1].prompt.template
+
+    @property
+    def static_tokens(self) -> int:
+        """Estimated tokens of the system message."""
+        return estimate_tokens(self.system_message.content)
+
+    def format_messages(self, **kwargs: Any) -> List[BaseMessage]:
+        return [self.system_message, HumanMessage(content=self.user_template.format(**kwargs))]
+
+    async def aformat_messages(self, **kwargs: Any) -> List[BaseMessage]:
+        return self.format_messages(**kwargs)
+
+    def format_prompt(self, **kwargs: Any) -> ChatPromptValue:
+        return ChatPromptValue.model_construct(messages=self.format_messages(**kwargs))
+
+    async def aformat_prompt(self, **kwargs: Any) -> ChatPromptValue:
+        return self.format_prompt(**kwargs)
@@ -0,0 +1,16 @@
+"""
+Shared names for Abhishek Ambi's Portfolio Chatbot
+Kept free of LangChain and Groq imports so the web server can use them
+before the model stack has finished loading.
+"""
+
+# Yielded by ask_stream when a partial answer must be discarded (e.g. after a model switch)
+STREAM_RESET = "\x00reset"
+
+
+class UpstreamError(Exception):
+    """Raised when the model could not produce an answer; the message is user-facing."""
+
+
+class AnswerTimeout(Exception):
+    """Raised when no answer is ready before the request deadline."""
@@ -0,0 +1,251 @@
+"""
+Conversation memory for Abhishek Ambi's Portfolio Chatbot
+Keeps the recent turns of each chat session on the server so follow-up
+questions ("tell me more about the second one") can be answered, without
+letting the prompt or the process memory grow with the conversation.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List
+
+from knowledge_base import estimate_tokens
+
+
+def _clip(text: str, max_tokens: int) -> str:
+    """Shorten a text to about ``max_tokens`` tokens, cutting at a word boundary."""
+    text = " ".join(text.split())
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(' ', 0, max_chars)
+    return text[:cut if cut > 0 else max_chars].rstrip(',;:') + "…"
+
+
+def _first_sentence(text: str) -> str:
+    text = " ".join(text.split())
+    for end in ('. ', '! ', '? '):
+        position = text.find(end)
+        if position > 0:
+            text = text[:position + 1]
+    return text
+
+
+class Turn:
+    """One question and the answer given to it."""
+
+    __slots__ = ('question', 'answer', 'tokens')
+
+    def __init__(self, question: str, answer: str, tokens: int):
+        self.question = question
+        self.answer = answer
+        self.tokens = tokens
+
+
+class Session:
+    """The remembered part of one conversation: a summary plus the latest turns."""
+
+    __slots__ = ('turns', 'window_tokens', 'summary', 'summary_tokens', 'last_used')
+
+    def __init__(self, now: float):
+        self.turns: List[Turn] = []
+        self.window_tokens = 0
+        self.summary: List[str] = []
+        self.summary_tokens = 0
+        self.last_used = now
+
+
+class ConversationMemory:
+    """
+    Thread-safe store of chat sessions keyed by a client-chosen session id.
+
+    Each session keeps its latest turns verbatim up to ``window_tokens``.
+    Turns pushed out of that window are compacted into one summary line
+    each (the question and the first sentence of the answer), and the
+    summary itself is capped at ``summary_tokens`` by dropping its oldest
+    lines, so the history added to a prompt has a fixed upper size.
+
+    Sessions are kept in least recently used order: the oldest are evicted
+    once there are more than ``max_sessions``, and sessions idle for
+    ``idle_timeout`` seconds are dropped whenever the store is used, so
+    memory stays flat however many clients come and go.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_timeout: float = 1800,
+                 window_tokens: int = 600, summary_tokens: int = 150, max_turn_tokens: int = 250):
+        """
+        Initialize the conversation memory.
+
+        Args:
+            max_sessions: Maximum number of sessions kept (0 disables the memory)
+            idle_timeout: Seconds without a question after which a session is forgotten
+            window_tokens: Maximum estimated tokens of recent turns kept verbatim
+            summary_tokens: Maximum estimated tokens of the summary of older turns
+            max_turn_tokens: Longest question or answer kept for one turn (longer ones are clipped)
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.window_tokens = window_tokens
+        self.summary_tokens = summary_tokens
+        self.max_turn_tokens = max_turn_tokens
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.sessions_created = 0
+        self.lru_evictions = 0
+        self.idle_evictions = 0
+        self.turns_recorded = 0
+        self.turns_compacted = 0
+
+    def history(self, session_id: str) -> str:
+        """
+        Render a session's history for the prompt.
+
+        Args:
+            session_id: The client's session id
+
+        Returns:
+            The summary of older turns followed by the recent turns, or ''
+            for a new (or forgotten) session
+        """
+        if self.max_sessions <= 0:
+            return ""
+
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return ""
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+
+            lines = []
+            if session.summary:
+                lines.append("Earlier in this conversation:")
+                lines.extend(session.summary)
+            for turn in session.turns:
+                lines.append(f"User: {turn.question}")
+                lines.append(f"Assistant: {turn.answer}")
+            return "\n".join(lines)
+
+    def recent(self, session_id: str, turns: int = 2) -> str:
+        """
+        Get the text of a session's latest turns, to search the knowledge base with.
+
+        Args:
+            session_id: The client's session id
+            turns: Number of latest turns to include
+
+        Returns:
+            Their questions and answers, newest last ('' for an unknown session)
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return ""
+            return "\n".join(f"{turn.question}\n{turn.answer}" for turn in session.turns[-turns:])
+
+    def record(self, session_id: str, question: str, answer: str):
+        """
+        Add a turn to a session (creating it if needed) and compact its history.
+
+        Args:
+            session_id: The client's session id
+            question: The user's question
+            answer: The answer they were given
+        """
+        if self.max_sessions <= 0:
+            return
+
+        question = _clip(question, self.max_turn_tokens)
+        answer = _clip(answer, self.max_turn_tokens)
+        turn = Turn(question, answer, estimate_tokens(question) + estimate_tokens(answer))
+
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(now)
+                self.sessions_created += 1
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.lru_evictions += 1
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+
+            session.turns.append(turn)
+            session.window_tokens += turn.tokens
+            self.turns_recorded += 1
+            # The latest turn always stays verbatim, so "the second one" still resolves
+            while session.window_tokens > self.window_tokens and len(session.turns) > 1:
+                self._compact(session, session.turns.pop(0))
+
+    def _compact(self, session: Session, turn: Turn):
+        """Fold a turn that left the window into the session summary (lock must be held)."""
+        session.window_tokens -= turn.tokens
+        line = (f"- Asked \"{_clip(turn.question, 30)}\"; "
+                f"answered: {_clip(_first_sentence(turn.answer), 40)}")
+        session.summary.append(line)
+        session.summary_tokens += estimate_tokens(line)
+        while session.summary_tokens > self.summary_tokens and session.summary:
+            session.summary_tokens -= estimate_tokens(session.summary.pop(0))
+        self.turns_compacted += 1
+
+    def _evict_idle(self, now: float):
+        """Drop sessions idle for longer than the timeout (lock must be held)."""
+        if self.idle_timeout <= 0:
+            return
+        # Sessions are in last-used order, so only the stale head is visited
+        oldest = now - self.idle_timeout
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_used > oldest:
+                break
+            self._sessions.popitem(last=False)
+            self.idle_evictions += 1
+
+    def forget(self, session_id: str) -> bool:
+        """
+        Drop a session.
+
+        Returns:
+            Whether the session existed
+        """
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def clear(self):
+        """Forget every session (counters are kept)."""
+        with self._lock:
+            self._sessions.clear()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get conversation memory statistics.
+
+        Returns:
+            Live sessions, limits, and how many turns and sessions were compacted or evicted
+        """
+        with self._lock:
+            self._evict_idle(time.time())
+            sessions = len(self._sessions)
+            turns = sum(len(session.turns) for session in self._sessions.values())
+            return {
+                'sessions': sessions,
+                'max_sessions': self.max_sessions,
+                'idle_timeout_seconds': self.idle_timeout,
+                'window_tokens': self.window_tokens,
+                'summary_tokens': self.summary_tokens,
+                'turns_in_windows': turns,
+                'sessions_created': self.sessions_created,
+                'turns_recorded': self.turns_recorded,
+                'turns_compacted': self.turns_compacted,
+                'lru_evictions': self.lru_evictions,
+                'idle_evictions': self.idle_evictions
+            }
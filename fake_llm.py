@@ -0,0 +1,286 @@
+"""
+Local stand-in model for Abhishek Ambi's Portfolio Chatbot
+A deterministic fake of the Groq chat model with simulated latency,
+token streaming, errors and 429 bursts, so caching, routing, hedging and
+deadlines can be exercised and benchmarked offline without spending quota.
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from knowledge_base import estimate_tokens
+
+_QUESTION_RE = re.compile(r'User Query: "(.*?)"\s*(?:\n|$)', re.DOTALL)
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9+#.-]{2,}")
+
+# Option name -> type, for options given as text (FAKE_LLM_OPTIONS)
+OPTION_TYPES = {
+    'latency': float,           # typical time to first token (seconds)
+    'distribution': str,        # fixed, uniform, exponential or lognormal
+    'spread': float,            # uniform: +/- fraction of latency; lognormal: sigma
+    'tokens_per_second': float, # streaming speed after the first token
+    'answer_tokens': int,       # length of generated answers (words)
+    'error_rate': float,        # probability of a generic upstream error per call
+    'rate_limit_rate': float,   # probability per call that a 429 burst starts
+    'rate_limit_every': int,    # every Nth call starts a 429 burst (0 disables)
+    'rate_limit_seconds': float,  # length of a 429 burst; calls during it are rejected
+    'seed': int                 # seed for latency and failure draws
+}
+
+
+def parse_options(text: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse fake model options such as "latency=0.8,error_rate=0.02,gemma2-9b-it.rate_limit_every=20".
+
+    Options prefixed with a model name and a dot only apply to that model.
+
+    Returns:
+        Model name ('' for every model) -> option name -> value
+    """
+    options: Dict[str, Dict[str, Any]] = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        key, _, value = item.partition('=')
+        model, _, name = key.strip().rpartition('.')
+        if name not in OPTION_TYPES:
+            raise ValueError(f"Unknown fake model option: {name}")
+        options.setdefault(model, {})[name] = OPTION_TYPES[name](value.strip())
+    return options
+
+
+def options_for(model: str, options: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge the options for every model with the ones for a specific model."""
+    return {**options.get('', {}), **options.get(model, {})}
+
+
+class FakeRateLimitError(Exception):
+    """Simulated HTTP 429, worded like Groq's so the rate-limit handling treats it the same."""
+
+    def __init__(self, model: str, retry_after: float):
+        super().__init__(
+            f"Error code: 429 - {{'error': {{'message': 'Rate limit reached for model `{model}` "
+            f"(simulated). Please try again in {retry_after:.2f}s.', 'type': 'tokens', "
+            f"'code': 'rate_limit_exceeded'}}}}")
+        self.retry_after = retry_after
+        self.response = None
+
+
+class FakeUpstreamError(Exception):
+    """Simulated non rate-limit upstream failure (HTTP 500)."""
+
+
+class SimulatedUpstream:
+    """
+    Latency and failure behaviour of one fake model.
+
+    Draws come from a seeded generator, so a run with the same seed and
+    call order sees the same latencies and failures.
+    """
+
+    def __init__(self, model: str, latency: float = 0.5, distribution: str = 'lognormal', spread: float = 0.5,
+                 tokens_per_second: float = 250, answer_tokens: int = 60, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, rate_limit_every: int = 0, rate_limit_seconds: float = 10,
+                 seed: int = 0):
+        """
+        Initialize the simulation.
+
+        Args:
+            model: Model name the fake answers as
+            latency: Typical time to the first token in seconds (median for lognormal, mean otherwise)
+            distribution: 'fixed', 'uniform', 'exponential' or 'lognormal'
+            spread: Uniform: +/- fraction of ``latency``; lognormal: sigma of the log
+            tokens_per_second: Streaming speed after the first token
+            answer_tokens: Number of words in each answer
+            error_rate: Probability that a call fails with a generic error
+            rate_limit_rate: Probability that a call starts a burst of 429s
+            rate_limit_every: Every Nth call starts a burst of 429s (0 disables)
+            rate_limit_seconds: How long a burst lasts; every call during it gets a 429
+            seed: Seed for the latency and failure draws
+        """
+        if distribution not in ('fixed', 'uniform', 'exponential', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.model = model
+        self.latency = latency
+        self.distribution = distribution
+        self.spread = spread
+        self.tokens_per_second = tokens_per_second
+        self.answer_tokens = answer_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_seconds = rate_limit_seconds
+
+        self._rng = random.Random(f"{seed}:{model}")
+        self._lock = threading.Lock()
+        self._limited_until = 0.0
+
+        self.calls = 0
+        self.rate_limited = 0
+        self.errors = 0
+
+    def first_token_delay(self) -> float:
+        """Draw a time to first token."""
+        with self._lock:
+            if self.distribution == 'fixed':
+                return self.latency
+            if self.distribution == 'uniform':
+                return max(0.0, self._rng.uniform(self.latency * (1 - self.spread), self.latency * (1 + self.spread)))
+            if self.distribution == 'exponential':
+                return self._rng.expovariate(1 / self.latency) if self.latency > 0 else 0.0
+            return self._rng.lognormvariate(math.log(self.latency), self.spread) if self.latency > 0 else 0.0
+
+    def admit(self):
+        """
+        Decide whether a call fails before producing output.
+
+        Raises:
+            FakeRateLimitError: During a 429 burst (or when this call starts one)
+            FakeUpstreamError: For a simulated generic failure
+        """
+        now = time.time()
+        with self._lock:
+            self.calls += 1
+            starts_burst = ((self.rate_limit_every and self.calls % self.rate_limit_every == 0) or
+                            (self.rate_limit_rate and self._rng.random() < self.rate_limit_rate))
+            if starts_burst and now >= self._limited_until:
+                self._limited_until = now + self.rate_limit_seconds
+            if now < self._limited_until:
+                self.rate_limited += 1
+                raise FakeRateLimitError(self.model, self._limited_until - now)
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.errors += 1
+                raise FakeUpstreamError(f"Error code: 500 - simulated upstream failure on {self.model}")
+
+    def answer(self, prompt: str) -> List[str]:
+        """
+        Build the deterministic answer to a prompt.
+
+        The same prompt always gets the same answer from the same model: it
+        names the model and the question, followed by words drawn from the
+        prompt with a generator seeded by the prompt's hash.
+
+        Returns:
+            Answer tokens (words with their leading space)
+        """
+        match = _QUESTION_RE.search(prompt)
+        if match:
+            question = match.group(1).strip()
+        else:
+            lines = prompt.strip().splitlines()
+            question = lines[-1][:200] if lines else ""
+        digest = hashlib.sha256(f"{self.model}\0{prompt}".encode('utf-8')).digest()
+        rng = random.Random(digest)
+        vocabulary = _WORD_RE.findall(prompt) or ["portfolio"]
+        head = f"[{self.model}] About \"{question}\":".split(' ')
+        words = head + [rng.choice(vocabulary) for _ in range(max(0, self.answer_tokens - len(head)))]
+        return [words[0]] + [' ' + word for word in words[1:]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'rate_limited': self.rate_limited,
+                'errors': self.errors,
+                'rate_limited_for_seconds': round(max(0.0, self._limited_until - time.time()), 2)
+            }
+
+
+def _prompt_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    LangChain chat model backed by a SimulatedUpstream.
+
+    Drop-in for ChatGroq: works in chains, supports invoke, batch, stream
+    and their async forms, reports token usage, and fails with errors the
+    chatbot's rate-limit handling recognizes.
+    """
+
+    model_name: str = "fake"
+    options: Dict[str, Any] = {}
+
+    _upstream: SimulatedUpstream = PrivateAttr()
+
+    def __init__(self, **data: Any):
+        super().__init__(**data)
+        self._upstream = SimulatedUpstream(self.model_name, **self.options)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-groq"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {'model_name': self.model_name, **self.options}
+
+    @property
+    def upstream(self) -> SimulatedUpstream:
+        """The simulation behind this model (for its counters)."""
+        return self._upstream
+
+    def _plan(self, messages: List[BaseMessage]) -> Tuple[List[str], float, float, Dict[str, int]]:
+        """Admit a call and work out its answer, first-token delay, per-token delay and usage."""
+        self._upstream.admit()
+        prompt = _prompt_text(messages)
+        tokens = self._upstream.answer(prompt)
+        per_token = 1 / self._upstream.tokens_per_second if self._upstream.tokens_per_second > 0 else 0.0
+        usage = {'prompt_tokens': estimate_tokens(prompt), 'completion_tokens': len(tokens)}
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        return tokens, self._upstream.first_token_delay(), per_token, usage
+
+    def _result(self, tokens: List[str], usage: Dict[str, int]) -> ChatResult:
+        message = AIMessage(content="".join(tokens), usage_metadata={
+            'input_tokens': usage['prompt_tokens'],
+            'output_tokens': usage['completion_tokens'],
+            'total_tokens': usage['total_tokens']
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)],
+                          llm_output={'token_usage': usage, 'model_name': self.model_name})
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        tokens, first_delay, per_token, usage = self._plan(messages)
+        time.sleep(first_delay + per_token * len(tokens))
+        return self._result(tokens, usage)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        tokens, first_delay, per_token, usage = self._plan(messages)
+        await asyncio.sleep(first_delay + per_token * len(tokens))
+        return self._result(tokens, usage)
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        tokens, first_delay, per_token, _ = self._plan(messages)
+        time.sleep(first_delay)
+        for position, token in enumerate(tokens):
+            if position:
+                time.sleep(per_token)
+            if run_manager:
+                run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        tokens, first_delay, per_token, _ = self._plan(messages)
+        await asyncio.sleep(first_delay)
+        for position, token in enumerate(tokens):
+            if position:
+                await asyncio.sleep(per_token)
+            if run_manager:
+                await run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
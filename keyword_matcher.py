@@ -0,0 +1,158 @@
+"""
+Keyword matching for Abhishek Ambi's Portfolio Chatbot
+Scores fallback categories against a question using an Aho-Corasick
+automaton compiled once from every category's keywords, with a per-word
+score cache so repeated words cost a single dict lookup.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class KeywordMatcher:
+    """
+    Multi-keyword matcher with weighted category scores.
+
+    Keywords match as substrings (so "project" matches "projects"), like
+    the plain ``keyword in question`` checks it replaces, but all keywords
+    are found in a single scan of the question. A keyword shared by several
+    categories splits its weight between them, and a hit that starts in the
+    middle of a word ("who" in "whole") counts for less. A keyword found
+    inside a longer keyword's hit ("java" in "javascript", "hobby" in
+    "hobbies") does not count on its own, so the longer keyword decides.
+
+    When no keyword contains whitespace, no hit can span two words, so the
+    question is split on whitespace and each distinct word is scanned once
+    and its category scores cached.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], weights: Optional[Dict[str, float]] = None,
+                 mid_word_factor: float = 0.5, word_cache_size: int = 50000):
+        """
+        Compile the automaton.
+
+        Args:
+            categories: Category name -> keywords, in priority order (ties go to the earlier category)
+            weights: Optional per-keyword weight (default 1.0)
+            mid_word_factor: Multiplier for hits that do not start at a word boundary
+            word_cache_size: Distinct words whose scores are cached (cleared when full)
+        """
+        weights = weights or {}
+        self.mid_word_factor = mid_word_factor
+        self.word_cache_size = word_cache_size
+        self._word_scores: Dict[str, Tuple[Tuple[str, float], ...]] = {}
+        self._order = {category: position for position, category in enumerate(categories)}
+
+        # keyword -> categories containing it
+        owners: Dict[str, List[str]] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword and category not in owners.setdefault(keyword, []):
+                    owners[keyword].append(category)
+
+        # Trie of all keywords
+        goto: List[Dict[str, int]] = [{}]
+        hits: List[List[Tuple[int, Tuple[Tuple[str, float], ...]]]] = [[]]
+        for keyword, keyword_owners in owners.items():
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    hits.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            share = weights.get(keyword, 1.0) / len(keyword_owners)
+            hits[state].append((len(keyword), tuple((owner, share) for owner in keyword_owners)))
+
+        # Failure links (breadth first), folded into a full transition table
+        # so scanning needs exactly one dict lookup per character
+        fail = [0] * len(goto)
+        self._delta: List[Dict[str, int]] = [dict(goto[0])]
+        self._delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            hits[state].extend(hits[fail[state]])
+            delta = dict(self._delta[fail[state]])
+            for char, child in goto[state].items():
+                fail[child] = self._delta[fail[state]].get(char, 0) if state else 0
+                delta[char] = child
+                queue.append(child)
+            self._delta[state] = delta
+
+        self._hits = [tuple(state_hits) for state_hits in hits]
+        self._by_word = all(len(keyword.split()) == 1 for keyword in owners)
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """
+        Score every category against a text.
+
+        Args:
+            text: The question
+
+        Returns:
+            Category name -> weighted hit score (categories without hits are omitted)
+        """
+        text = text.lower()
+        if not self._by_word:
+            return self._scan(text)
+
+        scores: Dict[str, float] = {}
+        cache = self._word_scores
+        for word in text.split():
+            word_scores = cache.get(word)
+            if word_scores is None:
+                if len(cache) >= self.word_cache_size:
+                    cache.clear()
+                word_scores = cache[word] = tuple(self._scan(word).items())
+            for category, score in word_scores:
+                scores[category] = scores.get(category, 0.0) + score
+        return scores
+
+    def _scan(self, text: str) -> Dict[str, float]:
+        """Run the automaton over lowercased text and sum the category hits not nested in a longer hit."""
+        delta, hits = self._delta, self._hits
+        found: List[Tuple[int, int, Tuple[Tuple[str, float], ...]]] = []
+        state = 0
+        for position, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            for length, owners in hits[state]:
+                found.append((position - length + 1, -length, owners))
+
+        # Earliest start first and, at the same start, longest first: a hit
+        # is nested when an earlier one in this order reaches at least as far
+        scores: Dict[str, float] = {}
+        reach = -1
+        for start, negative_length, owners in sorted(found, key=lambda hit: hit[:2]):
+            end = start - negative_length
+            if end <= reach:
+                continue
+            reach = end
+            factor = 1.0 if start == 0 or not text[start - 1].isalnum() else self.mid_word_factor
+            for category, weight in owners:
+                scores[category] = scores.get(category, 0.0) + weight * factor
+        return scores
+
+    def match(self, text: str, combine_ratio: float = 0.75, max_categories: int = 2) -> List[str]:
+        """
+        Pick the categories a text is about.
+
+        Args:
+            text: The question
+            combine_ratio: Runners-up scoring at least this fraction of the best score are included
+            max_categories: Maximum number of categories returned
+
+        Returns:
+            Matching category names, best first (empty if no keyword matched)
+        """
+        scores = self.scores(text)
+        if not scores:
+            return []
+
+        if len(scores) == 1:
+            return list(scores)
+
+        cutoff = max(scores.values()) * combine_ratio
+        ranked = sorted((category for category, score in scores.items() if score >= cutoff),
+                        key=lambda category: (-scores[category], self._order[category]))
+        return ranked[:max_categories]
@@ -0,0 +1,522 @@
+"""
+Knowledge base for Abhishek Ambi's Portfolio Chatbot
+Holds the system prompt and portfolio facts, split into sections with a
+local BM25 index so each prompt only carries the sections relevant to
+the question instead of the whole knowledge base.
+"""
+
+import math
+import re
+import threading
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+SYSTEM_PROMPT = '''
+system_prompt:
+I am Abhishek Ambi's AI assistant, designed to provide accurate, clear, and contextual answers about his portfolio and career. 
+
+RESPONSE GUIDELINES:
+• Always provide responses in clear, organized bullet points
+• Use numbered lists for sequential information
+• Structure information logically with headers
+• Be concise but comprehensive
+• If asked about something not in my knowledge base, acknowledge it and provide related information
+• For unknown facts, say "I don't have specific information about [topic], but based on Abhishek's background, I can tell you..."
+
+My primary objectives are to:
+• Provide detailed information about Abhishek's projects and technical skills
+• Offer career advice based on his expertise and experience
+• Answer questions about his full-stack development capabilities
+• Assist with portfolio-related inquiries
+• Share information about his background, education, and professional journey
+• Handle unknown topics gracefully by providing related context
+
+ABOUT ABHISHEK:
+Final year computer science student with practical experience in software development, data analysis, machine learning and computer vision through academic projects. Interested in using code and insights to solve real-world problems. Seeking to join a forward-thinking organization that supports innovation, mentorship, and lifelong learning while gaining worthwhile industry experience.
+'''
+
+KNOWLEDGE_BASE = '''PERSONAL BACKGROUND:
+Abhishek Gangappa Ambi is a final year computer science student with practical experience in software development, data analysis, machine learning and computer vision through academic projects. He is passionate about creating innovative digital solutions and combines technical expertise with creative problem-solving to deliver exceptional user experiences.
+
+**Personal Journey**:
+- Born and raised in Mahalingpur, Karnataka
+- Started educational journey at Jaycee English Medium School
+- Completed SSLC in 2020 with 64% marks
+- Pursued Diploma in Computer Science (2020-2023) with excellent performance (9.83 CGPA)
+- Currently pursuing BE in Computer Science with strong academic record (8.26 CGPA)
+- Passionate about technology and continuous learning
+
+**Personal Traits**:
+- Dedicated and hardworking individual
+- Strong problem-solving mindset
+- Enjoys learning new technologies
+- Team player with good communication skills
+- Detail-oriented and quality-focused
+- Self-motivated and goal-driven
+
+EDUCATION:
+1. RV INSTITUTE OF TECHNOLOGY AND MANAGEMENT BENGALURU
+   - BE in Computer Science & Engineering
+   - CGPA: 8.26
+   - Duration: 2023 - 2026
+
+2. K.L.E.SOCIETY'S POLYTECHNIC MAHALINGAPUR
+   - Diploma in Computer Science & Engineering
+   - CGPA: 9.83
+   - Duration: 2020 - 2023
+
+3. JAYCEE ENGLISH MEDIUM SCHOOL MAHALINGPUR
+   - SSLC (10th Standard)
+   - Percentage: 64%
+   - Passout Year: 2020
+   - Location: Mahalingpur, Karnataka
+
+CERTIFICATIONS & ACTIVITIES:
+- Continuous learning through online courses and certifications
+- Active participation in coding communities and hackathons
+- Academic projects in machine learning and computer vision
+
+PERSONAL INTERESTS & HOBBIES:
+- **Coding & Programming**: Passionate about writing code, solving problems, and building applications
+- **Reading**: Enjoys reading technical books, programming documentation, and educational content
+- **Testing & Quality Assurance**: Interested in software testing, debugging, and ensuring code quality
+- **Learning New Technologies**: Constantly exploring new programming languages, frameworks, and tools
+- **Problem Solving**: Enjoys tackling complex technical challenges and finding innovative solutions
+- **Open Source Contribution**: Interested in contributing to open-source projects and developer communities
+- **Technical Writing**: Creating documentation, tutorials, and sharing knowledge with others
+- **Algorithm Practice**: Regular practice of data structures and algorithms for skill improvement
+- **Project Building**: Creating personal projects to apply and showcase technical skills
+- **Networking**: Connecting with fellow developers and tech professionals
+
+PROFESSIONAL EXPERIENCE:
+- Full-stack development with focus on MERN stack
+- Mobile app development using React Native and Android Studio
+- Experience in both frontend and backend development
+- Project management and client communication skills
+- Academic projects in machine learning and computer vision
+- Data analysis and insights generation
+
+PROJECT PORTFOLIO:
+
+1. Meeting House
+   - Technology: MERN Stack (MongoDB, Express.js, React, Node.js)
+   - Description: Developed an online meeting application with user authentication, 
+     event management, and resource sharing for seamless collaboration.
+   - Features: Real-time communication, user management, event scheduling, 
+     virtual meeting rooms, participant management, meeting recording capabilities
+   - Impact: Streamlined remote collaboration for teams and organizations
+
+2. Shri Vagdevi Construction (Real Time Project)
+   - Technology: MERN Stack (MongoDB, Express.js, React, Node.js)
+   - Website: shrivagdeviconstructions.com
+   - Description: A professional civil engineering and construction firm website dedicated to delivering high-quality residential and commercial projects with precision and reliability.
+   - Features: Modern responsive design, project galleries, client testimonials, contact forms,
+     content management system, smooth front-end and back-end interaction,
+     service booking, project portfolio, team information, contact management
+   - Impact: Professional online presence for construction business
+
+3. Quick Eats
+   - Technology: React Native, Express.js, MongoDB
+   - Description: A hybrid app for a cloud kitchen designed to manage both online delivery and walk-in/takeaway services.
+   - Features: User authentication, order management, payment integration,
+     real-time order tracking, restaurant listings, menu management, delivery scheduling
+   - Impact: Complete food delivery solution for restaurants and customers
+
+4. Plant Disease Detection
+   - Technology: Machine Learning, Android, VSCode, React Native/Flutter
+   - Description: Building a plant disease detection system using machine learning and mobile technologies.
+   - Features: Image processing, disease classification, mobile interface, real-time detection
+   - Impact: Agricultural technology solution for farmers and gardeners
+
+5. Object Detection
+   - Technology: YOLOv5, Python, Computer Vision
+   - Description: YOLOv5 (You Only Look Once version 5) is a powerful real-time object detection model known for its speed and accuracy.
+   - Features: Real-time object detection, high accuracy, fast processing, multiple object classes
+   - Impact: Computer vision applications in various domains
+
+6. Path Finder
+   - Technology: React
+   - Description: Created a web application to visualize pathfinding algorithms
+   - Features: Dijkstra's, DFS, BFS, A* algorithms visualization for finding shortest paths,
+     interactive grid system, algorithm comparison, step-by-step visualization
+   - Impact: Educational tool for understanding algorithm concepts
+
+7. Todo List
+   - Technology: Java
+   - Description: Created a Java application for managing tasks
+   - Features: Straightforward interface to boost productivity, task categorization,
+     priority levels, due date management, progress tracking
+   - Impact: Simple yet effective task management solution
+
+8. C-Tutor
+   - Technology: Augmented Reality (AR), Mobile Development
+   - Description: Augmented Reality (AR) application transforming education by creating immersive and interactive learning experiences that engage students and enhance comprehension.
+   - Features: AR visualization, interactive learning modules, educational content
+   - Impact: Enhanced educational experience through immersive technology
+
+9. Online Medicine Store
+   - Technology: React, Node.js, MongoDB
+   - Description: Designed a web application for online medicine purchasing
+   - Features: Simple cart system, product management, secure transactions,
+     prescription upload, medicine search, inventory management, delivery tracking
+   - Impact: Healthcare accessibility through digital platform
+
+TECHNICAL SKILLS:
+
+Programming Languages:
+- Python (Data Analysis, Machine Learning, Computer Vision)
+- Java (Core & Advanced, Android Development)
+- JavaScript (ES6+, Frontend & Backend)
+- C++ (System Programming)
+- PHP (Web Development)
+
+Frontend Technologies:
+- React.js (Advanced)
+- React Native (Mobile Development)
+- Angular (Frontend Framework)
+- HTML5, CSS3
+- Bootstrap (CSS Framework)
+- Tailwind CSS (Utility-first CSS)
+
+Backend Technologies:
+- Node.js (Advanced)
+- Express.js (RESTful APIs)
+- API Development & Integration
+
+Database & Storage:
+- MongoDB (NoSQL)
+- MySQL (Relational Database)
+- Database Design & Optimization
+- Data Modeling
+
+Mobile Development:
+- Android Studio
+- Java for Android
+- React Native
+- Flutter (Cross-platform)
+- Mobile App Architecture
+
+Machine Learning & AI:
+- YOLOv5 (Object Detection)
+- Computer Vision
+- Data Analysis
+- Machine Learning Algorithms
+
+Development Tools & Practices:
+- Git & GitHub (Version Control)
+- VS Code, Eclipse, Postman
+- RESTful API Design
+- Agile Development Methodology
+- Code Review & Testing
+
+Design & Creative Tools:
+- Canva (Graphic Design)
+- Photoshop (Image Editing)
+- Blender (3D Modeling)
+- After Effects (Video Editing)
+
+CAREER FOCUS AREAS:
+- Full-Stack Web Development
+- Mobile App Development
+- API Development
+- Database Design
+- Machine Learning & Computer Vision
+- Data Analysis & Insights
+- User Experience Optimization
+- Performance Optimization
+- Security Implementation
+- Augmented Reality (AR) Development
+
+PROFESSIONAL VALUES:
+- Clean, maintainable code
+- User-centered design
+- Performance optimization
+- Security best practices
+- Continuous learning
+- Problem-solving approach
+- Team collaboration
+
+CONTACT & NETWORKING:
+- Portfolio Website: https://www.abhishekambi.info/
+- Email: abhishekambi2003@gmail.com
+- LinkedIn: linkedin.com/in/abhishekambi2003
+- GitHub: github.com/CSEStudentAbhi
+- Professional networking through LinkedIn and GitHub
+- Active participation in developer communities
+- Open to collaboration and new opportunities'''
+
+# Top-level sections that are split into one retrievable section per item
+SPLIT_SECTIONS = ('PROJECT PORTFOLIO', 'TECHNICAL SKILLS')
+
+_HEADING_RE = re.compile(r"^([A-Z][A-Z &]+):\s*$")
+_ITEM_RE = re.compile(r"^(\d+\.\s+\S.*|[A-Z][A-Za-z &/]+:)\s*$")
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+# Words too common in questions to help rank sections
+_STOPWORDS = frozenset([
+    'a', 'about', 'all', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'could', 'do',
+    'does', 'for', 'from', 'give', 'has', 'have', 'he', 'his', 'him', 'how', 'i', 'in',
+    'is', 'it', 'know', 'list', 'me', 'my', 'of', 'on', 'or', 'please', 'should', 'show',
+    'tell', 'that', 'the', 'their', 'this', 'to', 'us', 'was', 'what', 'which', 'who', 'with',
+    'would', 'you', 'your', 'abhishek', 'ambi'
+])
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of LLM tokens in a text (about 4 characters per token).
+
+    Args:
+        text: Any prompt text
+
+    Returns:
+        Estimated token count
+    """
+    return (len(text) + 3) // 4
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms with light plural stemming.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of search terms
+    """
+    terms = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+class KnowledgeSection(NamedTuple):
+    """One retrievable piece of the knowledge base."""
+    heading: str
+    title: str
+    body: str
+    order: int
+
+    @property
+    def text(self) -> str:
+        return f"{self.heading}:\n{self.body}"
+
+    @property
+    def index_text(self) -> str:
+        """Text used for ranking; the heading and title are repeated to boost them."""
+        return f"{self.heading}\n{self.title}\n{self.title}\n{self.body}"
+
+
+def split_sections(knowledge_base: str = KNOWLEDGE_BASE) -> List[KnowledgeSection]:
+    """
+    Split the knowledge base into retrievable sections.
+
+    Every top-level heading becomes a section. Headings listed in
+    SPLIT_SECTIONS are broken into one section per numbered item or
+    sub-heading, plus a compact overview section listing every item.
+
+    Args:
+        knowledge_base: The full knowledge base text
+
+    Returns:
+        Sections in document order
+    """
+    blocks: List[Tuple[str, List[str]]] = []
+    for line in knowledge_base.strip().split("\n"):
+        match = _HEADING_RE.match(line)
+        if match:
+            blocks.append((match.group(1), []))
+        elif blocks:
+            blocks[-1][1].append(line)
+
+    sections: List[KnowledgeSection] = []
+    for heading, lines in blocks:
+        if heading not in SPLIT_SECTIONS:
+            sections.append(KnowledgeSection(heading, heading, "\n".join(lines).strip(), len(sections)))
+            continue
+
+        items: List[List[str]] = []
+        for line in lines:
+            if _ITEM_RE.match(line):
+                items.append([line])
+            elif items:
+                items[-1].append(line)
+
+        # Overview: each item's title and first detail line
+        overview = []
+        for item in items:
+            overview.append(item[0].strip())
+            details = [line for line in item[1:] if line.strip()]
+            if details:
+                overview.append(details[0])
+        sections.append(KnowledgeSection(heading, heading, "\n".join(overview), len(sections)))
+
+        for item in items:
+            title = item[0].strip().rstrip(':')
+            sections.append(KnowledgeSection(heading, title, "\n".join(item).strip(), len(sections)))
+
+    return sections
+
+
+class BM25Index:
+    """Okapi BM25 ranking over a fixed list of documents."""
+
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Build the index.
+
+        Args:
+            documents: Document texts to index
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self._term_freqs: List[Dict[str, int]] = []
+        self._lengths: List[int] = []
+        document_freqs: Dict[str, int] = {}
+
+        for document in documents:
+            freqs: Dict[str, int] = {}
+            terms = tokenize(document)
+            for term in terms:
+                freqs[term] = freqs.get(term, 0) + 1
+            for term in freqs:
+                document_freqs[term] = document_freqs.get(term, 0) + 1
+            self._term_freqs.append(freqs)
+            self._lengths.append(len(terms))
+
+        count = len(documents)
+        self._avg_length = (sum(self._lengths) / count) if count else 0.0
+        self._idf = {
+            term: math.log(1 + (count - freq + 0.5) / (freq + 0.5))
+            for term, freq in document_freqs.items()
+        }
+
+    def search(self, query: str, top_k: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Rank documents against a query.
+
+        Args:
+            query: The search query
+            top_k: Maximum number of results (None returns every match)
+
+        Returns:
+            (document index, score) pairs with a positive score, best first
+        """
+        query_terms = set(tokenize(query))
+        scores = []
+        for index, freqs in enumerate(self._term_freqs):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[index] / (self._avg_length or 1))
+            for term in query_terms:
+                freq = freqs.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            if score > 0:
+                scores.append((index, score))
+
+        scores.sort(key=lambda pair: pair[1], reverse=True)
+        return scores if top_k is None else scores[:top_k]
+
+
+class KnowledgeRetriever:
+    """
+    Selects the knowledge base sections relevant to a question.
+
+    Keeps running totals so the average number of prompt tokens saved
+    compared to sending the whole knowledge base can be reported.
+    """
+
+    # Sections used when nothing in the question matches the index
+    DEFAULT_HEADINGS = ('PERSONAL BACKGROUND', 'PROJECT PORTFOLIO', 'TECHNICAL SKILLS', 'CONTACT & NETWORKING')
+
+    def __init__(self, knowledge_base: str = KNOWLEDGE_BASE, top_k: int = 6, token_budget: int = 1200):
+        """
+        Initialize the retriever.
+
+        Args:
+            knowledge_base: The full knowledge base text
+            top_k: Maximum number of sections per prompt
+            token_budget: Maximum estimated tokens of knowledge per prompt
+        """
+        self.knowledge_base = knowledge_base
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.sections = split_sections(knowledge_base)
+        self.index = BM25Index([section.index_text for section in self.sections])
+        self.full_tokens = estimate_tokens(knowledge_base)
+
+        # Overview sections come first within their heading, so defaults stay compact
+        seen = set()
+        self._default_sections = []
+        for section in self.sections:
+            if section.heading in self.DEFAULT_HEADINGS and section.heading not in seen:
+                seen.add(section.heading)
+                self._default_sections.append(section)
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.context_tokens = 0
+
+    def build_context(self, question: str) -> str:
+        """
+        Build the knowledge context for a question.
+
+        Args:
+            question: The user's question
+
+        Returns:
+            The selected sections, in document order, within the token budget
+        """
+        ranked = [self.sections[index] for index, _ in self.index.search(question, self.top_k)]
+        if not ranked:
+            ranked = self._default_sections
+
+        selected: List[KnowledgeSection] = []
+        used = 0
+        for section in ranked:
+            cost = estimate_tokens(section.text)
+            if used + cost > self.token_budget:
+                continue
+            selected.append(section)
+            used += cost
+
+        parts = []
+        heading = None
+        for section in sorted(selected, key=lambda s: s.order):
+            if section.heading != heading:
+                heading = section.heading
+                parts.append(f"\n{heading}:")
+            parts.append(section.body)
+        context = "\n".join(parts).strip()
+
+        with self._lock:
+            self.requests += 1
+            self.context_tokens += estimate_tokens(context)
+        return context
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Report how many prompt tokens retrieval saves.
+
+        Returns:
+            Average knowledge tokens sent and saved per request
+        """
+        with self._lock:
+            average = self.context_tokens / self.requests if self.requests else 0.0
+            saved = self.full_tokens - average if self.requests else 0.0
+            return {
+                'requests': self.requests,
+                'sections': len(self.sections),
+                'top_k': self.top_k,
+                'token_budget': self.token_budget,
+                'full_knowledge_tokens': self.full_tokens,
+                'avg_context_tokens': round(average, 1),
+                'avg_tokens_saved': round(saved, 1),
+                'savings_percent': round(100 * saved / self.full_tokens, 1) if self.requests else 0.0
+            }
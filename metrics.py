@@ -0,0 +1,209 @@
+"""
+Metrics for Abhishek Ambi's Portfolio Chatbot
+Counters, gauges and histograms rendered in the Prometheus text format for
+GET /metrics. Recording a value is a lock and a few additions, so the
+request path can be instrumented without measurable overhead.
+
+Values live in the memory of the process that recorded them. Under the
+pre-forked server (serve.py) each worker has its own registry and a scrape
+is answered by whichever worker accepts it, so every sample carries a
+``pid`` label: sum over ``pid`` (e.g. ``sum without (pid) (...)``) across
+scrapes to see the whole server.
+"""
+
+import math
+import os
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Request latency buckets (seconds): cache and fallback hits up to slow upstream answers
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 60)
+UPSTREAM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """Shared bookkeeping: name, help text, label names and one child per label combination."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, labelvalues: Tuple[str, ...], extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, labelvalues)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + '}'
+
+    def _check(self, labelvalues: Tuple[str, ...]):
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+
+    def samples(self, const: Sequence[Tuple[str, str]] = ()) -> List[str]:
+        raise NotImplementedError
+
+    def render(self, const: Sequence[Tuple[str, str]] = ()) -> List[str]:
+        return ([f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] +
+                self.samples(const))
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label combination."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        """Add ``amount`` to the counter for the given label values."""
+        self._check(labelvalues)
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def samples(self, const: Sequence[Tuple[str, str]] = ()) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._labels(labels, const)} {_format_value(value)}" for labels, value in values]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down per label combination."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        self._check(labelvalues)
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1.0):
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, *labelvalues: str, value: float):
+        self._check(labelvalues)
+        with self._lock:
+            self._values[labelvalues] = float(value)
+
+    def samples(self, const: Sequence[Tuple[str, str]] = ()) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._labels(labels, const)} {_format_value(value)}" for labels, value in values]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values per label combination.
+
+    Counts are kept per bucket and only made cumulative when rendered, so
+    an observation is one bisect and three additions.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = REQUEST_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        """Record one observation (e.g. a latency in seconds)."""
+        self._check(labelvalues)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labelvalues)
+            if series is None:
+                series = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self, const: Sequence[Tuple[str, str]] = ()) -> List[str]:
+        with self._lock:
+            values = sorted((labels, (list(counts), total, count))
+                            for labels, (counts, total, count) in self._values.items())
+        lines = []
+        for labels, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                bucket_labels = self._labels(labels, list(const) + [('le', _format_value(bound))])
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labels, const)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(labels, const)} {count}")
+        return lines
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format (version 0.0.4), labelled with this process's pid."""
+        # Read at render time: the registry is created before serve.py forks its workers
+        const = (('pid', str(os.getpid())),)
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render(const))
+        return '\n'.join(lines) + '\n'
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'chatbot_http_request_duration_seconds',
+    'Time to produce a response (streams: time to the response headers).',
+    ('route', 'status', 'response_source')))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    'chatbot_http_requests_in_flight', 'Requests being handled right now.', ('route',)))
+RATE_LIMITED = REGISTRY.register(Counter(
+    'chatbot_rate_limited_requests_total', 'Requests rejected by the per-client or global rate limit.',
+    ('route',)))
+UPSTREAM_SECONDS = REGISTRY.register(Histogram(
+    'chatbot_upstream_request_duration_seconds', 'Duration of calls to the model provider.',
+    ('model', 'outcome'), buckets=UPSTREAM_BUCKETS))
+UPSTREAM_RATE_LIMITS = REGISTRY.register(Counter(
+    'chatbot_upstream_rate_limits_total', 'Rate limit errors returned by the model provider.', ('model',)))
+MODEL_SWITCHES = REGISTRY.register(Counter(
+    'chatbot_model_switches_total', 'Changes of the preferred model, by the model switched to.', ('model',)))
+CHATBOT_READY = REGISTRY.register(Gauge(
+    'chatbot_ai_ready', '1 when questions can be answered by the AI chatbot, 0 while only the fallback answers.'))
+BREAKER_OPEN = REGISTRY.register(Gauge(
+    'chatbot_model_breaker_open', '1 while the model\'s circuit breaker is not closed.', ('model',)))
+ADMISSION_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    'chatbot_admission_queue_depth', 'Requests waiting for a rate limit token.'))
+CONVERSATION_SESSIONS = REGISTRY.register(Gauge(
+    'chatbot_conversation_sessions', 'Chat sessions remembered for follow-up questions.'))
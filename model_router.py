@@ -0,0 +1,371 @@
+"""
+Model routing for Abhishek Ambi's Portfolio Chatbot
+Routes each request to the healthiest model of an ordered pool, with a
+circuit breaker per model and latency-weighted selection.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Any, Iterable, List, Optional
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one model.
+
+    closed:    requests flow; consecutive failures are counted
+    open:      requests are refused until the cooldown has passed
+    half_open: a single probe request is let through; success closes the
+               breaker, failure opens it again
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Default seconds the breaker stays open
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probe_in_flight = False
+
+        self.successes = 0
+        self.failures = 0
+        self.times_opened = 0
+
+    def available(self, now: float) -> bool:
+        """Whether a request could be sent now (does not reserve a probe)."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return now >= self.open_until
+        return not self.probe_in_flight
+
+    def acquire(self, now: float) -> bool:
+        """Reserve the right to send a request, moving open -> half_open when due."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and now >= self.open_until:
+            self.state = self.HALF_OPEN
+            self.probe_in_flight = False
+        if self.state == self.HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        self.state = self.CLOSED
+
+    def record_failure(self, now: float, cooldown: Optional[float] = None):
+        """
+        Record a failed request.
+
+        Args:
+            now: Current time
+            cooldown: Open the breaker immediately for this many seconds
+                      (used for rate limits); otherwise open after
+                      ``failure_threshold`` consecutive failures
+        """
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+
+        if (cooldown is not None or self.state == self.HALF_OPEN or
+                self.consecutive_failures >= self.failure_threshold):
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.open_until = now + (cooldown if cooldown is not None else self.reset_timeout)
+
+
+class ModelRouter:
+    """
+    Thread-safe router over an ordered pool of models.
+
+    Available models are ranked by their smoothed latency, with a penalty
+    that grows with their position in the pool so earlier models are
+    preferred unless they are noticeably slower. Models whose breaker is
+    open are skipped until their cooldown passes.
+
+    The preferred model (which the caches are keyed on) changes right away
+    when it becomes unavailable, but a faster model only takes over once
+    the current one has been preferred for ``min_dwell`` seconds and the
+    new one scores better by ``switch_margin``, so a single slow call does
+    not flip it back and forth.
+    """
+
+    def __init__(self, models: List[str], failure_threshold: int = 3, reset_timeout: float = 30,
+                 priority_penalty: float = 0.5, default_latency: float = 1.0, latency_alpha: float = 0.2,
+                 latency_window: int = 200, switch_margin: float = 0.2, min_dwell: float = 60,
+                 on_change: Optional[Callable[[Optional[str], str], None]] = None):
+        """
+        Initialize the router.
+
+        Args:
+            models: Model names, most preferred first
+            failure_threshold: Consecutive failures that open a model's breaker
+            reset_timeout: Seconds a breaker stays open after failures
+            priority_penalty: Extra latency weight per position in the pool
+            default_latency: Assumed latency (seconds) for models without samples
+            latency_alpha: Smoothing factor for the latency moving average
+            latency_window: Recent latency samples kept per model for percentiles
+            switch_margin: Fraction by which a model must outscore the preferred one to replace it
+            min_dwell: Seconds a preferred model is kept before a faster one may replace it
+            on_change: Called with (old, new) when the preferred model changes
+        """
+        if not models:
+            raise ValueError("At least one model is required")
+
+        self.models = list(dict.fromkeys(models))
+        self._positions = {model: position for position, model in enumerate(self.models)}
+        self.priority_penalty = priority_penalty
+        self.default_latency = default_latency
+        self.latency_alpha = latency_alpha
+        self.switch_margin = switch_margin
+        self.min_dwell = min_dwell
+        self.on_change = on_change
+
+        self.breakers = {model: CircuitBreaker(failure_threshold, reset_timeout) for model in self.models}
+        self.latency: Dict[str, Optional[float]] = {model: None for model in self.models}
+        self._samples: Dict[str, Deque[float]] = {model: deque(maxlen=latency_window) for model in self.models}
+        self._preferred: Optional[str] = self.models[0]
+        self._preferred_since = time.time()
+        self._lock = threading.Lock()
+
+    def _score(self, model: str) -> float:
+        latency = self.latency[model]
+        if latency is None:
+            latency = self.default_latency
+        return latency * (1 + self.priority_penalty * self._positions[model])
+
+    def ranked(self, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        Get the models that could take a request now, best first.
+
+        Args:
+            exclude: Models to leave out (e.g. already tried)
+
+        Returns:
+            Available model names ordered by score
+        """
+        excluded = set(exclude)
+        now = time.time()
+        with self._lock:
+            models = [model for model in self.models
+                      if model not in excluded and self.breakers[model].available(now)]
+            models.sort(key=self._score)
+        return models
+
+    def acquire(self, model: str) -> bool:
+        """
+        Reserve a model for a request (claims the probe slot of a half-open breaker).
+
+        Args:
+            model: The model about to be called
+
+        Returns:
+            True if the request may be sent
+        """
+        with self._lock:
+            return self.breakers[model].acquire(time.time())
+
+    def release(self, model: str):
+        """
+        Give back a reservation without reporting an outcome (e.g. a cancelled call).
+
+        Args:
+            model: The model that was reserved
+        """
+        with self._lock:
+            self.breakers[model].probe_in_flight = False
+
+    def is_probing(self, model: str) -> bool:
+        """Whether a model's breaker is half open, so only its single probe request may be sent."""
+        with self._lock:
+            return self.breakers[model].state == CircuitBreaker.HALF_OPEN
+
+    def is_available(self, model: str) -> bool:
+        """Whether a model's breaker would let a request through now."""
+        with self._lock:
+            return self.breakers[model].available(time.time())
+
+    def preferred(self) -> str:
+        """
+        The model new requests are preferred to go to.
+
+        Kept while it is available unless a faster model has outscored it
+        by the switch margin after the minimum dwell time; kept as well
+        while no model is available.
+        """
+        ranked = self.ranked()
+        with self._lock:
+            model = self._preferred
+            if ranked and model not in ranked:
+                model = ranked[0]
+            elif (ranked and ranked[0] != model
+                    and time.time() - self._preferred_since >= self.min_dwell
+                    and self._score(ranked[0]) * (1 + self.switch_margin) < self._score(model)):
+                model = ranked[0]
+        self._notify(model)
+        return model
+
+    def record_success(self, model: str, latency: Optional[float] = None):
+        """
+        Record a successful call.
+
+        Args:
+            model: The model that answered
+            latency: Seconds the call took (None leaves the average unchanged)
+        """
+        with self._lock:
+            self.breakers[model].record_success()
+            if latency is not None:
+                self._samples[model].append(latency)
+                previous = self.latency[model]
+                self.latency[model] = (latency if previous is None else
+                                       previous + self.latency_alpha * (latency - previous))
+        self.preferred()
+
+    def record_failure(self, model: str, cooldown: Optional[float] = None):
+        """
+        Record a failed call.
+
+        Args:
+            model: The model that failed
+            cooldown: Seconds to stop using the model right away (rate limits)
+        """
+        with self._lock:
+            self.breakers[model].record_failure(time.time(), cooldown)
+        self.preferred()
+
+    def reset(self):
+        """Close every breaker and forget latency samples, so pool order decides again."""
+        with self._lock:
+            for model in self.models:
+                self.breakers[model] = CircuitBreaker(self.breakers[model].failure_threshold,
+                                                      self.breakers[model].reset_timeout)
+                self.latency[model] = None
+                self._samples[model].clear()
+        # Pool order decides right away, without waiting for the dwell time
+        self._notify(self.models[0])
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the state worth keeping across restarts.
+
+        Returns:
+            Per model: breaker state, when an open breaker may probe again
+            (wall-clock time), consecutive failures and smoothed latency
+        """
+        with self._lock:
+            return {
+                model: {
+                    'state': breaker.state,
+                    'open_until': breaker.open_until,
+                    'consecutive_failures': breaker.consecutive_failures,
+                    'latency': self.latency[model]
+                }
+                for model, breaker in self.breakers.items()
+            }
+
+    def restore(self, snapshot: Dict[str, Dict[str, Any]]):
+        """
+        Reapply a snapshot taken by an earlier process.
+
+        Breakers whose cooldown is still running are reopened until the same
+        deadline; ones that would already be allowed to probe are left
+        closed. Models no longer in the pool are ignored.
+
+        Args:
+            snapshot: Value returned by ``snapshot``
+        """
+        now = time.time()
+        with self._lock:
+            for model, saved in snapshot.items():
+                breaker = self.breakers.get(model)
+                if breaker is None:
+                    continue
+                if saved.get('latency') is not None:
+                    self.latency[model] = float(saved['latency'])
+                if saved.get('state') != CircuitBreaker.CLOSED and saved.get('open_until', 0) > now:
+                    breaker.state = CircuitBreaker.OPEN
+                    breaker.open_until = float(saved['open_until'])
+                    breaker.consecutive_failures = int(saved.get('consecutive_failures', 0))
+        self.preferred()
+
+    def latency_percentile(self, model: str, percentile: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Get a percentile of a model's recent successful call latencies.
+
+        Args:
+            model: The model
+            percentile: Percentile as a fraction (e.g. 0.95)
+            min_samples: Samples needed before an estimate is returned
+
+        Returns:
+            Latency in seconds, or None if there are too few samples
+        """
+        with self._lock:
+            samples = sorted(self._samples[model])
+        if not samples or len(samples) < min_samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(percentile * len(samples)) - 1))
+        return samples[index]
+
+    def retry_in(self) -> float:
+        """Seconds until the first open breaker allows a probe again."""
+        now = time.time()
+        with self._lock:
+            waits = [breaker.open_until - now for breaker in self.breakers.values()
+                     if breaker.state == CircuitBreaker.OPEN]
+        return max(0.0, min(waits)) if waits else 0.0
+
+    def _notify(self, model: str):
+        with self._lock:
+            old = self._preferred
+            if old == model:
+                return
+            self._preferred = model
+            self._preferred_since = time.time()
+        if self.on_change:
+            self.on_change(old, model)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-model routing state.
+
+        Returns:
+            Breaker state, counters and smoothed latency for every model
+        """
+        now = time.time()
+        with self._lock:
+            return {
+                model: {
+                    'position': position,
+                    'state': breaker.state,
+                    'open_for_seconds': (round(max(0.0, breaker.open_until - now), 1)
+                                         if breaker.state == CircuitBreaker.OPEN else 0.0),
+                    'consecutive_failures': breaker.consecutive_failures,
+                    'successes': breaker.successes,
+                    'failures': breaker.failures,
+                    'times_opened': breaker.times_opened,
+                    'avg_latency_seconds': (round(self.latency[model], 3)
+                                            if self.latency[model] is not None else None),
+                    'latency_samples': len(self._samples[model])
+                }
+                for position, (model, breaker) in enumerate(self.breakers.items())
+            }
@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
 """
 Server Monitor for Abhishek Ambi's Portfolio Chatbot
-Monitors auto-restart and periodic request functionality
+Monitors auto-restart and periodic request functionality, and load tests
+the question endpoint
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import argparse
+import itertools
+import math
+import random
+import threading
 import time
 import json
+import os
+from collections import Counter
 from datetime import datetime
 import sys
 
@@ -101,6 +110,8 @@ def test_periodic_requests(base_url="https://ai-assistent-chatboot.onrender.com"
                 print(f"   Status: {data['status']}")
                 print(f"   Source: {data['response_source']}")
                 print(f"   Answer Length: {len(data['answer'])} characters")
+            elif response.status_code == 429:
+                print(f"   ⏳ Rate limited - retry after {response.headers.get('Retry-After')} seconds")
             else:
                 print(f"   ❌ Failed - Status: {response.status_code}")
                 
@@ -179,6 +190,297 @@ def trigger_restart(base_url="https://ai-assistent-chatboot.onrender.com"):
     except Exception as e:
         print(f"❌ Error triggering restart: {str(e)}")
 
+# Default question mix for load tests: (weight, question)
+LOAD_TEST_QUESTIONS = [
+    (4, "What are your technical skills?"),
+    (3, "Tell me about your projects"),
+    (2, "What is your background?"),
+    (2, "How can I contact you?"),
+    (1, "Give me career advice"),
+    (1, "Which projects use Flutter and Firebase?"),
+    (1, "What machine learning work has Abhishek done?")
+]
+
+def load_questions(path):
+    """
+    Read a question mix from a file.
+    
+    One question per line; a line may start with a weight and a tab
+    ("3<TAB>What are your skills?"). Blank lines and lines starting with
+    # are skipped.
+    
+    Returns:
+        List of (weight, question)
+    """
+    mix = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            weight, _, question = line.partition('\t')
+            try:
+                mix.append((float(weight), question.strip()))
+            except ValueError:
+                mix.append((1.0, line))
+    if not mix:
+        raise ValueError(f"No questions found in {path}")
+    return mix
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of already sorted values (None if empty)."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def run_load_test(base_url, concurrency=8, rate=None, duration=30, mix=None, endpoint="/ask",
+                  unique_fraction=0.0, timeout=60, max_requests=None, seed=None, api_keys=None):
+    """
+    Send questions to the server from concurrent workers and measure the responses.
+    
+    Each worker keeps one pooled keep-alive connection. With a rate, requests
+    are sent on a fixed schedule (open loop) and latency is measured from the
+    scheduled send time, so a server that falls behind cannot hide its queueing
+    delay; without one, every worker sends its next request as soon as the
+    previous one is answered (closed loop).
+    
+    The server rate limits each client, so from one machine most requests
+    would be refused with 429. Give every worker its own key with
+    ``api_keys`` (the server must list them in API_KEYS), or raise the
+    server's RATE_LIMIT_* settings for the run; 429s are reported apart
+    from errors either way.
+    
+    Args:
+        base_url: Server to test
+        concurrency: Number of worker threads (and connections)
+        rate: Requests per second across all workers (None sends as fast as possible)
+        duration: Seconds to keep sending
+        mix: List of (weight, question); defaults to LOAD_TEST_QUESTIONS
+        endpoint: Path the questions are POSTed to
+        unique_fraction: Fraction of questions made unique so they miss the answer caches
+        timeout: Seconds before a request counts as failed
+        max_requests: Stop after this many requests even if time is left
+        seed: Random seed for a reproducible question sequence
+        api_keys: X-API-Key values, one per worker (reused round robin if fewer)
+        
+    Returns:
+        Report dict (see summarize_load_test)
+    """
+    mix = mix or LOAD_TEST_QUESTIONS
+    weights = [weight for weight, _ in mix]
+    questions = [question for _, question in mix]
+    url = base_url.rstrip('/') + endpoint
+    
+    tickets = itertools.count()
+    results = []
+    results_lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + duration
+    
+    def worker(worker_id):
+        rng = random.Random(None if seed is None else seed + worker_id)
+        session = requests.Session()
+        session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        if api_keys:
+            session.headers['X-API-Key'] = api_keys[worker_id % len(api_keys)]
+        local = []
+        
+        while True:
+            ticket = next(tickets)
+            if max_requests is not None and ticket >= max_requests:
+                break
+            if rate:
+                scheduled = started + ticket / rate
+                if scheduled >= deadline:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                scheduled = time.perf_counter()
+                if scheduled >= deadline:
+                    break
+            
+            question = rng.choices(questions, weights)[0]
+            if unique_fraction and rng.random() < unique_fraction:
+                # A random tag, so the question misses both answer caches
+                tag = ' '.join(f"{rng.getrandbits(32):08x}" for _ in range(3))
+                question = f"{question} (load test {tag})"
+            
+            result = {'status': None, 'source': None, 'error': None, 'rate_limited': False}
+            try:
+                response = session.post(url, json={'question': question}, timeout=timeout)
+                result['status'] = response.status_code
+                if response.status_code == 200:
+                    result['source'] = response.json().get('response_source', 'unknown')
+                elif response.status_code == 429:
+                    result['rate_limited'] = True
+                else:
+                    result['error'] = f"HTTP {response.status_code}"
+            except (requests.exceptions.RequestException, ValueError) as e:
+                result['error'] = type(e).__name__
+            finished = time.perf_counter()
+            result['latency'] = finished - scheduled
+            result['finished'] = finished - started
+            local.append(result)
+        
+        session.close()
+        with results_lock:
+            results.extend(local)
+    
+    workers = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    return summarize_load_test(results, elapsed, {
+        'base_url': base_url,
+        'endpoint': endpoint,
+        'concurrency': concurrency,
+        'rate': rate,
+        'duration': duration,
+        'unique_fraction': unique_fraction,
+        'questions': len(mix),
+        'api_keys': len(api_keys) if api_keys else 0
+    })
+
+def summarize_load_test(results, elapsed, config):
+    """
+    Aggregate load test results.
+    
+    Returns:
+        Config, request counts, throughput, latency percentiles (seconds),
+        error breakdown, status codes and the response_source mix. Requests
+        refused by the server's rate limiter (429) are counted under
+        rate_limited, not as failures.
+    """
+    total = len(results)
+    rate_limited = sum(1 for result in results if result['rate_limited'])
+    failed = sum(1 for result in results if result['error'] is not None)
+    succeeded = [result for result in results if result['error'] is None and not result['rate_limited']]
+    latencies = sorted(result['latency'] for result in succeeded)
+    errors = Counter(result['error'] for result in results if result['error'] is not None)
+    sources = Counter(result['source'] for result in succeeded)
+    
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'config': config,
+        'elapsed_seconds': round(elapsed, 3),
+        'requests': total,
+        'succeeded': len(succeeded),
+        'failed': failed,
+        'rate_limited': rate_limited,
+        'error_rate': round(failed / total, 4) if total else 0.0,
+        'rate_limited_rate': round(rate_limited / total, 4) if total else 0.0,
+        'throughput_rps': round(len(succeeded) / elapsed, 2) if elapsed else 0.0,
+        'latency_seconds': {
+            'mean': round(sum(latencies) / len(latencies), 4) if latencies else None,
+            'p50': percentile(latencies, 0.50),
+            'p90': percentile(latencies, 0.90),
+            'p99': percentile(latencies, 0.99),
+            'max': latencies[-1] if latencies else None
+        },
+        'status_codes': {str(code): count for code, count in
+                         sorted(Counter(result['status'] or 'none' for result in results).items(), key=str)},
+        'errors': dict(errors.most_common()),
+        'response_sources': {source: {'count': count, 'share': round(count / len(succeeded), 4)}
+                             for source, count in sources.most_common()}
+    }
+
+def print_load_report(report, baseline=None):
+    """Print a load test report, with changes against a baseline report if given."""
+    
+    def ms(value):
+        return f"{value * 1000:9.1f} ms" if value is not None else "      n/a"
+    
+    def change(new, old, lower_is_better=True):
+        if baseline is None or new is None or not old:
+            return ""
+        delta = (new - old) / old * 100
+        better = delta < 0 if lower_is_better else delta > 0
+        return f"   ({delta:+.1f}% vs baseline{', better' if better else ', worse' if delta else ''})"
+    
+    config = report['config']
+    base = baseline or {}
+    base_latency = base.get('latency_seconds', {})
+    
+    print("\n📊 Load Test Report")
+    print("=" * 50)
+    print(f"Target: {config['base_url']}{config['endpoint']}")
+    print(f"Concurrency: {config['concurrency']}, rate: {config['rate'] or 'unlimited'} req/s, "
+          f"duration: {config['duration']}s, unique questions: {config['unique_fraction']:.0%}")
+    print()
+    print(f"Requests:     {report['requests']} in {report['elapsed_seconds']:.1f}s")
+    print(f"Throughput:   {report['throughput_rps']:.2f} req/s"
+          f"{change(report['throughput_rps'], base.get('throughput_rps'), lower_is_better=False)}")
+    print(f"Error rate:   {report['error_rate']:.2%} ({report['failed']} failed)"
+          f"{change(report['error_rate'], base.get('error_rate'))}")
+    print(f"Rate limited: {report['rate_limited_rate']:.2%} ({report['rate_limited']} got 429)")
+    if report['rate_limited']:
+        print("   ⚠️ The server's rate limiter refused requests: pass --api-keys listed in its "
+              "API_KEYS, or raise its RATE_LIMIT_* settings for the run")
+    print()
+    print("Latency:")
+    for key in ('mean', 'p50', 'p90', 'p99', 'max'):
+        value = report['latency_seconds'][key]
+        print(f"   {key:<5} {ms(value)}{change(value, base_latency.get(key))}")
+    print()
+    print("Status codes: " + ", ".join(f"{code}: {count}" for code, count in report['status_codes'].items()))
+    if report['errors']:
+        print("Errors: " + ", ".join(f"{error}: {count}" for error, count in report['errors'].items()))
+    print("Response sources:")
+    for source, stats in report['response_sources'].items():
+        print(f"   {source:<18} {stats['count']:>7}  {stats['share']:.1%}")
+
+def load_test_main(argv, default_url):
+    """Command line entry point for the load test subcommand."""
+    parser = argparse.ArgumentParser(prog="monitor_server.py load",
+                                     description="Load test the question endpoint")
+    parser.add_argument('base_url', nargs='?', default=default_url)
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help="worker threads / connections")
+    parser.add_argument('-r', '--rate', type=float, default=None, help="requests per second (default: unlimited)")
+    parser.add_argument('-d', '--duration', type=float, default=30, help="seconds to send requests")
+    parser.add_argument('-n', '--requests', type=int, default=None, help="stop after this many requests")
+    parser.add_argument('-q', '--questions', help="question file (one per line, optional 'weight<TAB>' prefix)")
+    parser.add_argument('-u', '--unique-fraction', type=float, default=0.0,
+                        help="fraction of questions made unique to miss the caches")
+    parser.add_argument('--endpoint', default="/ask")
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('-k', '--api-keys', default=os.getenv('LOAD_TEST_API_KEYS', ''),
+                        help="comma separated X-API-Key values, one per worker (must be in the server's API_KEYS)")
+    parser.add_argument('--json', dest='json_path', help="write the report as JSON ('-' for stdout only)")
+    parser.add_argument('--baseline', help="JSON report of an earlier run to compare against")
+    args = parser.parse_args(argv)
+    
+    mix = load_questions(args.questions) if args.questions else None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    
+    if args.json_path != '-':
+        print(f"🚀 Load testing {args.base_url}{args.endpoint} for {args.duration:g}s "
+              f"with {args.concurrency} workers...")
+    report = run_load_test(args.base_url, concurrency=args.concurrency, rate=args.rate,
+                           duration=args.duration, mix=mix, endpoint=args.endpoint,
+                           unique_fraction=args.unique_fraction, timeout=args.timeout,
+                           max_requests=args.requests, seed=args.seed,
+                           api_keys=[key.strip() for key in args.api_keys.split(',') if key.strip()])
+    
+    if args.json_path == '-':
+        print(json.dumps(report, indent=2))
+        return
+    print_load_report(report, baseline)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.json_path}")
+
 def main():
     """Main function with command line interface."""
     
@@ -188,9 +490,14 @@ def main():
         print("  python monitor_server.py test       # Test periodic requests")
         print("  python monitor_server.py toggle     # Toggle features")
         print("  python monitor_server.py restart    # Trigger manual restart")
+        print("  python monitor_server.py load [url] [options]   # Load test /ask (--help for options)")
         return
     
     command = sys.argv[1].lower()
+    if command == "load":
+        # Load tests target a local server by default, never the deployed one
+        load_test_main(sys.argv[2:], "http://localhost:7860")
+        return
     base_url = sys.argv[2] if len(sys.argv) > 2 else "https://ai-assistent-chatboot.onrender.com"
     
     if command == "monitor":
@@ -203,7 +510,7 @@ def main():
         trigger_restart(base_url)
     else:
         print(f"Unknown command: {command}")
-        print("Available commands: monitor, test, toggle, restart")
+        print("Available commands: monitor, test, toggle, restart, load")
 
 if __name__ == "__main__":
     main()
@@ -1,42 +1,202 @@
 import os
 import json
 import time
-from typing import Dict, Any, Optional
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures import wait as wait_futures
+from types import MappingProxyType
+from typing import Dict, Any, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple
 from dotenv import load_dotenv
-from langchain_core.prompts import PromptTemplate
 from langchain.chains import LLMChain
 from langchain_groq import ChatGroq
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain.globals import set_debug, set_verbose
+from groq import DefaultHttpxClient, DefaultAsyncHttpxClient
+from answer_cache import AnswerCache, RewordedAnswerCache, normalize_question
+from warm_answers import WarmAnswerStore
+from knowledge_base import KNOWLEDGE_BASE, SYSTEM_PROMPT, KnowledgeRetriever, estimate_tokens
+from rate_limits import UsageTracker, UsageCallbackHandler
+from model_router import ModelRouter
+from single_flight import SingleFlight
+from conversation_memory import ConversationMemory
+from chat_prompt import StaticPrefixPrompt
+from state_store import StateStore
+from metrics import MODEL_SWITCHES, UPSTREAM_RATE_LIMITS, UPSTREAM_SECONDS
+import tracing
+from fake_llm import FakeChatModel, options_for, parse_options
+from chatbot_common import STREAM_RESET, UpstreamError, AnswerTimeout
 
 # Load environment variables
 load_dotenv()
 
+# Fixed questions behind the canned helper methods, precomputed by the warm answer store
+CANNED_QUESTIONS = {
+    'list_projects': "List all my projects with their technologies",
+    'get_tech_recommendation': "Based on my portfolio, which technologies should I focus on for career growth?",
+    'get_skills_summary': "Summarize my technical skills based on my projects",
+    'get_background_info': "Tell me about Abhishek's background, education, and professional journey",
+    'get_career_advice': "Based on my portfolio and experience, what career advice would you give me?",
+    'get_contact_info': "How can someone contact Abhishek or learn more about his work?",
+    'get_project_recommendations': "Based on my current portfolio, what types of projects should I consider working on next?"
+}
+
+
+# Ordered model pool used when neither the constructor nor GROQ_MODELS sets one
+DEFAULT_MODELS = ["gemma2-9b-it", "compound-beta-mini"]
+
+
+class ModelChain(NamedTuple):
+    """Immutable chat model and chain for one model, built once at startup."""
+    model: str
+    llm: BaseChatModel
+    chain: LLMChain
+
+
 class PortfolioChatbot:
     """
     A personalized AI assistant for Abhishek Ambi's portfolio
     that can answer questions about projects and provide career advice.
     """
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gemma2-9b-it", debug: bool = False):
+    def __init__(self, api_key: Optional[str] = None, model: str = "gemma2-9b-it", debug: bool = False,
+                 cache_size: int = 256, cache_ttl: float = 3600,
+                 reworded_cache_size: int = 512,
+                 prewarm: bool = False, warm_refresh_interval: float = 1800,
+                 use_retrieval: bool = True, retrieval_top_k: int = 6, context_token_budget: int = 1200,
+                 model_limits: Optional[Dict[str, Dict[str, Optional[int]]]] = None,
+                 max_budget_wait: float = 5.0, expected_completion_tokens: int = 512,
+                 models: Optional[List[str]] = None, failure_threshold: int = 3,
+                 breaker_reset_timeout: float = 30, rate_limit_cooldown: float = 60,
+                 hedge_percentile: Optional[float] = None, hedge_max_fraction: float = 0.1,
+                 hedge_min_samples: int = 20, upstream_timeout: float = 60,
+                 max_overdue_calls: int = 32, request_threads: int = 64, store_path: Optional[str] = None,
+                 store_max_entries: int = 2000, llm_backend: Optional[str] = None,
+                 fake_llm_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                 max_sessions: int = 10000, session_idle_timeout: float = 1800,
+                 history_token_budget: int = 600, summary_token_budget: int = 150):
         """
         Initialize the portfolio chatbot.
         
         Args:
             api_key: Groq API key (if not provided, will try to get from environment)
-            model: LLM model to use
+            model: Preferred LLM model (first in the pool)
             debug: Enable debug mode for LangChain
+            cache_size: Maximum number of cached answers (0 disables caching)
+            cache_ttl: Seconds a cached answer stays valid
+            reworded_cache_size: Maximum number of answers kept for reworded questions (0 disables it)
+            prewarm: Precompute the canned helper answers in the background at startup
+            warm_refresh_interval: Seconds between background refreshes of the canned answers
+            use_retrieval: Only send the knowledge base sections relevant to each question
+            retrieval_top_k: Maximum number of knowledge base sections per prompt
+            context_token_budget: Maximum estimated knowledge tokens per prompt
+            model_limits: Per-model 'tokens_per_minute' / 'tokens_per_day' limits (defaults to Groq free tier)
+            max_budget_wait: Longest delay (seconds) accepted to stay on a model before routing elsewhere
+            expected_completion_tokens: Completion size assumed when checking the token budget
+            models: Ordered model pool to fail over through (defaults to GROQ_MODELS or DEFAULT_MODELS)
+            failure_threshold: Consecutive errors that open a model's circuit breaker
+            breaker_reset_timeout: Seconds a breaker stays open before a probe request
+            rate_limit_cooldown: Seconds a rate-limited model is skipped when the provider gives no Retry-After
+            hedge_percentile: Send a slow request to a second model once it takes longer than this
+                              latency percentile of its model (e.g. 0.95; None disables hedging)
+            hedge_max_fraction: Maximum fraction of the last 200 hedge-eligible requests that may be hedged
+            hedge_min_samples: Latency samples a model needs before its requests are hedged
+            upstream_timeout: Seconds before a single upstream HTTP call is abandoned
+            max_overdue_calls: Upstream calls allowed to keep running after their request's deadline
+                               passed; beyond that, requests with a deadline time out immediately
+            request_threads: Requests the server handles at once (sizes the upstream call pools)
+            store_path: SQLite file that keeps answers and model cooldowns across restarts (None disables it)
+            store_max_entries: Maximum number of answers kept in the store
+            llm_backend: 'groq', or 'fake' for the local simulated model (defaults to LLM_BACKEND or 'groq')
+            fake_llm_options: Options for the fake model by model name ('' for all models);
+                              defaults to FAKE_LLM_OPTIONS (see fake_llm.parse_options)
+            max_sessions: Maximum number of conversations remembered for follow-up questions (0 disables them)
+            session_idle_timeout: Seconds after which an unused conversation is forgotten
+            history_token_budget: Maximum estimated tokens of recent turns added to a follow-up prompt
+            summary_token_budget: Maximum estimated tokens of the summary of older turns
         """
+        self.llm_backend = (llm_backend or os.getenv('LLM_BACKEND') or 'groq').lower()
+        if self.llm_backend not in ('groq', 'fake'):
+            raise ValueError(f"Unknown LLM backend: {self.llm_backend} (expected 'groq' or 'fake')")
+        self.fake_llm_options = (fake_llm_options if fake_llm_options is not None
+                                 else parse_options(os.getenv('FAKE_LLM_OPTIONS', '')))
+        
         self.api_key = api_key or os.getenv('GROQ_API_KEY')
-        if not self.api_key:
+        if not self.api_key and self.llm_backend != 'fake':
             raise ValueError("API key not found. Please set GROQ_API_KEY environment variable or pass it directly.")
         
-        self.original_model = model
-        self.current_model = model
-        self.llm = ChatGroq(model=model, api_key=self.api_key)
+        # Per-model token accounting for pre-emptive routing
+        self.usage = UsageTracker(model_limits)
+        self.max_budget_wait = max_budget_wait
+        self.expected_completion_tokens = expected_completion_tokens
+        
+        # Ordered model pool with a circuit breaker per model
+        if models is None:
+            env_models = [name.strip() for name in os.getenv('GROQ_MODELS', '').split(',') if name.strip()]
+            models = env_models or [model] + [name for name in DEFAULT_MODELS if name != model]
+        self.rate_limit_cooldown = rate_limit_cooldown
+        self.router = ModelRouter(models, failure_threshold=failure_threshold,
+                                  reset_timeout=breaker_reset_timeout)
+        self.original_model = self.router.models[0]
+        
+        # Answer caches for repeated and rephrased questions
+        self.answer_cache = AnswerCache(max_size=cache_size, ttl=cache_ttl)
+        self.reworded_cache = RewordedAnswerCache(max_size=reworded_cache_size, ttl=cache_ttl)
         
-        # Model switching variables
-        self.model_switch_time = None
-        self.switch_duration = 1800  # 30 minutes in seconds
+        # Hedged requests: a second model races a primary call that is slower than usual
+        self.hedge_percentile = hedge_percentile
+        self.hedge_max_fraction = hedge_max_fraction
+        self.hedge_min_samples = hedge_min_samples
+        self._hedge_window: deque = deque(maxlen=200)
+        self._hedged_in_window = 0
+        self._hedge_lock = threading.Lock()
+        self.hedge_eligible = 0
+        self.hedged = 0
+        self.hedges_capped = 0
+        self.hedge_backup_wins = 0
+        self.hedge_primary_wins = 0
+        
+        # Requests with a deadline run their upstream call on a bounded pool,
+        # with room for one call per request thread plus the calls that
+        # outlived their deadline; only the latter are capped, so calls
+        # still within their deadline never count against a slow provider
+        self.upstream_timeout = upstream_timeout
+        self.max_overdue_calls = max_overdue_calls
+        self.request_threads = request_threads
+        self._deadline_executor = ThreadPoolExecutor(max_workers=request_threads + max_overdue_calls,
+                                                     thread_name_prefix="deadline")
+        # Every call that may be running has room for its primary and its
+        # hedge, so a hedged call is not queued behind other requests' calls
+        self._hedge_executor = ThreadPoolExecutor(max_workers=2 * (request_threads + max_overdue_calls),
+                                                  thread_name_prefix="hedge")
+        self._deadline_lock = threading.Lock()
+        self._overdue: Set[Future] = set()
+        self.deadline_timeouts = 0
+        self.deadline_overflows = 0
+        
+        # Concurrent identical questions share one upstream call
+        self.inflight = SingleFlight()
+        
+        # Recent turns of each chat session, for answering follow-up questions
+        self.conversations = ConversationMemory(max_sessions=max_sessions, idle_timeout=session_idle_timeout,
+                                                window_tokens=history_token_budget,
+                                                summary_tokens=summary_token_budget)
+        
+        # Answers and model cooldowns that survive restarts, written in the background
+        self.store = (StateStore(store_path, max_entries=store_max_entries, ttl=cache_ttl)
+                      if store_path else None)
+        
+        # Knowledge base retrieval (None sends the whole knowledge base every time)
+        self.retriever = (KnowledgeRetriever(top_k=retrieval_top_k, token_budget=context_token_budget)
+                          if use_retrieval else None)
+        
+        # Precomputed answers for the canned helper questions, also stored like
+        # any other answer so worker processes that do not warm can share them
+        self.warm_answers = WarmAnswerStore(CANNED_QUESTIONS,
+                                            self._warm_answer,
+                                            refresh_interval=warm_refresh_interval)
+        self.worker_id: Optional[str] = None
         
         # Set debug mode if requested
         if debug:
@@ -45,315 +205,977 @@ class PortfolioChatbot:
         
         # Initialize the chain
         self._setup_chain()
+        self.router.on_change = self._switch_model
+        self._load_state()
+        
+        if prewarm:
+            self.warm_answers.start()
     
     def _setup_chain(self):
-        """Setup the LangChain with prompt template."""
-        self.prompt_template = PromptTemplate(
-            input_variables=['user_input'],
-            template=self._get_prompt_template()
-        )
+        """Setup the LangChain with a static system message and a small per-question user message."""
+        # The system message is rendered and measured once and the same
+        # message is sent with every request, so the long start of every
+        # prompt is byte-identical and can be served from a provider's
+        # prompt cache; only the user message is formatted per question
+        self.prompt_template = StaticPrefixPrompt.build(self._get_system_prompt(), self._get_user_template())
+        self._system_tokens = self.prompt_template.static_tokens
+        self._template_tokens = self._system_tokens + estimate_tokens(self.prompt_template.user_template)
+        
+        # One chain per model, never mutated after this point; switching
+        # models only swaps the reference in self._active
+        chains = {}
+        for model in self.router.models:
+            llm = self._make_llm(model)
+            chains[model] = ModelChain(model, llm, LLMChain(llm=llm, prompt=self.prompt_template))
+        self._model_chains: Mapping[str, ModelChain] = MappingProxyType(chains)
+        self._active = self._model_chains[self.original_model]
+    
+    @property
+    def current_model(self) -> str:
+        """The preferred model new requests are routed to first."""
+        return self._active.model
+    
+    @property
+    def llm(self) -> BaseChatModel:
+        """Chat model of the preferred model."""
+        return self._active.llm
+    
+    @property
+    def chain(self) -> LLMChain:
+        """Chain of the preferred model."""
+        return self._active.chain
+    
+    def _llm_for(self, model: str) -> BaseChatModel:
+        """Get the prebuilt chat model for a model name."""
+        return self._model_chains[model].llm
+    
+    def _chain_for(self, model: str) -> LLMChain:
+        """Get the prebuilt chain for a model name."""
+        return self._model_chains[model].chain
+    
+    def _make_llm(self, model: str) -> BaseChatModel:
+        """Create the chat model, recording its token usage and rate-limit headers."""
+        if self.llm_backend == 'fake':
+            return FakeChatModel(model_name=model, options=options_for(model, self.fake_llm_options),
+                                 callbacks=[UsageCallbackHandler(self.usage, model)])
+        
+        def record_headers(response):
+            self.usage.record_headers(model, response.headers)
         
-        self.chain = LLMChain(
-            llm=self.llm,
-            prompt=self.prompt_template,
+        async def arecord_headers(response):
+            self.usage.record_headers(model, response.headers)
+        
+        return ChatGroq(
+            model=model,
+            api_key=self.api_key,
+            timeout=self.upstream_timeout,
+            callbacks=[UsageCallbackHandler(self.usage, model)],
+            http_client=DefaultHttpxClient(event_hooks={'response': [record_headers]}),
+            http_async_client=DefaultAsyncHttpxClient(event_hooks={'response': [arecord_headers]})
         )
     
-    def _get_prompt_template(self) -> str:
-        """Get the prompt template with system and knowledge base."""
-        return '''
-system_prompt:
-I am Abhishek Ambi's AI assistant, designed to provide accurate, clear, and contextual answers about his portfolio and career. 
-
-RESPONSE GUIDELINES:
-• Always provide responses in clear, organized bullet points
-• Use numbered lists for sequential information
-• Structure information logically with headers
-• Be concise but comprehensive
-• If asked about something not in my knowledge base, acknowledge it and provide related information
-• For unknown facts, say "I don't have specific information about [topic], but based on Abhishek's background, I can tell you..."
-
-My primary objectives are to:
-• Provide detailed information about Abhishek's projects and technical skills
-• Offer career advice based on his expertise and experience
-• Answer questions about his full-stack development capabilities
-• Assist with portfolio-related inquiries
-• Share information about his background, education, and professional journey
-• Handle unknown topics gracefully by providing related context
-
-ABOUT ABHISHEK:
-Final year computer science student with practical experience in software development, data analysis, machine learning and computer vision through academic projects. Interested in using code and insights to solve real-world problems. Seeking to join a forward-thinking organization that supports innovation, mentorship, and lifelong learning while gaining worthwhile industry experience.
-knowledge_prompt:
-PERSONAL BACKGROUND:
-Abhishek Gangappa Ambi is a final year computer science student with practical experience in software development, data analysis, machine learning and computer vision through academic projects. He is passionate about creating innovative digital solutions and combines technical expertise with creative problem-solving to deliver exceptional user experiences.
-
-**Personal Journey**:
-- Born and raised in Mahalingpur, Karnataka
-- Started educational journey at Jaycee English Medium School
-- Completed SSLC in 2020 with 64% marks
-- Pursued Diploma in Computer Science (2020-2023) with excellent performance (9.83 CGPA)
-- Currently pursuing BE in Computer Science with strong academic record (8.26 CGPA)
-- Passionate about technology and continuous learning
-
-**Personal Traits**:
-- Dedicated and hardworking individual
-- Strong problem-solving mindset
-- Enjoys learning new technologies
-- Team player with good communication skills
-- Detail-oriented and quality-focused
-- Self-motivated and goal-driven
-
-EDUCATION:
-1. RV INSTITUTE OF TECHNOLOGY AND MANAGEMENT BENGALURU
-   - BE in Computer Science & Engineering
-   - CGPA: 8.26
-   - Duration: 2023 - 2026
-
-2. K.L.E.SOCIETY'S POLYTECHNIC MAHALINGAPUR
-   - Diploma in Computer Science & Engineering
-   - CGPA: 9.83
-   - Duration: 2020 - 2023
-
-3. JAYCEE ENGLISH MEDIUM SCHOOL MAHALINGPUR
-   - SSLC (10th Standard)
-   - Percentage: 64%
-   - Passout Year: 2020
-   - Location: Mahalingpur, Karnataka
-
-CERTIFICATIONS & ACTIVITIES:
-- Continuous learning through online courses and certifications
-- Active participation in coding communities and hackathons
-- Academic projects in machine learning and computer vision
-
-PERSONAL INTERESTS & HOBBIES:
-- **Coding & Programming**: Passionate about writing code, solving problems, and building applications
-- **Reading**: Enjoys reading technical books, programming documentation, and educational content
-- **Testing & Quality Assurance**: Interested in software testing, debugging, and ensuring code quality
-- **Learning New Technologies**: Constantly exploring new programming languages, frameworks, and tools
-- **Problem Solving**: Enjoys tackling complex technical challenges and finding innovative solutions
-- **Open Source Contribution**: Interested in contributing to open-source projects and developer communities
-- **Technical Writing**: Creating documentation, tutorials, and sharing knowledge with others
-- **Algorithm Practice**: Regular practice of data structures and algorithms for skill improvement
-- **Project Building**: Creating personal projects to apply and showcase technical skills
-- **Networking**: Connecting with fellow developers and tech professionals
-
-PROFESSIONAL EXPERIENCE:
-- Full-stack development with focus on MERN stack
-- Mobile app development using React Native and Android Studio
-- Experience in both frontend and backend development
-- Project management and client communication skills
-- Academic projects in machine learning and computer vision
-- Data analysis and insights generation
-
-PROJECT PORTFOLIO:
-
-1. Meeting House
-   - Technology: MERN Stack (MongoDB, Express.js, React, Node.js)
-   - Description: Developed an online meeting application with user authentication, 
-     event management, and resource sharing for seamless collaboration.
-   - Features: Real-time communication, user management, event scheduling, 
-     virtual meeting rooms, participant management, meeting recording capabilities
-   - Impact: Streamlined remote collaboration for teams and organizations
-
-2. Shri Vagdevi Construction (Real Time Project)
-   - Technology: MERN Stack (MongoDB, Express.js, React, Node.js)
-   - Website: shrivagdeviconstructions.com
-   - Description: A professional civil engineering and construction firm website dedicated to delivering high-quality residential and commercial projects with precision and reliability.
-   - Features: Modern responsive design, project galleries, client testimonials, contact forms,
-     content management system, smooth front-end and back-end interaction,
-     service booking, project portfolio, team information, contact management
-   - Impact: Professional online presence for construction business
-
-3. Quick Eats
-   - Technology: React Native, Express.js, MongoDB
-   - Description: A hybrid app for a cloud kitchen designed to manage both online delivery and walk-in/takeaway services.
-   - Features: User authentication, order management, payment integration,
-     real-time order tracking, restaurant listings, menu management, delivery scheduling
-   - Impact: Complete food delivery solution for restaurants and customers
-
-4. Plant Disease Detection
-   - Technology: Machine Learning, Android, VSCode, React Native/Flutter
-   - Description: Building a plant disease detection system using machine learning and mobile technologies.
-   - Features: Image processing, disease classification, mobile interface, real-time detection
-   - Impact: Agricultural technology solution for farmers and gardeners
-
-5. Object Detection
-   - Technology: YOLOv5, Python, Computer Vision
-   - Description: YOLOv5 (You Only Look Once version 5) is a powerful real-time object detection model known for its speed and accuracy.
-   - Features: Real-time object detection, high accuracy, fast processing, multiple object classes
-   - Impact: Computer vision applications in various domains
-
-6. Path Finder
-   - Technology: React
-   - Description: Created a web application to visualize pathfinding algorithms
-   - Features: Dijkstra's, DFS, BFS, A* algorithms visualization for finding shortest paths,
-     interactive grid system, algorithm comparison, step-by-step visualization
-   - Impact: Educational tool for understanding algorithm concepts
-
-7. Todo List
-   - Technology: Java
-   - Description: Created a Java application for managing tasks
-   - Features: Straightforward interface to boost productivity, task categorization,
-     priority levels, due date management, progress tracking
-   - Impact: Simple yet effective task management solution
-
-8. C-Tutor
-   - Technology: Augmented Reality (AR), Mobile Development
-   - Description: Augmented Reality (AR) application transforming education by creating immersive and interactive learning experiences that engage students and enhance comprehension.
-   - Features: AR visualization, interactive learning modules, educational content
-   - Impact: Enhanced educational experience through immersive technology
-
-9. Online Medicine Store
-   - Technology: React, Node.js, MongoDB
-   - Description: Designed a web application for online medicine purchasing
-   - Features: Simple cart system, product management, secure transactions,
-     prescription upload, medicine search, inventory management, delivery tracking
-   - Impact: Healthcare accessibility through digital platform
-
-TECHNICAL SKILLS:
-
-Programming Languages:
-- Python (Data Analysis, Machine Learning, Computer Vision)
-- Java (Core & Advanced, Android Development)
-- JavaScript (ES6+, Frontend & Backend)
-- C++ (System Programming)
-- PHP (Web Development)
-
-Frontend Technologies:
-- React.js (Advanced)
-- React Native (Mobile Development)
-- Angular (Frontend Framework)
-- HTML5, CSS3
-- Bootstrap (CSS Framework)
-- Tailwind CSS (Utility-first CSS)
-
-Backend Technologies:
-- Node.js (Advanced)
-- Express.js (RESTful APIs)
-- API Development & Integration
-
-Database & Storage:
-- MongoDB (NoSQL)
-- MySQL (Relational Database)
-- Database Design & Optimization
-- Data Modeling
-
-Mobile Development:
-- Android Studio
-- Java for Android
-- React Native
-- Flutter (Cross-platform)
-- Mobile App Architecture
-
-Machine Learning & AI:
-- YOLOv5 (Object Detection)
-- Computer Vision
-- Data Analysis
-- Machine Learning Algorithms
-
-Development Tools & Practices:
-- Git & GitHub (Version Control)
-- VS Code, Eclipse, Postman
-- RESTful API Design
-- Agile Development Methodology
-- Code Review & Testing
-
-Design & Creative Tools:
-- Canva (Graphic Design)
-- Photoshop (Image Editing)
-- Blender (3D Modeling)
-- After Effects (Video Editing)
-
-CAREER FOCUS AREAS:
-- Full-Stack Web Development
-- Mobile App Development
-- API Development
-- Database Design
-- Machine Learning & Computer Vision
-- Data Analysis & Insights
-- User Experience Optimization
-- Performance Optimization
-- Security Implementation
-- Augmented Reality (AR) Development
-
-PROFESSIONAL VALUES:
-- Clean, maintainable code
-- User-centered design
-- Performance optimization
-- Security best practices
-- Continuous learning
-- Problem-solving approach
-- Team collaboration
-
-CONTACT & NETWORKING:
-- Portfolio Website: https://www.abhishekambi.info/
-- Email: abhishekambi2003@gmail.com
-- LinkedIn: linkedin.com/in/abhishekambi2003
-- GitHub: github.com/CSEStudentAbhi
-- Professional networking through LinkedIn and GitHub
-- Active participation in developer communities
-- Open to collaboration and new opportunities
-
+    def _get_system_prompt(self) -> str:
+        """
+        Get the static system message: the system prompt and, without
+        retrieval, the whole knowledge base.
+        """
+        if self.retriever is not None:
+            return SYSTEM_PROMPT
+        return SYSTEM_PROMPT + f"knowledge_prompt:\n{KNOWLEDGE_BASE}\n"
+    
+    def _get_user_template(self) -> str:
+        """Get the user message template with slots for the retrieved knowledge and the conversation."""
+        return '''{context}{history}
 User Query: "{user_input}"
 
 Answer:
 '''
     
-    def _switch_model(self, new_model: str):
-        """Switch to a different model."""
+    def _chain_inputs(self, question: str, history: str = "", recent: str = "") -> Dict[str, str]:
+        """
+        Build the chain inputs for a question.
+        
+        With retrieval enabled the relevant knowledge base sections go in
+        the user message; otherwise the whole knowledge base is already
+        part of the system message and the context is empty. For a
+        follow-up question the latest turns (``recent``) are searched
+        along with it, so "tell me more about the second one" retrieves
+        what the conversation was about.
+        """
+        if self.retriever is not None:
+            query = f"{question}\n{recent}" if recent else question
+            context = f"knowledge_prompt:\n{self.retriever.build_context(query)}\n"
+        else:
+            context = ""
+        if history:
+            history = f"\nConversation so far (use it to resolve follow-up questions):\n{history}\n"
+        return {"context": context, "history": history, "user_input": question}
+    
+    def get_retrieval_report(self) -> Dict[str, Any]:
+        """
+        Get the knowledge retrieval report.
+        
+        Returns:
+            Average knowledge tokens sent and saved per request, and the
+            size of the static system message
+        """
+        if self.retriever is None:
+            return {'enabled': False, 'system_prompt_tokens': self._system_tokens}
+        return {'enabled': True, 'system_prompt_tokens': self._system_tokens, **self.retriever.report()}
+    
+    def _load_state(self):
+        """Reload the answers and model cooldowns persisted by a previous run."""
+        if self.store is None:
+            return
+        
+        answers = self.store.load_answers(limit=max(self.answer_cache.max_size, self.reworded_cache.max_size))
+        for question, model, answer, stored_at in answers:
+            self.answer_cache.set(question, model, answer, stored_at)
+            self.reworded_cache.set(question, model, answer, stored_at)
+        
+        router_state = self.store.load_state('router')
+        if router_state:
+            self.router.restore(router_state)
+        
+        cooling_down = [model for model, route in self.router.stats().items() if route['state'] != 'closed']
+        print(f"💾 Restored {len(answers)} cached answers from {self.store.path}" +
+              (f", still cooling down: {', '.join(cooling_down)}" if cooling_down else ""))
+    
+    def before_fork(self):
+        """
+        Release what forked worker processes cannot share; call in the parent before forking.
+        
+        Background threads and SQLite connections do not survive a fork, so
+        the warm refresh is stopped and the store closed (its queued writes
+        are flushed first). Each worker then calls ``after_fork``.
+        """
+        self.warm_answers.stop()
+        if self.store is not None:
+            self.store.close()
+    
+    def after_fork(self, worker_index: int, prewarm: bool = True, usage_sync_interval: float = 1.0):
+        """
+        Set up a worker process forked from a parent that called ``before_fork``.
+        
+        The worker reopens the store, which it shares with the other workers:
+        answers any of them stored are found on a cache miss, and their token
+        usage is exchanged every ``usage_sync_interval`` seconds so the
+        workers respect one shared token budget. Only the first worker warms
+        the canned answers.
+        
+        Args:
+            worker_index: Index of this worker (0 for the first one)
+            prewarm: Precompute the canned answers (in the first worker only)
+            usage_sync_interval: Seconds between token usage exchanges with the other workers
+        """
+        self.worker_id = f"worker-{worker_index}-{os.getpid()}"
+        if self.store is not None:
+            self.store = self.store.reopen()
+            threading.Thread(target=self._share_usage, args=(usage_sync_interval,),
+                             name="usage-sync", daemon=True).start()
+        if prewarm and worker_index == 0:
+            self.warm_answers.start()
+    
+    def _share_usage(self, interval: float):
+        """Background loop: publish this worker's token usage and read the others'."""
+        while True:
+            try:
+                self.store.save_usage(self.worker_id, self.usage.snapshot())
+                self.usage.set_peer_usage(self.store.load_peer_usage(self.worker_id))
+            except Exception as e:
+                print(f"⚠️ Could not share token usage: {e}")
+            time.sleep(interval)
+    
+    def _save_model_state(self):
+        """Queue the router's breaker state for the store."""
+        if self.store is not None:
+            self.store.save_state('router', self.router.snapshot())
+    
+    def _switch_model(self, old_model: Optional[str], new_model: str):
+        """Make a different model the preferred one (called by the router when it changes)."""
         try:
-            self.current_model = new_model
-            self.llm = ChatGroq(model=new_model, api_key=self.api_key)
-            self._setup_chain()
+            # A single reference assignment, so concurrent readers see either
+            # the old or the new model's chain, never a mix of both
+            self._active = self._model_chains[new_model]
+            MODEL_SWITCHES.inc(new_model)
             print(f"🔄 Switched to model: {new_model}")
+            # Warm answers are only recomputed when the old model stopped
+            # answering, not when the new one merely became faster
+            if old_model is not None and not self.router.is_available(old_model):
+                self.warm_answers.request_refresh()
+            self._save_model_state()
         except Exception as e:
             print(f"❌ Error switching model: {e}")
     
-    def _check_and_switch_back(self):
-        """Check if it's time to switch back to the original model."""
-        if (self.model_switch_time and 
-            time.time() - self.model_switch_time >= self.switch_duration and
-            self.current_model != self.original_model):
+    def ask(self, question: str, use_cache: bool = True, timeout: Optional[float] = None,
+            session_id: Optional[str] = None) -> str:
+        """
+        Ask a question to the portfolio chatbot.
+        
+        Concurrent calls with the same question (after normalization) wait
+        for a single upstream call and share its answer. Follow-up questions
+        in a session that already has history are answered with that history
+        in the prompt, so they bypass the answer caches.
+        
+        Args:
+            question: The user's question
+            use_cache: Serve repeated or rephrased questions from the answer caches
+            timeout: Deadline in seconds (None waits as long as the upstream call takes)
+            session_id: Conversation the question belongs to (None answers it on its own)
+            
+        Returns:
+            The AI assistant's response
+            
+        Raises:
+            AnswerTimeout: If the deadline passed first; the upstream call keeps
+                           running in the background and its answer is cached
+        """
+        history, recent = self._session_history(session_id)
+        if use_cache and not history:
+            with tracing.span('cache'):
+                cached = self._cached_answer(question)
+            if cached is not None:
+                return self.record_turn(session_id, question, cached)
+        
+        if history:
+            # The answer depends on this conversation, so it is neither shared nor cached
+            def answer():
+                return self._generate(question, history, recent)[0]
+        else:
+            key = self._inflight_key(question)
             
-            self._switch_model(self.original_model)
-            self.model_switch_time = None
-            print(f"🔄 Switched back to original model: {self.original_model}")
+            def answer():
+                return self._remember(question, *self._generate(question))
+        
+        try:
+            if timeout is None:
+                reply = answer() if history else self.inflight.do(key, answer)
+            else:
+                self._check_overdue()
+                # Callers joining an identical call in flight only wait on its
+                # future; they take no pool thread of their own
+                future = (self._deadline_executor.submit(tracing.bind(answer)) if history
+                          else self.inflight.submit(key, tracing.bind(answer), self._deadline_executor))
+                reply = self._wait_with_deadline(future, timeout)
+        except UpstreamError as e:
+            return str(e)
+        return self.record_turn(session_id, question, reply)
+    
+    def _check_overdue(self):
+        """Refuse a request with a deadline while too many calls are running past theirs."""
+        with self._deadline_lock:
+            if len(self._overdue) >= self.max_overdue_calls:
+                self.deadline_overflows += 1
+                raise AnswerTimeout("Too many upstream calls are already running past their deadline")
     
-    def ask(self, question: str) -> str:
+    def _wait_with_deadline(self, future: Future, timeout: float) -> str:
+        """Wait at most ``timeout`` seconds for an upstream call, counting it as overdue if it runs on."""
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._deadline_lock:
+                self.deadline_timeouts += 1
+                # A call shared by several callers is counted once
+                overdue = future not in self._overdue
+                if overdue:
+                    self._overdue.add(future)
+            if overdue:
+                future.add_done_callback(self._overdue_done)
+            raise AnswerTimeout(f"No answer within {timeout:g} seconds")
+    
+    def _overdue_done(self, future: Future):
+        with self._deadline_lock:
+            self._overdue.discard(future)
+    
+    async def ask_async(self, question: str, use_cache: bool = True, timeout: Optional[float] = None,
+                        session_id: Optional[str] = None) -> str:
         """
-        Ask a question to the portfolio chatbot.
+        Ask a question without blocking the event loop.
+        
+        Behaves like ``ask`` (caching, model failover) but awaits the
+        chain's async invoke, so one process can keep many upstream calls
+        in flight.
         
         Args:
             question: The user's question
+            use_cache: Serve repeated or rephrased questions from the answer caches
+            timeout: Deadline in seconds (None waits as long as the upstream call takes)
+            session_id: Conversation the question belongs to (None answers it on its own)
             
         Returns:
             The AI assistant's response
+            
+        Raises:
+            AnswerTimeout: If the deadline passed first; the shared upstream call
+                           keeps running and its answer is cached
         """
-        # Check if we need to switch back to original model
-        self._check_and_switch_back()
+        history, recent = self._session_history(session_id)
+        if use_cache and not history:
+            with tracing.span('cache'):
+                cached = await self._acached_answer(question)
+            if cached is not None:
+                return self.record_turn(session_id, question, cached)
+        
+        async def answer():
+            return self._remember(question, *await self._agenerate(question))
         
         try:
-            result = self.chain.run({"user_input": question})
-            return result.strip()
-        except Exception as e:
-            error_str = str(e).lower()
-            
-            # Handle rate limit errors by switching model
-            if 'rate limit' in error_str or '429' in error_str or 'tpd' in error_str:
-                if self.current_model == "gemma2-9b-it":
-                    print("⚠️ Rate limit reached for gemma2-9b-it, switching to compound-beta-mini")
-                    self._switch_model("compound-beta-mini")
-                    self.model_switch_time = time.time()
-                    
-                    # Try the request again with the new model
-                    try:
-                        result = self.chain.run({"user_input": question})
-                        return result.strip()
-                    except Exception as retry_error:
-                        return f"Sorry, I encountered an error even after switching models: {str(retry_error)}"
+            if history:
+                pending = asyncio.ensure_future(self._agenerate(question, history, recent))
+            else:
+                pending = self.inflight.do_async(self._inflight_key(question), answer)
+            try:
+                reply = await (pending if timeout is None else asyncio.wait_for(pending, timeout))
+            except asyncio.TimeoutError:
+                with self._deadline_lock:
+                    self.deadline_timeouts += 1
+                raise AnswerTimeout(f"No answer within {timeout:g} seconds")
+        except UpstreamError as e:
+            return str(e)
+        return self.record_turn(session_id, question, reply[0] if history else reply)
+    
+    def ask_many(self, questions: List[str], max_concurrency: int = 4,
+                 use_cache: bool = True) -> List[Dict[str, Any]]:
+        """
+        Ask several questions at once.
+        
+        Identical questions (after normalization) are only sent upstream
+        once. Uncached questions go out in chunks of ``max_concurrency``
+        through the chain's batch call, and each chunk is budgeted and
+        routed on its own, so a large batch spreads over the models' token
+        budgets instead of being refused as one huge request. A chunk too
+        large for any model's budget is split, and failed items are retried
+        on the next healthy model in the pool. A model that is recovering
+        (half-open breaker) gets a single question as its probe; the rest of
+        the chunk waits for the probe's outcome.
+        
+        Args:
+            questions: The user's questions
+            max_concurrency: Maximum number of simultaneous upstream calls
+            use_cache: Serve repeated or rephrased questions from the answer caches
+            
+        Returns:
+            One result per input question, in input order, each with
+            'question', 'status' and either 'answer' or 'error'
+        """
+        # Deduplicate while keeping the first spelling of each question
+        unique: Dict[str, str] = {}
+        for question in questions:
+            unique.setdefault(normalize_question(question), question)
+        
+        answers: Dict[str, str] = {}
+        item_errors: Dict[str, List[Exception]] = {}
+        pending = []
+        for key, question in unique.items():
+            cached = self._cached_answer(question) if use_cache else None
+            if cached is not None:
+                answers[key] = cached
+            else:
+                pending.append(key)
+        
+        size = max(1, max_concurrency)
+        config = {"max_concurrency": size}
+        inputs_by_key = {key: self._chain_inputs(unique[key]) for key in pending}
+        # (questions, models already tried for them)
+        chunks = deque((pending[start:start + size], set()) for start in range(0, len(pending), size))
+        while chunks:
+            keys, tried = chunks.popleft()
+            inputs = [inputs_by_key[key] for key in keys]
+            model, wait = self._pick_model(self._estimate_tokens(inputs), tried, calls=len(keys))
+            if model is None:
+                if len(keys) > 1:
+                    # No model's budget fits the whole chunk soon enough; try its halves
+                    half = len(keys) // 2
+                    chunks.extendleft([(keys[half:], set(tried)), (keys[:half], set(tried))])
+                continue
+            if len(keys) > 1 and self.router.is_probing(model):
+                # Only the probe goes to a recovering model; the others are
+                # routed again once it succeeded (closing the breaker) or failed
+                chunks.appendleft((keys[1:], set(tried)))
+                self.usage.release(model, calls=len(keys) - 1)
+                keys, inputs = keys[:1], inputs[:1]
+            tried.add(model)
+            if wait:
+                time.sleep(wait)
+            
+            chain = self._chain_for(model)
+            started = time.time()
+            try:
+                outputs = chain.batch(inputs, config=config, return_exceptions=True)
+            except BaseException:
+                self.router.release(model)
+                raise
+            
+            failed = []
+            for key, output in zip(keys, outputs):
+                if isinstance(output, Exception):
+                    failed.append(key)
+                    item_errors.setdefault(key, []).append(output)
                 else:
-                    return f"Sorry, I encountered a rate limit error: {str(e)}"
+                    answers[key] = self._remember(unique[key], output[chain.output_key].strip(), model)
             
-            return f"Sorry, I encountered an error: {str(e)}"
+            if len(failed) < len(keys):
+                self._observe_upstream(model, started)
+                # The items ran concurrently, so the batch took about as long as one call
+                self.router.record_success(model, time.time() - started)
+            if failed:
+                self._observe_upstream(model, started, item_errors[failed[0]][-1])
+                self._record_failure(model, item_errors[failed[0]][-1])
+                chunks.appendleft((failed, tried))
+        
+        results = []
+        for question in questions:
+            key = normalize_question(question)
+            if key in answers:
+                results.append({'question': question, 'answer': answers[key], 'status': 'success'})
+            else:
+                error = self._failure_message(item_errors.get(key, []))
+                results.append({'question': question, 'error': error, 'status': 'error'})
+        return results
+    
+    def ask_stream(self, question: str, use_cache: bool = True) -> Iterator[str]:
+        """
+        Ask a question and yield the answer as the model produces it.
+        
+        If a model fails mid-answer the next healthy model in the pool
+        restarts the answer. When text was already sent, ``STREAM_RESET``
+        is yielded first so the consumer can discard the partial answer.
+        
+        Args:
+            question: The user's question
+            use_cache: Serve repeated or rephrased questions from the answer caches
+            
+        Yields:
+            Answer text chunks (or ``STREAM_RESET``)
+            
+        Raises:
+            UpstreamError: If no model could answer; the message is safe to show to users
+        """
+        if use_cache:
+            cached = self._cached_answer(question)
+            if cached is not None:
+                yield cached
+                return
+        
+        inputs = self._chain_inputs(question)
+        messages = self.prompt_template.format_messages(**inputs)
+        errors = []
+        for model, wait in self._models_to_try(self._estimate_tokens([inputs])):
+            if wait:
+                time.sleep(wait)
+            
+            chunks = []
+            started = time.time()
+            try:
+                for chunk in self._llm_for(model).stream(messages):
+                    if chunk.content:
+                        chunks.append(chunk.content)
+                        yield chunk.content
+            except GeneratorExit:
+                # The consumer went away; free the model without judging it
+                self.router.release(model)
+                raise
+            except Exception as e:
+                self._observe_upstream(model, started, e)
+                self._record_failure(model, e)
+                errors.append(e)
+                if chunks:
+                    yield STREAM_RESET
+                continue
+            
+            self._observe_upstream(model, started)
+            self.router.record_success(model, time.time() - started)
+            self._remember(question, "".join(chunks).strip(), model)
+            return
+        
+        raise UpstreamError(self._failure_message(errors))
+    
+    def _session_history(self, session_id: Optional[str]) -> Tuple[str, str]:
+        """
+        The conversation history to answer a session's next question with,
+        and the text of its latest turns for knowledge retrieval ('' and ''
+        without one).
+        """
+        if session_id is None:
+            return "", ""
+        with tracing.span('history'):
+            history = self.conversations.history(session_id)
+            return history, self.conversations.recent(session_id) if history else ""
+    
+    def record_turn(self, session_id: Optional[str], question: str, answer: str) -> str:
+        """Remember an answered question in its session (None for no session) and return the answer."""
+        if session_id is not None:
+            self.conversations.record(session_id, question, answer)
+        return answer
+    
+    def _inflight_key(self, question: str) -> Tuple[str, str]:
+        """Key under which identical concurrent questions share one upstream call."""
+        return normalize_question(question), self.current_model
+    
+    def _cached_answer(self, question: str) -> Optional[str]:
+        """Look a question up in the warm store, the exact and reworded-question caches, then the store."""
+        model = self.current_model
+        cached = self._memory_answer(question, model)
+        if cached is None and self.store is not None:
+            cached = self._stored_answer(question, model)
+        return cached
+    
+    async def _acached_answer(self, question: str) -> Optional[str]:
+        """Async counterpart of ``_cached_answer``; the store is read on a worker thread, off the event loop."""
+        model = self.current_model
+        cached = self._memory_answer(question, model)
+        if cached is None and self.store is not None:
+            cached = await asyncio.get_running_loop().run_in_executor(None, self._stored_answer, question, model)
+        return cached
+    
+    def _memory_answer(self, question: str, model: str) -> Optional[str]:
+        """Look a question up in the warm store and the exact and reworded-question caches."""
+        cached = self.warm_answers.get(question, model)
+        if cached is None:
+            cached = self.answer_cache.get(question, model)
+        if cached is None:
+            cached = self.reworded_cache.get(question, model)
+        return cached
+    
+    def _stored_answer(self, question: str, model: str) -> Optional[str]:
+        """Read an answer other workers stored, or that no longer fits in memory, into the caches."""
+        stored = self.store.get_answer(normalize_question(question), model)
+        if stored is None:
+            return None
+        answer, stored_at = stored
+        self.answer_cache.set(question, model, answer, stored_at)
+        self.reworded_cache.set(question, model, answer, stored_at)
+        return answer
+    
+    @staticmethod
+    def _is_rate_limit_error(error: Exception) -> bool:
+        """Check whether an upstream error is a rate limit or quota error."""
+        error_str = str(error).lower()
+        return 'rate limit' in error_str or '429' in error_str or 'tpd' in error_str
+    
+    def _estimate_tokens(self, inputs: List[Dict[str, str]]) -> int:
+        """Estimate prompt plus completion tokens for a set of chain inputs."""
+        return sum(self._template_tokens + estimate_tokens(item["context"]) +
+                   estimate_tokens(item["history"]) + estimate_tokens(item["user_input"]) +
+                   self.expected_completion_tokens
+                   for item in inputs)
+    
+    def _pick_model(self, estimated_tokens: int, tried: Set[str],
+                    calls: int = 1) -> Tuple[Optional[str], float]:
+        """
+        Choose the healthiest model that has not been tried yet.
+        
+        Models whose circuit breaker is open are skipped, and so are models
+        that would need more than ``max_budget_wait`` seconds of token
+        budget to accept the request, so it goes elsewhere before it fails.
+        The estimated tokens are reserved on the chosen model; each LLM call
+        settles its share when it ends or fails, and a caller that does not
+        send the calls after all must ``self.usage.release`` them.
+        
+        Args:
+            estimated_tokens: Estimated tokens the request will use
+            tried: Models already tried for this request
+            calls: Number of LLM calls the tokens will be sent in
+            
+        Returns:
+            (model, seconds to wait before sending), or (None, 0) if no model is usable
+        """
+        # Re-rank when a model is lost to a concurrent routing change between
+        # ranking and acquiring, so another model that just opened up is used
+        skipped = set(tried)
+        while True:
+            ranked = self.router.ranked(exclude=skipped)
+            if not ranked:
+                return None, 0.0
+            for model in ranked:
+                wait = self.usage.reserve(model, estimated_tokens, self.max_budget_wait, calls)
+                if wait is not None:
+                    if self.router.acquire(model):
+                        return model, wait
+                    self.usage.release(model, calls)
+                skipped.add(model)
+    
+    def _models_to_try(self, estimated_tokens: int,
+                       tried: Optional[Set[str]] = None) -> Iterator[Tuple[str, float]]:
+        """Yield (model, seconds to wait) for each model to try in turn, best first."""
+        tried = set() if tried is None else tried
+        while True:
+            model, wait = self._pick_model(estimated_tokens, tried)
+            if model is None:
+                return
+            tried.add(model)
+            yield model, wait
+    
+    def _observe_upstream(self, model: str, started: float, error: Optional[Exception] = None,
+                          outcome: Optional[str] = None):
+        """Record an upstream call's duration and outcome ('ok', 'error', 'rate_limited' or 'cancelled')."""
+        if outcome is None:
+            outcome = 'ok' if error is None else 'rate_limited' if self._is_rate_limit_error(error) else 'error'
+        UPSTREAM_SECONDS.observe(time.time() - started, model, outcome)
+    
+    def _record_failure(self, model: str, error: Exception):
+        """Report a failed call to the router; rate limits open the model's breaker right away."""
+        if self._is_rate_limit_error(error):
+            UPSTREAM_RATE_LIMITS.inc(model)
+            self.usage.record_rate_limit(model, error)
+            provider_wait = self.usage.wait_time(model, 0)
+            print(f"⚠️ Rate limit reached for {model}, routing to the next model")
+            self.router.record_failure(model, cooldown=provider_wait or self.rate_limit_cooldown)
+        else:
+            self.router.record_failure(model)
+        self._save_model_state()
+    
+    def _failure_message(self, errors: List[Exception]) -> str:
+        """Build the user-facing message for a request no model could answer."""
+        if not errors:
+            return (f"Sorry, all models are currently rate limited or unavailable. "
+                    f"Please try again in {self.router.retry_in():.0f} seconds.")
+        
+        last_error = errors[-1]
+        if len(errors) > 1:
+            return f"Sorry, I encountered an error even after switching models: {str(last_error)}"
+        if self._is_rate_limit_error(last_error):
+            return f"Sorry, I encountered a rate limit error: {str(last_error)}"
+        return f"Sorry, I encountered an error: {str(last_error)}"
+    
+    def _generate(self, question: str, history: str = "", recent: str = "") -> Tuple[str, str]:
+        """
+        Get a fresh answer, failing over through the model pool.
+        
+        Args:
+            question: The user's question
+            history: Rendered conversation history of the question's session
+            recent: Latest turns of the session, searched along with the question
+            
+        Returns:
+            (answer, model that produced it)
+            
+        Raises:
+            UpstreamError: If no model could answer; the message is safe to show to users
+        """
+        with tracing.span('prompt'):
+            inputs = self._chain_inputs(question, history, recent)
+        estimated_tokens = self._estimate_tokens([inputs])
+        errors = []
+        tried: Set[str] = set()
+        for model, wait in self._models_to_try(estimated_tokens, tried):
+            if wait:
+                with tracing.span('budget-wait', model):
+                    time.sleep(wait)
+            
+            # Attempts after a failure are timed separately, so the cost of
+            # failing over to another model stands out
+            try:
+                with tracing.span('failover' if errors else 'attempt', model):
+                    return self._call_hedged(model, inputs, estimated_tokens, tried)
+            except Exception as e:
+                errors.append(e)
+        
+        raise UpstreamError(self._failure_message(errors))
+    
+    def _call(self, model: str, inputs: Dict[str, str]) -> Tuple[str, str]:
+        """Run one model's chain, reporting the outcome to the router (errors are re-raised)."""
+        started = time.time()
+        try:
+            with tracing.span('upstream', model):
+                result = self._chain_for(model).run(inputs)
+        except Exception as e:
+            self._observe_upstream(model, started, e)
+            self._record_failure(model, e)
+            raise
+        
+        self._observe_upstream(model, started)
+        self.router.record_success(model, time.time() - started)
+        return result.strip(), model
+    
+    def _call_hedged(self, model: str, inputs: Dict[str, str], estimated_tokens: int,
+                     tried: Set[str]) -> Tuple[str, str]:
+        """
+        Call a model, also sending the question to a second model if the first is slow.
+        
+        The first successful answer wins. A blocking call cannot be
+        interrupted, so the losing call is abandoned: it finishes in the
+        background and only its outcome is recorded.
+        
+        Args:
+            model: The (already acquired) model to call
+            inputs: Chain inputs
+            estimated_tokens: Estimated tokens, for picking the hedge model
+            tried: Models already used for this request; the hedge model is added
+            
+        Returns:
+            (answer, model that produced it)
+        """
+        delay = self._hedge_delay(model)
+        if delay is None:
+            return self._call(model, inputs)
+        
+        started = threading.Event()
+        
+        def call_primary():
+            started.set()
+            return self._call(model, inputs)
+        
+        primary = self._hedge_executor.submit(tracing.bind(call_primary))
+        # The hedge delay counts from when the call is sent, so time spent
+        # waiting for a pool thread is not taken for a slow model
+        started.wait()
+        try:
+            result = primary.result(timeout=delay)
+            self._record_hedge(False)
+            return result
+        except FutureTimeoutError:
+            pass
+        
+        backup_model = self._start_hedge(estimated_tokens, tried)
+        if backup_model is None:
+            return primary.result()
+        
+        backup = self._hedge_executor.submit(tracing.bind(self._call), backup_model, inputs)
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait_futures(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                self._record_hedge_winner(future is backup)
+                return result
+        raise error
+    
+    async def _agenerate(self, question: str, history: str = "", recent: str = "") -> Tuple[str, str]:
+        """
+        Async counterpart of ``_generate``.
+        
+        Args:
+            question: The user's question
+            history: Rendered conversation history of the question's session
+            recent: Latest turns of the session, searched along with the question
+            
+        Returns:
+            (answer, model that produced it)
+            
+        Raises:
+            UpstreamError: If no model could answer; the message is safe to show to users
+        """
+        with tracing.span('prompt'):
+            inputs = self._chain_inputs(question, history, recent)
+        estimated_tokens = self._estimate_tokens([inputs])
+        errors = []
+        tried: Set[str] = set()
+        for model, wait in self._models_to_try(estimated_tokens, tried):
+            if wait:
+                with tracing.span('budget-wait', model):
+                    await asyncio.sleep(wait)
+            
+            try:
+                with tracing.span('failover' if errors else 'attempt', model):
+                    return await self._acall_hedged(model, inputs, estimated_tokens, tried)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                errors.append(e)
+        
+        raise UpstreamError(self._failure_message(errors))
+    
+    async def _acall(self, model: str, inputs: Dict[str, str]) -> Tuple[str, str]:
+        """Async counterpart of ``_call``; a cancelled call frees the model without judging it."""
+        chain = self._chain_for(model)
+        started = time.time()
+        try:
+            with tracing.span('upstream', model):
+                result = await chain.ainvoke(inputs)
+        except asyncio.CancelledError:
+            self._observe_upstream(model, started, outcome='cancelled')
+            self.router.release(model)
+            raise
+        except Exception as e:
+            self._observe_upstream(model, started, e)
+            self._record_failure(model, e)
+            raise
+        
+        self._observe_upstream(model, started)
+        self.router.record_success(model, time.time() - started)
+        return result[chain.output_key].strip(), model
+    
+    async def _acall_hedged(self, model: str, inputs: Dict[str, str], estimated_tokens: int,
+                            tried: Set[str]) -> Tuple[str, str]:
+        """Async counterpart of ``_call_hedged``; the losing call is cancelled."""
+        delay = self._hedge_delay(model)
+        if delay is None:
+            return await self._acall(model, inputs)
+        
+        pending = {asyncio.ensure_future(self._acall(model, inputs))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                self._record_hedge(False)
+                return done.pop().result()
+            
+            primary = next(iter(pending))
+            backup_model = self._start_hedge(estimated_tokens, tried)
+            if backup_model is None:
+                pending = set()
+                return await primary
+            
+            backup = asyncio.ensure_future(self._acall(backup_model, inputs))
+            pending.add(backup)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    self._record_hedge_winner(task is backup)
+                    return task.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _hedge_delay(self, model: str) -> Optional[float]:
+        """How long to wait for a model before hedging (None when hedging is off or not yet calibrated)."""
+        if self.hedge_percentile is None:
+            return None
+        return self.router.latency_percentile(model, self.hedge_percentile,
+                                              min_samples=self.hedge_min_samples)
+    
+    def _start_hedge(self, estimated_tokens: int, tried: Set[str]) -> Optional[str]:
+        """
+        Reserve a second model for a slow request, if the hedge cap allows it.
+        
+        Returns:
+            The hedge model (added to ``tried``), or None if the request is not hedged
+        """
+        # At most hedge_max_fraction of the last window's worth of requests
+        # may be hedged, which bounds the extra quota spent
+        with self._hedge_lock:
+            allowed = self._hedged_in_window < self.hedge_max_fraction * self._hedge_window.maxlen
+            if not allowed:
+                self.hedges_capped += 1
+        if not allowed:
+            self._record_hedge(False)
+            return None
+        
+        model, wait = self._pick_model(estimated_tokens, tried)
+        if model is not None and wait:
+            # A hedge that has to wait for token budget cannot beat the primary
+            self.router.release(model)
+            self.usage.release(model)
+            model = None
+        if model is None:
+            self._record_hedge(False)
+            return None
+        
+        tried.add(model)
+        self._record_hedge(True)
+        return model
+    
+    def _record_hedge(self, hedged: bool):
+        """Add a hedge-eligible request to the sliding window behind the hedge cap."""
+        with self._hedge_lock:
+            if len(self._hedge_window) == self._hedge_window.maxlen:
+                self._hedged_in_window -= self._hedge_window[0]
+            self._hedge_window.append(hedged)
+            self._hedged_in_window += hedged
+            self.hedge_eligible += 1
+            self.hedged += hedged
+    
+    def _record_hedge_winner(self, backup_won: bool):
+        with self._hedge_lock:
+            if backup_won:
+                self.hedge_backup_wins += 1
+            else:
+                self.hedge_primary_wins += 1
+    
+    def get_deadline_stats(self) -> Dict[str, Any]:
+        """
+        Get request deadline statistics.
+        
+        Returns:
+            Timeouts, requests refused because too many calls were overdue,
+            and calls currently running past their request's deadline
+        """
+        with self._deadline_lock:
+            return {
+                'timeouts': self.deadline_timeouts,
+                'overflows': self.deadline_overflows,
+                'overdue_calls': len(self._overdue),
+                'max_overdue_calls': self.max_overdue_calls,
+                'upstream_timeout_seconds': self.upstream_timeout
+            }
+    
+    def get_hedge_stats(self) -> Dict[str, Any]:
+        """
+        Get request hedging statistics.
+        
+        Returns:
+            Settings, how many requests were hedged, and which call won
+        """
+        with self._hedge_lock:
+            return {
+                'enabled': self.hedge_percentile is not None,
+                'percentile': self.hedge_percentile,
+                'max_fraction': self.hedge_max_fraction,
+                'eligible_requests': self.hedge_eligible,
+                'hedged_requests': self.hedged,
+                'recent_hedge_fraction': (round(self._hedged_in_window / len(self._hedge_window), 4)
+                                          if self._hedge_window else 0.0),
+                'capped': self.hedges_capped,
+                'backup_wins': self.hedge_backup_wins,
+                'primary_wins': self.hedge_primary_wins,
+                'hedge_delay_seconds': {model: self._hedge_delay(model) for model in self.router.models}
+            }
+    
+    def _remember(self, question: str, answer: str, model: str) -> str:
+        """Store a successful answer in the caches and return it."""
+        self.answer_cache.set(question, model, answer)
+        self.reworded_cache.set(question, model, answer)
+        if self.store is not None:
+            self.store.save_answer(normalize_question(question), model, answer)
+        return answer
+    
+    def _warm_answer(self, question: str) -> Tuple[str, str]:
+        """Generate and remember the answer to a canned question for the warm store."""
+        answer, model = self._generate(question)
+        return self._remember(question, answer, model), model
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get answer cache statistics.
+        
+        Returns:
+            Size, limits and hit/miss counters for the exact and reworded-question caches,
+            how many concurrent identical questions were collapsed, the
+            conversation memory, and the state of the on-disk store
+        """
+        return {
+            'exact': self.answer_cache.stats(),
+            'reworded': self.reworded_cache.stats(),
+            'warm': self.warm_answers.stats(),
+            'coalesced': self.inflight.stats(),
+            'conversations': self.conversations.stats(),
+            'persistent': self.store.stats() if self.store is not None else {'enabled': False}
+        }
+    
+    def clear_cache(self) -> str:
+        """
+        Clear the answer caches.
+        
+        Returns:
+            Status message
+        """
+        self.answer_cache.clear()
+        self.reworded_cache.clear()
+        if self.store is not None:
+            self.store.clear_answers()
+        return "🧹 Answer caches cleared"
     
     def get_project_info(self, project_name: str) -> str:
         """
@@ -375,7 +1197,7 @@ Answer:
         Returns:
             List of all projects
         """
-        return self.ask("List all my projects with their technologies")
+        return self.ask(CANNED_QUESTIONS['list_projects'])
     
     def get_tech_recommendation(self) -> str:
         """
@@ -384,7 +1206,7 @@ Answer:
         Returns:
             Technology recommendations
         """
-        return self.ask("Based on my portfolio, which technologies should I focus on for career growth?")
+        return self.ask(CANNED_QUESTIONS['get_tech_recommendation'])
     
     def get_skills_summary(self) -> str:
         """
@@ -393,7 +1215,7 @@ Answer:
         Returns:
             Summary of technical skills
         """
-        return self.ask("Summarize my technical skills based on my projects")
+        return self.ask(CANNED_QUESTIONS['get_skills_summary'])
     
     def get_background_info(self) -> str:
         """
@@ -402,7 +1224,7 @@ Answer:
         Returns:
             Background and education information
         """
-        return self.ask("Tell me about Abhishek's background, education, and professional journey")
+        return self.ask(CANNED_QUESTIONS['get_background_info'])
     
     def get_career_advice(self) -> str:
         """
@@ -411,7 +1233,7 @@ Answer:
         Returns:
             Career advice and recommendations
         """
-        return self.ask("Based on my portfolio and experience, what career advice would you give me?")
+        return self.ask(CANNED_QUESTIONS['get_career_advice'])
     
     def get_contact_info(self) -> str:
         """
@@ -420,7 +1242,7 @@ Answer:
         Returns:
             Contact and networking details
         """
-        return self.ask("How can someone contact Abhishek or learn more about his work?")
+        return self.ask(CANNED_QUESTIONS['get_contact_info'])
     
     def get_project_recommendations(self) -> str:
         """
@@ -429,43 +1251,85 @@ Answer:
         Returns:
             Project recommendations
         """
-        return self.ask("Based on my current portfolio, what types of projects should I consider working on next?")
+        return self.ask(CANNED_QUESTIONS['get_project_recommendations'])
+    
+    def get_canned_answer(self, name: str) -> Optional[str]:
+        """
+        Get the stored answer to a canned helper question without calling the model.
+        
+        Args:
+            name: Helper name (a key of CANNED_QUESTIONS, e.g. 'list_projects')
+            
+        Returns:
+            The warmed or cached answer, or None if there is none yet
+        """
+        question = CANNED_QUESTIONS.get(name)
+        return self._cached_answer(question) if question is not None else None
     
     def get_model_status(self) -> str:
         """
-        Get the current model status and switching information.
+        Get the current model status and routing information.
         
         Returns:
             Current model status information
         """
         status = f"Current Model: {self.current_model}\n"
         status += f"Original Model: {self.original_model}\n"
+        status += "Model Pool:"
         
-        if self.model_switch_time:
-            elapsed = time.time() - self.model_switch_time
-            remaining = self.switch_duration - elapsed
-            if remaining > 0:
-                status += f"Switched {elapsed:.0f}s ago, {remaining:.0f}s remaining before switch back"
-            else:
-                status += "Ready to switch back to original model"
-        else:
-            status += "No model switch in progress"
+        for model, route in self.get_routing_stats().items():
+            state = route['state']
+            if route['open_for_seconds']:
+                state += f", retry in {route['open_for_seconds']:.0f}s"
+            latency = (f"{route['avg_latency_seconds']:.2f}s" if route['avg_latency_seconds'] is not None
+                       else "n/a")
+            status += (f"\n  {route['position'] + 1}. {model} - {state}, avg latency {latency}, "
+                       f"{route['successes']} ok / {route['failures']} failed")
+        
+        for model, usage in self.get_usage_stats().items():
+            status += f"\n\nToken Usage ({model}):\n"
+            minute_limit = usage['tokens_per_minute_limit'] or '∞'
+            day_limit = usage['tokens_per_day_limit'] or '∞'
+            status += f"Last minute: {usage['tokens_last_minute']}/{minute_limit} tokens\n"
+            status += f"Last day: {usage['tokens_last_day']}/{day_limit} tokens\n"
+            status += f"Requests: {usage['requests']}, rate limit events: {usage['rate_limit_events']}"
+            if usage['blocked_for_seconds']:
+                status += f"\nProvider asked to retry in {usage['blocked_for_seconds']:.0f}s"
+            if usage['provider_remaining_tokens'] is not None:
+                status += f"\nProvider reports {usage['provider_remaining_tokens']:.0f} tokens remaining"
         
         return status
     
+    def get_routing_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-model routing state.
+        
+        Returns:
+            Circuit breaker state, counters and average latency per model, in pool order
+        """
+        return self.router.stats()
+    
+    def get_usage_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-model token accounting.
+        
+        Returns:
+            Token totals, sliding-window usage, limits and provider rate-limit state per model
+        """
+        return self.usage.stats()
+    
     def force_switch_back(self) -> str:
         """
-        Force switch back to the original model.
+        Force switch back to the original model by closing every circuit breaker.
         
         Returns:
             Status message
         """
-        if self.current_model != self.original_model:
-            self._switch_model(self.original_model)
-            self.model_switch_time = None
-            return f"✅ Forced switch back to {self.original_model}"
-        else:
-            return f"ℹ️ Already using original model: {self.original_model}"
+        self.router.reset()
+        self._save_model_state()
+        if self.current_model == self.original_model:
+            return f"✅ Circuit breakers reset, routing to original model: {self.original_model}"
+        return f"ℹ️ Circuit breakers reset, routing to {self.current_model}"
 
 
 def main():
@@ -486,7 +1350,9 @@ def main():
         print("• What should he work on next?")
         print("\n🔧 Special commands:")
         print("• 'status' - Check current model status")
-        print("• 'switch' - Force switch back to original model")
+        print("• 'switch' - Reset circuit breakers and switch back to original model")
+        print("• 'cache' - Show answer cache statistics")
+        print("• 'retrieval' - Show prompt tokens saved by knowledge retrieval")
         print("• 'quit' - Exit the chatbot\n")
         
         while True:
@@ -508,11 +1374,25 @@ def main():
                 print("\n" + "-" * 50 + "\n")
                 continue
             
+            if user_input.lower() == 'cache':
+                print("\n🗄️ Cache Stats:")
+                for cache_name, stats in chatbot.get_cache_stats().items():
+                    print(f"{cache_name}: {stats}")
+                print("\n" + "-" * 50 + "\n")
+                continue
+            
+            if user_input.lower() == 'retrieval':
+                print("\n📉 Retrieval Report:")
+                for key, value in chatbot.get_retrieval_report().items():
+                    print(f"{key}: {value}")
+                print("\n" + "-" * 50 + "\n")
+                continue
+            
             if not user_input:
                 continue
             
             print("\n🤖 Abhishek Ambi's Assistant:")
-            response = chatbot.ask(user_input)
+            response = chatbot.ask(user_input, session_id='cli')
             print(response)
             print("\n" + "-" * 50 + "\n")
     
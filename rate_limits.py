@@ -0,0 +1,466 @@
+"""
+Token budget accounting for Abhishek Ambi's Portfolio Chatbot
+Tracks prompt and completion tokens per model over sliding per-minute and
+per-day windows, and reads the provider's rate-limit headers, so requests
+can be delayed or moved to another model before they would fail.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Mapping, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from knowledge_base import estimate_tokens
+
+# Groq free-tier token limits; None means the provider publishes no limit
+DEFAULT_MODEL_LIMITS = {
+    "gemma2-9b-it": {'tokens_per_minute': 15000, 'tokens_per_day': 500000},
+    "compound-beta-mini": {'tokens_per_minute': 70000, 'tokens_per_day': None}
+}
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_TRY_AGAIN_RE = re.compile(r"try again in ((?:\d+(?:\.\d+)?(?:ms|h|m|s))+)", re.IGNORECASE)
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parse a provider duration such as "7.66s", "2m59.56s", "1h2m" or "120ms".
+
+    Args:
+        value: Duration string (a bare number is read as seconds)
+
+    Returns:
+        Duration in seconds, or None if it cannot be parsed
+    """
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+
+    units = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> Dict[str, float]:
+    """
+    Extract rate-limit information from provider response headers.
+
+    Args:
+        headers: Response headers (case-insensitive mapping or plain dict)
+
+    Returns:
+        Any of 'retry_after', 'limit_tokens', 'remaining_tokens',
+        'reset_tokens', 'remaining_requests' and 'reset_requests'
+        (durations in seconds)
+    """
+    lowered = {str(key).lower(): str(value) for key, value in headers.items()}
+    fields = {
+        'retry-after': 'retry_after',
+        'x-ratelimit-limit-tokens': 'limit_tokens',
+        'x-ratelimit-remaining-tokens': 'remaining_tokens',
+        'x-ratelimit-reset-tokens': 'reset_tokens',
+        'x-ratelimit-remaining-requests': 'remaining_requests',
+        'x-ratelimit-reset-requests': 'reset_requests'
+    }
+
+    parsed = {}
+    for header, name in fields.items():
+        if header in lowered:
+            value = parse_duration(lowered[header])
+            if value is not None:
+                parsed[name] = value
+    return parsed
+
+
+class TokenWindow:
+    """Sliding window sum of token counts."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._events: Deque[Tuple[float, int]] = deque()
+        self.total = 0
+
+    def add(self, tokens: int, now: float):
+        self._events.append((now, tokens))
+        self.total += tokens
+
+    def prune(self, now: float):
+        while self._events and now - self._events[0][0] >= self.seconds:
+            self.total -= self._events.popleft()[1]
+
+    def wait_for(self, tokens: int, limit: int, now: float, others: int = 0) -> float:
+        """
+        Seconds until ``tokens`` more fit under ``limit`` (inf if they never will).
+
+        ``others`` counts tokens used elsewhere (by other worker processes)
+        whose timing is unknown; if only their expiry would make room, the
+        whole window length is returned.
+        """
+        if tokens > limit:
+            return math.inf
+
+        excess = self.total + others + tokens - limit
+        if excess <= 0:
+            return 0.0
+
+        for stamp, count in self._events:
+            excess -= count
+            if excess <= 0:
+                return max(0.0, stamp + self.seconds - now)
+        return self.seconds if others else 0.0
+
+
+class ModelUsage:
+    """Token accounting and provider rate-limit state for one model."""
+
+    def __init__(self, tokens_per_minute: Optional[int] = None, tokens_per_day: Optional[int] = None):
+        self.tokens_per_minute = tokens_per_minute
+        self.tokens_per_day = tokens_per_day
+        self.minute = TokenWindow(60)
+        self.day = TokenWindow(86400)
+
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.rate_limit_events = 0
+
+        # Provider-reported state, each with the time it stops applying
+        self.blocked_until = 0.0
+        self.remaining_tokens: Optional[float] = None
+        self.remaining_tokens_until = 0.0
+        self.remaining_requests: Optional[float] = None
+        self.remaining_requests_until = 0.0
+
+        # Usage last reported by the other worker processes sharing the quota
+        self.peer_minute_tokens = 0
+        self.peer_day_tokens = 0
+
+        # Estimated tokens of calls routed here that have not finished yet,
+        # oldest first, each with the time it is given up on
+        self.reservations: Deque[Tuple[float, int]] = deque()
+        self.reserved = 0
+
+
+class UsageTracker:
+    """
+    Thread-safe per-model token accounting.
+
+    Combines locally counted usage (sliding minute and day windows) with
+    what the provider reports in its rate-limit headers to decide how long
+    a request of a given size would have to wait on a model.
+
+    A request that is routed to a model reserves its estimated tokens
+    until its call finishes, so concurrent requests cannot all fit into
+    the same remaining budget. Each finished or failed call settles the
+    model's oldest reservation; reservations of calls that never report
+    back are given up after ``reservation_ttl`` seconds.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Optional[int]]]] = None,
+                 reservation_ttl: float = 120):
+        """
+        Initialize the tracker.
+
+        Args:
+            limits: Per-model 'tokens_per_minute' / 'tokens_per_day' limits
+                    (defaults to DEFAULT_MODEL_LIMITS)
+            reservation_ttl: Seconds after which an unsettled reservation is dropped
+        """
+        self.limits = dict(DEFAULT_MODEL_LIMITS if limits is None else limits)
+        self.reservation_ttl = reservation_ttl
+        self._models: Dict[str, ModelUsage] = {}
+        self._lock = threading.Lock()
+
+    def _usage(self, model: str) -> ModelUsage:
+        """Get or create the usage record for a model (lock must be held)."""
+        usage = self._models.get(model)
+        if usage is None:
+            usage = ModelUsage(**self.limits.get(model, {}))
+            self._models[model] = usage
+        return usage
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int):
+        """
+        Record the tokens used by a completed request.
+
+        Args:
+            model: The model that served the request
+            prompt_tokens: Input tokens
+            completion_tokens: Output tokens
+        """
+        now = time.time()
+        with self._lock:
+            usage = self._usage(model)
+            usage.requests += 1
+            usage.prompt_tokens += prompt_tokens
+            usage.completion_tokens += completion_tokens
+            usage.minute.add(prompt_tokens + completion_tokens, now)
+            usage.day.add(prompt_tokens + completion_tokens, now)
+            self._settle(usage, 1)
+
+    def reserve(self, model: str, estimated_tokens: int, max_wait: float, calls: int = 1) -> Optional[float]:
+        """
+        Reserve budget for calls about to be sent to a model, if they fit soon enough.
+
+        Checking and reserving happen under one lock, so of several
+        concurrent requests only as many as fit are let through.
+
+        Args:
+            model: The model to reserve on
+            estimated_tokens: Estimated prompt plus completion tokens of all the calls
+            max_wait: Longest acceptable wait in seconds
+            calls: Number of upstream calls the tokens are spread over (each settles its share)
+
+        Returns:
+            Seconds to wait before sending, or None if nothing was reserved
+        """
+        now = time.time()
+        with self._lock:
+            usage = self._usage(model)
+            wait = self._wait_time(usage, estimated_tokens, now)
+            if wait > max_wait:
+                return None
+            calls = max(1, calls)
+            share = math.ceil(estimated_tokens / calls)
+            for _ in range(calls):
+                usage.reservations.append((now + self.reservation_ttl, share))
+            usage.reserved += share * calls
+            return wait
+
+    def release(self, model: str, calls: int = 1):
+        """
+        Give back reservations of calls that failed or were never sent.
+
+        Args:
+            model: The model the reservations were made on
+            calls: Number of calls to release
+        """
+        with self._lock:
+            self._settle(self._usage(model), calls)
+
+    @staticmethod
+    def _settle(usage: ModelUsage, calls: int):
+        """Drop a model's oldest reservations (lock must be held)."""
+        for _ in range(min(calls, len(usage.reservations))):
+            usage.reserved -= usage.reservations.popleft()[1]
+
+    @staticmethod
+    def _expire_reservations(usage: ModelUsage, now: float):
+        """Drop reservations whose calls never reported back (lock must be held)."""
+        while usage.reservations and usage.reservations[0][0] <= now:
+            usage.reserved -= usage.reservations.popleft()[1]
+
+    def record_headers(self, model: str, headers: Mapping[str, str]):
+        """
+        Update provider-reported limits from response headers.
+
+        Args:
+            model: The model the response came from
+            headers: The response headers
+        """
+        parsed = parse_rate_limit_headers(headers)
+        if not parsed:
+            return
+
+        now = time.time()
+        with self._lock:
+            usage = self._usage(model)
+            if 'retry_after' in parsed:
+                usage.blocked_until = max(usage.blocked_until, now + parsed['retry_after'])
+            if 'limit_tokens' in parsed and usage.tokens_per_minute is None:
+                usage.tokens_per_minute = int(parsed['limit_tokens'])
+            if 'remaining_tokens' in parsed:
+                usage.remaining_tokens = parsed['remaining_tokens']
+                usage.remaining_tokens_until = now + parsed.get('reset_tokens', 60)
+            if 'remaining_requests' in parsed:
+                usage.remaining_requests = parsed['remaining_requests']
+                usage.remaining_requests_until = now + parsed.get('reset_requests', 60)
+
+    def record_rate_limit(self, model: str, error: Exception):
+        """
+        Record a rate-limit failure, using its headers or message for the cooldown.
+
+        Args:
+            model: The model that rejected the request
+            error: The rate-limit exception
+        """
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None)
+        if headers:
+            self.record_headers(model, headers)
+
+        match = _TRY_AGAIN_RE.search(str(error))
+        cooldown = parse_duration(match.group(1)) if match else None
+
+        now = time.time()
+        with self._lock:
+            usage = self._usage(model)
+            usage.rate_limit_events += 1
+            if cooldown:
+                usage.blocked_until = max(usage.blocked_until, now + cooldown)
+
+    def wait_time(self, model: str, estimated_tokens: int) -> float:
+        """
+        How long a request of the given size would have to wait on a model.
+
+        Args:
+            model: The model to check
+            estimated_tokens: Estimated prompt plus completion tokens
+
+        Returns:
+            Seconds to wait (0 if it can go now, inf if it can never fit)
+        """
+        now = time.time()
+        with self._lock:
+            return self._wait_time(self._usage(model), estimated_tokens, now)
+
+    def _wait_time(self, usage: ModelUsage, estimated_tokens: int, now: float) -> float:
+        """Body of ``wait_time``, counting reserved tokens like other workers' usage (lock must be held)."""
+        usage.minute.prune(now)
+        usage.day.prune(now)
+        self._expire_reservations(usage, now)
+
+        waits = [max(0.0, usage.blocked_until - now)]
+        if usage.tokens_per_minute:
+            waits.append(usage.minute.wait_for(estimated_tokens, usage.tokens_per_minute, now,
+                                               usage.peer_minute_tokens + usage.reserved))
+        if usage.tokens_per_day:
+            waits.append(usage.day.wait_for(estimated_tokens, usage.tokens_per_day, now,
+                                            usage.peer_day_tokens + usage.reserved))
+        if (usage.remaining_tokens is not None and now < usage.remaining_tokens_until
+                and usage.remaining_tokens < estimated_tokens):
+            waits.append(usage.remaining_tokens_until - now)
+        if (usage.remaining_requests is not None and now < usage.remaining_requests_until
+                and usage.remaining_requests < 1):
+            waits.append(usage.remaining_requests_until - now)
+        return max(waits)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get this process's own usage, for sharing with other worker processes.
+
+        Returns:
+            Model -> 'minute_tokens', 'day_tokens' and 'blocked_until'
+        """
+        now = time.time()
+        with self._lock:
+            result = {}
+            for model, usage in self._models.items():
+                usage.minute.prune(now)
+                usage.day.prune(now)
+                self._expire_reservations(usage, now)
+                # In-flight reservations count, so peers do not spend the same budget
+                result[model] = {
+                    'minute_tokens': usage.minute.total + usage.reserved,
+                    'day_tokens': usage.day.total + usage.reserved,
+                    'blocked_until': usage.blocked_until
+                }
+            return result
+
+    def set_peer_usage(self, peers: Dict[str, Dict[str, float]]):
+        """
+        Count the usage of other worker processes against the shared limits.
+
+        Args:
+            peers: Model -> 'minute_tokens', 'day_tokens' and 'blocked_until',
+                   summed over the other workers (see StateStore.load_peer_usage)
+        """
+        with self._lock:
+            for model in set(self._models) | set(peers):
+                usage = self._usage(model)
+                peer = peers.get(model, {})
+                usage.peer_minute_tokens = peer.get('minute_tokens', 0)
+                usage.peer_day_tokens = peer.get('day_tokens', 0)
+                # A 429 seen by any worker holds the model back in every worker
+                usage.blocked_until = max(usage.blocked_until, peer.get('blocked_until', 0.0))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get usage statistics for every model seen so far.
+
+        Returns:
+            Per-model token totals, window usage, limits and provider state
+        """
+        now = time.time()
+        with self._lock:
+            result = {}
+            for model, usage in self._models.items():
+                usage.minute.prune(now)
+                usage.day.prune(now)
+                self._expire_reservations(usage, now)
+                result[model] = {
+                    'requests': usage.requests,
+                    'prompt_tokens': usage.prompt_tokens,
+                    'completion_tokens': usage.completion_tokens,
+                    'tokens_last_minute': usage.minute.total,
+                    'tokens_per_minute_limit': usage.tokens_per_minute,
+                    'tokens_last_day': usage.day.total,
+                    'tokens_per_day_limit': usage.tokens_per_day,
+                    'other_workers_tokens_last_minute': usage.peer_minute_tokens,
+                    'other_workers_tokens_last_day': usage.peer_day_tokens,
+                    'reserved_tokens': usage.reserved,
+                    'calls_in_flight': len(usage.reservations),
+                    'rate_limit_events': usage.rate_limit_events,
+                    'blocked_for_seconds': round(max(0.0, usage.blocked_until - now), 1),
+                    'provider_remaining_tokens': (usage.remaining_tokens
+                                                  if now < usage.remaining_tokens_until else None),
+                    'provider_remaining_requests': (usage.remaining_requests
+                                                    if now < usage.remaining_requests_until else None)
+                }
+            return result
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback that records the token usage of every LLM call.
+
+    Uses the provider's reported usage when available and falls back to
+    estimating from the prompt and generated text otherwise.
+    """
+
+    def __init__(self, tracker: UsageTracker, model: str):
+        self.tracker = tracker
+        self.model = model
+        self._prompt_estimates: Dict[Any, int] = {}
+
+    def on_llm_start(self, serialized, prompts, *, run_id=None, **kwargs: Any):
+        self._prompt_estimates[run_id] = sum(estimate_tokens(prompt) for prompt in prompts)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id=None, **kwargs: Any):
+        self._prompt_estimates[run_id] = sum(estimate_tokens(str(message.content))
+                                             for batch in messages for message in batch)
+
+    def on_llm_error(self, error, *, run_id=None, **kwargs: Any):
+        self._prompt_estimates.pop(run_id, None)
+        self.tracker.release(self.model)
+
+    def on_llm_end(self, response, *, run_id=None, **kwargs: Any):
+        estimated_prompt = self._prompt_estimates.pop(run_id, 0)
+        usage = (response.llm_output or {}).get('token_usage') or {}
+        prompt_tokens = usage.get('prompt_tokens')
+        completion_tokens = usage.get('completion_tokens')
+
+        # Streaming responses report usage on the message instead
+        if prompt_tokens is None:
+            prompt_tokens = completion_tokens = 0
+            for generations in response.generations:
+                for generation in generations:
+                    metadata = getattr(getattr(generation, 'message', None), 'usage_metadata', None) or {}
+                    prompt_tokens += metadata.get('input_tokens', 0)
+                    completion_tokens += metadata.get('output_tokens', 0)
+
+        if not prompt_tokens and not completion_tokens:
+            prompt_tokens = estimated_prompt
+            completion_tokens = sum(estimate_tokens(generation.text)
+                                    for generations in response.generations for generation in generations)
+
+        self.tracker.record(self.model, prompt_tokens or 0, completion_tokens or 0)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Production Server Entry Point for Abhishek Ambi's Portfolio Chatbot
+Serves the Flask app from several pre-forked worker processes, each with a
+fixed pool of request threads. The LangChain imports and the chatbot are
+loaded once in the parent, so workers start instantly and share that
+memory copy-on-write, and the workers share cached answers and one token
+budget through the chatbot's SQLite store.
+
+Run with:
+    python serve.py --workers 4 --threads 8
+    WEB_WORKERS=4 WEB_THREADS=8 PORT=7860 python serve.py
+"""
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+
+class RequestHandler(WSGIRequestHandler):
+    """Closes the connection after each request, so an idle keep-alive client never holds a pool thread."""
+
+    protocol_version = "HTTP/1.0"
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    WSGI server that answers requests on a fixed pool of threads.
+
+    When every thread is busy the worker stops accepting connections, so
+    new ones wait in the shared listen backlog for a worker with a free
+    thread instead of queueing inside a busy one.
+    """
+
+    multithread = True
+    multiprocess = True
+
+    def __init__(self, host: str, port: int, app, threads: int, fd: int):
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="request")
+        self.free_threads = threading.BoundedSemaphore(threads)
+        super().__init__(host, port, app, handler=RequestHandler, fd=fd)
+
+    def process_request(self, request, client_address):
+        self.free_threads.acquire()
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.free_threads.release()
+
+
+def listen(host: str, port: int, backlog: int) -> socket.socket:
+    """Open the listening socket the workers share."""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    return sock
+
+
+def preload(workers: int, threads: int):
+    """
+    Import the app and load the chatbot in this (parent) process.
+
+    Nothing that cannot cross a fork is left running: the chatbot is
+    built without warming its canned answers (which would open upstream
+    connections) and its store is closed again.
+
+    Returns:
+        The app module
+    """
+    started = time.time()
+    # Stops app.py from loading the chatbot in a background thread
+    os.environ['CHATBOT_PRELOAD'] = '1'
+    # Sizes the chatbot's upstream call pools to the request threads
+    os.environ['WEB_THREADS'] = str(threads)
+    import app as api
+
+    api.load_chatbot(prewarm=False)
+    if api.chatbot is not None:
+        api.chatbot.before_fork()
+    api.admission.split_rates(workers)
+    print(f"📦 Preloaded the app in {time.time() - started:.1f}s "
+          f"({'AI chatbot' if api.chatbot_available else 'fallback only'})")
+    return api
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def run_worker(api, index: int, sock: socket.socket, host: str, port: int, threads: int, prewarm: bool) -> int:
+    """
+    Serve requests in a forked worker until it is told to stop.
+
+    Returns:
+        Exit status
+    """
+    signal.signal(signal.SIGTERM, _interrupt)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    if api.chatbot is not None:
+        api.chatbot.after_fork(index, prewarm=prewarm)
+    server = PooledWSGIServer(host, port, api.app, threads, sock.fileno())
+    print(f"👷 Worker {index} (pid {os.getpid()}) serving with {threads} threads")
+    # Returns on SIGTERM/SIGINT once the requests in progress are answered
+    server.serve_forever()
+    # The parent forwards the stop signal the worker may already have had
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    server.pool.shutdown(wait=True)
+
+    if api.chatbot is not None and api.chatbot.store is not None:
+        api.chatbot.store.close()
+    return 0
+
+
+def serve(workers: int, threads: int, host: str, port: int, backlog: int = 2048, prewarm: bool = True):
+    """
+    Preload the app, fork the workers and restart any that die.
+
+    Args:
+        workers: Number of worker processes
+        threads: Request threads per worker
+        host: Address to listen on
+        port: Port to listen on
+        backlog: Connections allowed to wait for a worker
+        prewarm: Precompute the canned answers (in the first worker)
+    """
+    sock = listen(host, port, backlog)
+    api = preload(workers, threads)
+    children = {}
+    stopping = False
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                status = run_worker(api, index, sock, host, port, threads, prewarm)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(status)
+        children[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    print(f"🚀 Starting {workers} workers on http://{host}:{port}")
+    for index in range(workers):
+        spawn(index)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        print(f"⚠️ Worker {index} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}, restarting it")
+        time.sleep(1)
+        spawn(index)
+
+    sock.close()
+    print("👋 All workers stopped")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the portfolio chatbot from pre-forked worker processes")
+    parser.add_argument('-w', '--workers', type=int, default=int(os.getenv('WEB_WORKERS', os.cpu_count() or 2)),
+                        help="worker processes (default: WEB_WORKERS or the number of CPUs)")
+    parser.add_argument('-t', '--threads', type=int, default=int(os.getenv('WEB_THREADS', 8)),
+                        help="request threads per worker (default: WEB_THREADS or 8)")
+    parser.add_argument('--host', default=os.getenv('HOST', '0.0.0.0'))
+    parser.add_argument('-p', '--port', type=int, default=int(os.getenv('PORT', 7860)))
+    parser.add_argument('--backlog', type=int, default=2048, help="connections allowed to wait for a worker")
+    parser.add_argument('--no-prewarm', dest='prewarm', action='store_false',
+                        help="do not precompute the canned answers")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.threads < 1:
+        parser.error("--workers and --threads must be at least 1")
+
+    serve(args.workers, args.threads, args.host, args.port, backlog=args.backlog, prewarm=args.prewarm)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Request coalescing for Abhishek Ambi's Portfolio Chatbot
+Lets concurrent callers asking the same question share one upstream call
+instead of each sending their own.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Executor, Future
+from typing import Awaitable, Callable, Dict, Any, Hashable, Set, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """
+    Thread-safe single-flight call table.
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    with the same key while it is in flight wait for the same future and get
+    its result or exception. Threads and asyncio tasks share one table, so a
+    sync request can wait on an async leader and the other way round.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.collapsed = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """Get the in-flight future for a key, creating it if this caller leads."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.collapsed += 1
+                return future, False
+
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the call (e.g. normalized question and model)
+            fn: The work to run if no identical call is in flight
+
+        Returns:
+            The shared result (the shared exception is raised instead on failure)
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key, future)
+
+    def submit(self, key: Hashable, fn: Callable[[], T], executor: Executor) -> Future:
+        """
+        Start ``fn`` on an executor once for all concurrent callers with the same key.
+
+        Only the leader uses an executor thread; the others just get the
+        future it will complete, so waiting callers never hold pool slots.
+
+        Args:
+            key: Identity of the call
+            fn: The work to run if no identical call is in flight
+            executor: Where the leader's work runs
+
+        Returns:
+            The shared future
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future
+
+        def run():
+            try:
+                result = fn()
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                self._finish(key, future)
+
+        try:
+            executor.submit(run)
+        except BaseException as e:
+            future.set_exception(e)
+            self._finish(key, future)
+            raise
+        return future
+
+    async def do_async(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Async counterpart of ``do``.
+
+        The leader's work runs in its own task, so cancelling any one caller
+        (e.g. a client disconnect) never cancels the call the others wait on.
+
+        Args:
+            key: Identity of the call
+            factory: Returns the awaitable to run if no identical call is in flight
+
+        Returns:
+            The shared result (the shared exception is raised instead on failure)
+        """
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(self._run_async(key, future, factory))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        waiter = asyncio.wrap_future(future)
+        # A caller that stopped waiting (timeout, cancellation) must not leave
+        # an unretrieved exception behind to be logged at garbage collection
+        waiter.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return await asyncio.shield(waiter)
+
+    async def _run_async(self, key: Hashable, future: Future, factory: Callable[[], Awaitable[T]]):
+        try:
+            result = await factory()
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            self._finish(key, future)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Upstream calls made, calls collapsed into them and calls in flight
+        """
+        with self._lock:
+            calls = self.leaders + self.collapsed
+            return {
+                'upstream_calls': self.leaders,
+                'collapsed_calls': self.collapsed,
+                'in_flight': len(self._calls),
+                'collapse_rate': round(self.collapsed / calls, 4) if calls else 0.0
+            }
@@ -0,0 +1,359 @@
+"""
+Persistent state for Abhishek Ambi's Portfolio Chatbot
+Keeps cached answers and per-model cooldown state in a local SQLite file,
+so a restart neither forgets answers nor retries a model that is still
+rate limited. Writes are queued and applied by a background thread.
+Worker processes of serve.py share the same file, and with it their
+answers and token usage.
+"""
+
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    question  TEXT NOT NULL,
+    model     TEXT NOT NULL,
+    answer    TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (question, model)
+);
+CREATE INDEX IF NOT EXISTS answers_stored_at ON answers (stored_at);
+CREATE TABLE IF NOT EXISTS model_state (
+    name       TEXT PRIMARY KEY,
+    state      TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS token_usage (
+    worker        TEXT NOT NULL,
+    model         TEXT NOT NULL,
+    minute_tokens INTEGER NOT NULL,
+    day_tokens    INTEGER NOT NULL,
+    blocked_until REAL NOT NULL,
+    updated_at    REAL NOT NULL,
+    PRIMARY KEY (worker, model)
+);
+"""
+
+# Queued write operations
+_ANSWER, _MODEL_STATE, _USAGE, _CLEAR, _FLUSH = 'answer', 'model_state', 'usage', 'clear', 'flush'
+
+
+class StateStore:
+    """
+    SQLite-backed store for answers and model state.
+
+    Answers and model state are loaded at startup; after that, a cache
+    miss reads the one answer it needs (which other processes may have
+    written) through a per-thread connection, so async callers should read
+    from a worker thread. Writes go onto a queue that a daemon thread
+    drains in batches, one transaction per batch, so the request path
+    never waits for a write. The answers table is capped at
+    ``max_entries``: once it grows ``compact_slack`` past the cap, expired
+    answers and the oldest ones are deleted and the freed pages returned
+    to the file system.
+    """
+
+    def __init__(self, path: str, max_entries: int = 2000, ttl: float = 3600,
+                 compact_slack: float = 0.25, batch_size: int = 256):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite database file
+            max_entries: Maximum number of answers kept on disk
+            ttl: Seconds an answer stays valid (0 or less means no expiry)
+            compact_slack: Fraction above ``max_entries`` tolerated before compacting
+            batch_size: Maximum queued writes applied in one transaction
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.compact_slack = compact_slack
+        self.batch_size = batch_size
+
+        # One connection, used by the writer thread after the initial load
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+        self._db_lock = threading.Lock()
+        # Request threads read through their own connections, which WAL lets
+        # run alongside the writer
+        self._readers = threading.local()
+
+        self.answers_written = 0
+        self.state_writes = 0
+        self.compactions = 0
+        self.rows_compacted = 0
+        self.write_errors = 0
+        self.reads = 0
+        self.read_hits = 0
+        self.last_compaction_time: Optional[float] = None
+
+        self._queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="state-store", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def load_answers(self, limit: Optional[int] = None) -> List[Tuple[str, str, str, float]]:
+        """
+        Read the stored answers that have not expired.
+
+        Args:
+            limit: Maximum number of answers (the most recent are kept)
+
+        Returns:
+            (normalized question, model, answer, stored_at) tuples, oldest first
+        """
+        limit = self.max_entries if limit is None else limit
+        oldest = time.time() - self.ttl if self.ttl > 0 else 0.0
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT question, model, answer, stored_at FROM answers WHERE stored_at >= ? "
+                "ORDER BY stored_at DESC LIMIT ?", (oldest, limit)).fetchall()
+        return rows[::-1]
+
+    def load_state(self, name: str) -> Optional[Any]:
+        """
+        Read a piece of model state.
+
+        Args:
+            name: State name (e.g. 'router')
+
+        Returns:
+            The stored JSON value, or None if nothing was stored
+        """
+        with self._db_lock:
+            row = self._db.execute("SELECT state FROM model_state WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def get_answer(self, question: str, model: str) -> Optional[Tuple[str, float]]:
+        """
+        Read one stored answer, including answers written by other processes.
+
+        Args:
+            question: Normalized question
+            model: The model the answer must have come from
+
+        Returns:
+            (answer, stored_at), or None if there is no unexpired answer
+        """
+        oldest = time.time() - self.ttl if self.ttl > 0 else 0.0
+        self.reads += 1
+        try:
+            row = self._reader().execute(
+                "SELECT answer, stored_at FROM answers WHERE question = ? AND model = ? AND stored_at >= ?",
+                (question, model, oldest)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is not None:
+            self.read_hits += 1
+        return row
+
+    def load_peer_usage(self, worker: str) -> Dict[str, Dict[str, float]]:
+        """
+        Add up the token usage other worker processes last reported.
+
+        Minute totals only count from workers that reported within the last
+        minute, day totals from those that reported within the last day.
+
+        Args:
+            worker: This process's worker id (its own rows are left out)
+
+        Returns:
+            Model -> 'minute_tokens', 'day_tokens' and the latest 'blocked_until'
+        """
+        now = time.time()
+        rows = self._reader().execute(
+            "SELECT model, SUM(CASE WHEN updated_at >= ? THEN minute_tokens ELSE 0 END), "
+            "SUM(day_tokens), MAX(blocked_until) FROM token_usage "
+            "WHERE worker != ? AND updated_at >= ? GROUP BY model",
+            (now - 60, worker, now - 86400)).fetchall()
+        return {model: {'minute_tokens': minute or 0, 'day_tokens': day or 0, 'blocked_until': blocked or 0.0}
+                for model, minute, day, blocked in rows}
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read-only connection."""
+        db = getattr(self._readers, 'db', None)
+        if db is None:
+            db = self._readers.db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            db.execute("PRAGMA query_only = ON")
+        return db
+
+    def save_answer(self, question: str, model: str, answer: str, stored_at: Optional[float] = None):
+        """Queue an answer to be written (replaces the stored answer for the same question and model)."""
+        self._queue.put((_ANSWER, (question, model, answer, stored_at or time.time())))
+
+    def save_state(self, name: str, state: Any):
+        """Queue a JSON-serializable piece of model state to be written."""
+        self._queue.put((_MODEL_STATE, (name, json.dumps(state), time.time())))
+
+    def save_usage(self, worker: str, usage: Dict[str, Dict[str, float]]):
+        """
+        Queue this worker's current token usage for the other workers to read.
+
+        Args:
+            worker: This process's worker id
+            usage: Model -> 'minute_tokens', 'day_tokens' and 'blocked_until'
+        """
+        now = time.time()
+        for model, counts in usage.items():
+            self._queue.put((_USAGE, (worker, model, counts['minute_tokens'], counts['day_tokens'],
+                                      counts['blocked_until'], now)))
+
+    def clear_answers(self):
+        """Queue the removal of every stored answer."""
+        self._queue.put((_CLEAR, None))
+
+    def flush(self, timeout: Optional[float] = 10) -> bool:
+        """
+        Wait until every write queued so far is on disk.
+
+        Returns:
+            Whether the writes finished within the timeout
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self):
+        """Write what is still queued and close the database."""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._queue.put((_FLUSH, None))
+        self._writer.join(timeout=10)
+        with self._db_lock:
+            self._db.close()
+
+    def reopen(self) -> "StateStore":
+        """
+        Open a new store on the same file with the same settings.
+
+        A forked worker process must not use its parent's connection or
+        writer thread; the parent closes its store before forking and each
+        worker reopens it.
+        """
+        return StateStore(self.path, max_entries=self.max_entries, ttl=self.ttl,
+                          compact_slack=self.compact_slack, batch_size=self.batch_size)
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            flushed = [done for op, done in batch if op == _FLUSH]
+            try:
+                self._apply(batch)
+            except sqlite3.Error as e:
+                self.write_errors += 1
+                print(f"⚠️ Could not persist chatbot state: {e}")
+
+            for done in flushed:
+                if done is not None:
+                    done.set()
+            if None in flushed:
+                return
+
+    def _apply(self, batch: List[Tuple[str, Any]]):
+        """Apply a batch of queued writes in one transaction, then compact if needed."""
+        answers, states, usage = [], {}, {}
+        with self._db_lock:
+            with self._db:
+                for op, payload in batch:
+                    if op == _CLEAR:
+                        answers.clear()
+                        self._db.execute("DELETE FROM answers")
+                    elif op == _ANSWER:
+                        answers.append(payload)
+                    elif op == _MODEL_STATE:
+                        # Only the latest value of each piece of state matters
+                        states[payload[0]] = payload
+                    elif op == _USAGE:
+                        usage[payload[:2]] = payload
+                self._db.executemany("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)", answers)
+                self._db.executemany("INSERT OR REPLACE INTO model_state VALUES (?, ?, ?)", states.values())
+                if usage:
+                    self._db.executemany("INSERT OR REPLACE INTO token_usage VALUES (?, ?, ?, ?, ?, ?)",
+                                         usage.values())
+                    # Workers that stopped reporting a day ago no longer count
+                    self._db.execute("DELETE FROM token_usage WHERE updated_at < ?", (time.time() - 86400,))
+            self.answers_written += len(answers)
+            self.state_writes += len(states)
+
+            if answers and self._count() > self.max_entries * (1 + self.compact_slack):
+                self._compact()
+
+    def _count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def _compact(self):
+        """Drop expired and surplus answers and release the freed pages (db lock must be held)."""
+        with self._db:
+            removed = 0
+            if self.ttl > 0:
+                removed += self._db.execute("DELETE FROM answers WHERE stored_at < ?",
+                                            (time.time() - self.ttl,)).rowcount
+            removed += self._db.execute(
+                "DELETE FROM answers WHERE rowid NOT IN "
+                "(SELECT rowid FROM answers ORDER BY stored_at DESC LIMIT ?)", (self.max_entries,)).rowcount
+        self._db.execute("PRAGMA incremental_vacuum")
+        self.compactions += 1
+        self.rows_compacted += removed
+        self.last_compaction_time = time.time()
+
+    def compact(self):
+        """Compact the answers table now (normally done automatically)."""
+        self.flush()
+        with self._db_lock:
+            self._compact()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            File, size cap, stored rows, queued writes, and read/write/compaction counters
+        """
+        stored, file_bytes = None, None
+        with self._db_lock:
+            if not self._closed:
+                stored = self._count()
+                file_bytes = (self._db.execute("PRAGMA page_count").fetchone()[0] *
+                              self._db.execute("PRAGMA page_size").fetchone()[0])
+        return {
+            'path': self.path,
+            'max_entries': self.max_entries,
+            'stored_answers': stored,
+            'file_bytes': file_bytes,
+            'queued_writes': self._queue.qsize(),
+            'answers_written': self.answers_written,
+            'state_writes': self.state_writes,
+            'compactions': self.compactions,
+            'rows_compacted': self.rows_compacted,
+            'write_errors': self.write_errors,
+            'reads': self.reads,
+            'read_hits': self.read_hits,
+            'last_compaction_time': self.last_compaction_time
+        }
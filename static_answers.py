@@ -0,0 +1,163 @@
+"""
+Precomputed responses for Abhishek Ambi's Portfolio Chatbot
+Serializes the fixed answers (fallback categories and canned questions)
+once, keeps gzip and brotli copies next to the plain body, and validates
+them with strong ETags, so GET requests for them cost a dict lookup and
+can be absorbed by browser and CDN caches.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+# Content codings offered, best first
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+class PrecomputedBody:
+    """One serialized response with its compressed variants and validator."""
+
+    __slots__ = ('source', 'bodies', 'etag')
+
+    def __init__(self, source: str, body: bytes, gzip_level: int = 9, brotli_quality: int = 11):
+        self.source = source
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        # Content coding ('identity' for none) -> bytes; a variant that
+        # does not come out smaller is not offered
+        self.bodies: Dict[str, bytes] = {'identity': body}
+        compressed = gzip.compress(body, compresslevel=gzip_level, mtime=0)
+        if len(compressed) < len(body):
+            self.bodies['gzip'] = compressed
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=brotli_quality)
+            if len(compressed) < len(body):
+                self.bodies['br'] = compressed
+
+    def etag_for(self, encoding: str) -> str:
+        """Strong ETag of one representation (each content coding has its own)."""
+        return f'"{self.etag}"' if encoding == 'identity' else f'"{self.etag}-{encoding}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """
+        Check an If-None-Match header against this body.
+
+        Any representation's tag matches, since they all carry the same
+        content, and weak tags compare equal to strong ones (RFC 9110).
+        """
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag == '*':
+                return True
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            tag = tag.strip('"')
+            if tag.split('-', 1)[0] == self.etag:
+                return True
+        return False
+
+    def select(self, quality: Callable[[str], float]) -> Tuple[str, bytes]:
+        """
+        Pick the representation to send.
+
+        Args:
+            quality: Client preference for a content coding (0 means not acceptable)
+
+        Returns:
+            (content coding, body)
+        """
+        for encoding in ENCODINGS:
+            if encoding in self.bodies and quality(encoding) > 0:
+                return encoding, self.bodies[encoding]
+        return 'identity', self.bodies['identity']
+
+
+class PrecomputedResponses:
+    """
+    Thread-safe set of precomputed bodies keyed by name.
+
+    A body is only serialized and compressed again when the text it was
+    built from changes, so answers that never change are built once at
+    startup and canned answers once per refresh.
+    """
+
+    def __init__(self, render: Callable[[str, str], Dict[str, Any]],
+                 dumps: Callable[[Any], str] = json.dumps, gzip_level: int = 9, brotli_quality: int = 11):
+        """
+        Initialize the set.
+
+        Args:
+            render: Builds the JSON payload for a name and its answer text
+            dumps: JSON serializer (the web framework's, so bodies match its other responses)
+            gzip_level: gzip compression level
+            brotli_quality: brotli quality (when brotli is installed)
+        """
+        self.render = render
+        self.dumps = dumps
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._bodies: Dict[str, PrecomputedBody] = {}
+        self._lock = threading.Lock()
+
+        self.builds = 0
+        self.hits = 0
+
+    def get(self, name: str, source: str) -> PrecomputedBody:
+        """
+        Get the body for a name, rebuilding it if its text changed.
+
+        Args:
+            name: Category or canned question name
+            source: The current answer text
+
+        Returns:
+            The precomputed body
+        """
+        entry = self._bodies.get(name)
+        if entry is not None and (entry.source is source or entry.source == source):
+            self.hits += 1
+            return entry
+
+        body = (self.dumps(self.render(name, source)) + "\n").encode('utf-8')
+        entry = PrecomputedBody(source, body, self.gzip_level, self.brotli_quality)
+        with self._lock:
+            self._bodies[name] = entry
+            self.builds += 1
+        return entry
+
+    def build(self, sources: Dict[str, str]):
+        """Precompute the bodies for several names at once (e.g. at startup)."""
+        for name, source in sources.items():
+            self.get(name, source)
+
+    def names(self) -> List[str]:
+        return list(self._bodies)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get precomputed response statistics.
+
+        Returns:
+            Bodies held, their sizes per content coding, builds and hits
+        """
+        with self._lock:
+            bodies = list(self._bodies.values())
+        sizes: Dict[str, int] = {}
+        for entry in bodies:
+            for encoding, body in entry.bodies.items():
+                sizes[encoding] = sizes.get(encoding, 0) + len(body)
+        return {
+            'bodies': len(bodies),
+            'encodings': ['identity', *ENCODINGS],
+            'bytes': sizes,
+            'builds': self.builds,
+            'hits': self.hits
+        }
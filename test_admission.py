@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for admission control
+Checks how clients are identified and that the token buckets and the
+wait queue admit, queue and reject requests as configured. The clock is
+replaced, so refills are exact and the tests do not sleep.
+"""
+
+import pytest
+
+import admission
+from admission import AdmissionController, ClientIdentifier
+
+
+class FakeClock:
+    """Stands in for the time module in admission.py; sleeping advances the clock."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(admission, 'time', fake)
+    return fake
+
+
+def test_spoofed_forwarded_for_is_ignored():
+    """X-Forwarded-For only counts when the connecting peer is a trusted proxy."""
+    identifier = ClientIdentifier(trusted_proxies=["10.0.0.0/8"])
+
+    assert identifier.identify(None, "1.2.3.4", "203.0.113.7") == "ip:203.0.113.7"
+    assert identifier.identify(None, "1.2.3.4", "10.0.0.2") == "ip:1.2.3.4"
+    # A client-supplied hop in front of the real one behind two proxies is not believed either
+    assert identifier.identify(None, "9.9.9.9, 1.2.3.4, 10.0.0.3", "10.0.0.2") == "ip:1.2.3.4"
+
+
+def test_unknown_api_key_is_rejected():
+    """Only configured API keys identify a client; any other key falls back to the address."""
+    identifier = ClientIdentifier(api_keys=["secret-key"])
+
+    assert identifier.identify("made-up-key", None, "203.0.113.7") == "ip:203.0.113.7"
+    client = identifier.identify("secret-key", None, "203.0.113.7")
+    assert client.startswith("key:") and "secret-key" not in client
+
+
+def test_burst_then_refill(clock):
+    """After its burst a client is rejected with the time until the next token, then admitted again."""
+    controller = AdmissionController(client_rate=1 / 60, client_burst=2, max_queue_wait=0)
+
+    assert controller.check("client").admitted
+    assert controller.check("client").admitted
+    rejected = controller.check("client")
+    assert not rejected.admitted and rejected.retry_after == pytest.approx(60)
+
+    clock.now += 45
+    assert controller.check("client").retry_after == pytest.approx(15)
+    clock.now += 15
+    assert controller.check("client").admitted
+    # Other clients have buckets of their own
+    assert controller.check("other").admitted
+
+
+def test_queue_overflows_at_max_depth(clock):
+    """Requests wait in the queue up to max_queue_depth; the next one is rejected until one leaves."""
+    controller = AdmissionController(client_rate=100, client_burst=100, global_rate=1, global_burst=1,
+                                     max_queue_depth=2, max_queue_wait=10)
+
+    assert controller.check("a").wait == 0
+    queued = [controller.check(client) for client in ("b", "c")]
+    assert all(outcome.admitted and outcome.wait > 0 for outcome in queued)
+    assert controller.queue_depth == 2
+
+    overflow = controller.check("d")
+    assert not overflow.admitted and overflow.retry_after >= 1
+
+    controller.dequeue()
+    assert controller.check("d").admitted
+    assert controller.stats()['rejected'] == 1
+
+
+def test_admit_sleeps_through_its_wait(clock):
+    """admit waits for its turn and leaves the queue afterwards."""
+    controller = AdmissionController(client_rate=100, client_burst=100, global_rate=2, global_burst=1)
+
+    assert controller.admit("a") == (True, 0.0)
+    assert controller.admit("b") == (True, 0.0)
+    assert clock.now == pytest.approx(1000.5)
+    assert controller.queue_depth == 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the answer caches
+Checks that the reworded-question cache reuses answers only for questions
+with the same content words, never for questions about a different
+entity or event.
+"""
+
+import pytest
+
+from answer_cache import AnswerCache, RewordedAnswerCache
+
+MODEL = "gemma2-9b-it"
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("Does he know React?", "Does he know React Native?"),
+    ("Does he know React Native?", "Does he know React?"),
+    ("When did he finish his diploma?", "When did he start his diploma?"),
+    ("What tech do you know?", "List your skills"),
+])
+def test_different_questions_miss(cached, asked):
+    """Questions that differ in an entity or verb never share an answer, however similar their wording."""
+    cache = RewordedAnswerCache()
+    cache.set(cached, MODEL, "cached answer")
+
+    assert cache.get(asked, MODEL) is None
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("What are your technical skills?", "Tell me his technical skills"),
+    ("Which projects has he built?", "Projects he built"),
+    ("Show me the project using Flutter", "Tell me about projects using Flutter"),
+])
+def test_reworded_questions_hit(cached, asked):
+    """Filler words, word order and plurals do not stop a match."""
+    cache = RewordedAnswerCache()
+    cache.set(cached, MODEL, "cached answer")
+
+    assert cache.get(asked, MODEL) == "cached answer"
+
+
+def test_filler_only_questions_are_not_cached():
+    """A question with no content words has nothing to match on, so it is never stored."""
+    cache = RewordedAnswerCache()
+    cache.set("What is your?", MODEL, "cached answer")
+
+    assert len(cache) == 0
+    assert cache.get("Tell me about you", MODEL) is None
+
+
+def test_answers_are_kept_per_model():
+    """An answer from one model is not served for another, in either cache."""
+    for cache in (AnswerCache(), RewordedAnswerCache()):
+        cache.set("What are your technical skills?", MODEL, "cached answer")
+        assert cache.get("What are your technical skills?", "compound-beta-mini") is None
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
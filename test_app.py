@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+HTTP tests for the Portfolio Chatbot API
+Drives the Flask app (and the native async /ask) in-process with the
+test client. The AI chatbot is not loaded at import; tests that need it
+install one on the fake model backend.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+
+# Read by app.py at import: no background loader, no store file, and
+# rate limits that the tests do not run into
+os.environ['CHATBOT_PRELOAD'] = '1'
+os.environ['CHATBOT_STORE_PATH'] = ''
+os.environ['LLM_BACKEND'] = 'fake'
+os.environ['RATE_LIMIT_CLIENT_BURST'] = '1000'
+os.environ['RATE_LIMIT_GLOBAL_BURST'] = '1000'
+
+import pytest
+
+import admission
+import app as api
+import asgi
+from admission import AdmissionController
+from portfolio_chatbot import CANNED_QUESTIONS, PortfolioChatbot
+from static_answers import PrecomputedResponses
+
+
+def fake_chatbot(**options):
+    """Chatbot on the fake backend that answers instantly, with extra fake model options."""
+    options = {'': dict({'latency': 0, 'distribution': 'fixed', 'tokens_per_second': 0}, **options)}
+    return PortfolioChatbot(llm_backend='fake', fake_llm_options=options,
+                            models=["model-a", "model-b"], use_retrieval=False)
+
+
+@pytest.fixture
+def client():
+    return api.app.test_client()
+
+
+@pytest.fixture
+def ai_chatbot(monkeypatch):
+    """Install an AI chatbot on the fake backend; returns a setter taking fake model options."""
+    def install(**options):
+        chatbot = fake_chatbot(**options)
+        monkeypatch.setattr(api, 'chatbot', chatbot)
+        monkeypatch.setattr(api, 'chatbot_available', True)
+        return chatbot
+    return install
+
+
+def asgi_post(path, body):
+    """POST a raw body to the ASGI app; returns (status, JSON payload)."""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': path, 'raw_path': path.encode('ascii'),
+             'query_string': b'', 'root_path': '', 'scheme': 'http', 'http_version': '1.1',
+             'headers': [(b'content-type', b'application/json')],
+             'client': ('127.0.0.1', 40000), 'server': ('testserver', 80)}
+    asyncio.run(asgi.app(scope, receive, send))
+    start = next(message for message in messages if message['type'] == 'http.response.start')
+    body = b''.join(message.get('body', b'') for message in messages if message['type'] == 'http.response.body')
+    return start['status'], json.loads(body)
+
+
+def sse_events(response):
+    """Parse a Server-Sent Events body into (event name, data) pairs."""
+    events = []
+    for block in response.get_data(as_text=True).strip().split("\n\n"):
+        name, data = None, None
+        for line in block.splitlines():
+            if line.startswith("event: "):
+                name = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+        events.append((name, data))
+    return events
+
+
+def test_stream_answer_ends_with_done(client, ai_chatbot):
+    """A streamed model answer is closed by a successful done event."""
+    ai_chatbot()
+    events = sse_events(client.post('/ask/stream', json={'question': 'What are his skills?'}))
+
+    assert events[-1] == ('done', {'status': 'success', 'response_source': 'AI-powered',
+                                   'chatbot_available': True})
+    assert "".join(data['token'] for name, data in events if name is None).startswith("[model-")
+
+
+def test_stream_failure_falls_back(client, ai_chatbot):
+    """When every model fails, the stream carries the fallback answer, labelled as such, not the error text."""
+    ai_chatbot(error_rate=1.0)
+    events = sse_events(client.post('/ask/stream', json={'question': 'What are his skills?'}))
+
+    tokens = [data['token'] for name, data in events if name is None]
+    assert tokens == [api.fallback_chatbot.ask('What are his skills?')]
+    assert events[-1] == ('done', {'status': 'success', 'response_source': 'fallback',
+                                   'chatbot_available': True})
+
+
+def first_keyword_category(question):
+    """The fallback scoring before the keyword matcher: the first category with any keyword substring."""
+    question_lower = question.lower()
+    for category, data in api.fallback_chatbot.knowledge_base.items():
+        if category != 'default' and any(keyword in question_lower for keyword in data['keywords']):
+            return category
+    return None
+
+
+# Canned questions the matcher answers differently from the first-keyword
+# scan, because a later category has clearly more hits
+BETTER_THAN_FIRST_KEYWORD = {
+    'get_skills_summary': ['skills'],
+    'get_career_advice': ['career'],
+    'get_contact_info': ['contact']
+}
+
+
+@pytest.mark.parametrize("name", sorted(CANNED_QUESTIONS))
+def test_fallback_keeps_the_old_category_for_canned_questions(name):
+    """The old first-keyword category is still answered, except where another category clearly scores higher."""
+    question = CANNED_QUESTIONS[name]
+    categories = api.fallback_chatbot.matcher.match(question)
+
+    if name in BETTER_THAN_FIRST_KEYWORD:
+        assert categories == BETTER_THAN_FIRST_KEYWORD[name]
+    else:
+        assert categories[0] == first_keyword_category(question)
+
+
+def test_fallback_combines_close_categories():
+    """A question about two topics gets both answers, best first."""
+    knowledge_base = api.fallback_chatbot.knowledge_base
+    answer = api.fallback_chatbot.ask("What are his hobbies and career plans?")
+
+    assert answer == knowledge_base['hobbies']['response'] + "\n\n" + knowledge_base['career']['response']
+
+
+def test_fallback_does_not_read_keywords_inside_longer_words():
+    """"work" inside "frameworks" no longer sends a skills question to projects."""
+    question = "What programming languages and frameworks does he know?"
+
+    assert first_keyword_category(question) == 'projects'
+    assert api.fallback_chatbot.ask(question) == api.fallback_chatbot.knowledge_base['skills']['response']
+
+
+def test_fallback_without_keywords_handles_the_unknown_topic():
+    """A question without any keyword gets the unknown-topic answer."""
+    assert api.fallback_chatbot.ask("What is his expected salary?").startswith("**Salary & Compensation")
+
+
+def test_answer_encodings_have_their_own_etags(client):
+    """The gzip and identity bodies of an answer carry different strong ETags and vary on Accept-Encoding."""
+    identity = client.get('/answers/skills', headers={'Accept-Encoding': 'identity'})
+    compressed = client.get('/answers/skills', headers={'Accept-Encoding': 'gzip'})
+
+    assert identity.status_code == compressed.status_code == 200
+    assert 'Content-Encoding' not in identity.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.get_data()) == identity.get_data()
+    assert identity.get_json()['answer'] == api.fallback_chatbot.knowledge_base['skills']['response']
+
+    etags = [identity.headers['ETag'], compressed.headers['ETag']]
+    assert etags[0] != etags[1]
+    assert not any(etag.startswith('W/') for etag in etags)
+    assert identity.headers['Vary'] == compressed.headers['Vary'] == 'Accept-Encoding'
+
+
+@pytest.mark.parametrize("encoding", ['identity', 'gzip'])
+def test_current_etag_gets_not_modified(client, encoding):
+    """A client revalidating with a current ETag gets 304 with an empty body."""
+    first = client.get('/answers/projects', headers={'Accept-Encoding': encoding})
+    response = client.get('/answers/projects', headers={'Accept-Encoding': encoding,
+                                                        'If-None-Match': first.headers['ETag']})
+
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == first.headers['ETag']
+    assert response.headers['Vary'] == 'Accept-Encoding'
+
+
+def test_stale_etag_after_warm_refresh(client, ai_chatbot):
+    """Once a warm refresh changed a canned answer, the old ETag no longer matches and the new answer is sent."""
+    chatbot = ai_chatbot()
+    chatbot.warm_answers.warm()
+    first = client.get('/answers/canned/list_projects')
+    assert first.status_code == 200
+    assert client.get('/answers/canned/list_projects',
+                      headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    chatbot.warm_answers.compute = lambda question: ("Refreshed project list", chatbot.current_model)
+    chatbot.warm_answers.warm()
+    response = client.get('/answers/canned/list_projects', headers={'If-None-Match': first.headers['ETag']})
+
+    assert response.status_code == 200
+    assert response.get_json()['answer'] == "Refreshed project list"
+    assert response.headers['ETag'] != first.headers['ETag']
+
+
+def test_precomputed_body_is_built_once_per_text():
+    """PrecomputedResponses only serializes a body again when its answer text changed."""
+    responses = PrecomputedResponses(lambda name, answer: {'name': name, 'answer': answer})
+    first = responses.get('skills', "Python and Java")
+
+    assert responses.get('skills', "Python and Java") is first
+    changed = responses.get('skills', "Python, Java and Go")
+    assert changed.etag != first.etag
+    assert not changed.matches(first.etag_for('identity'))
+    assert changed.matches(f'W/{changed.etag_for("gzip")}')
+    assert responses.builds == 2 and responses.hits == 1
+
+
+BAD_BODIES = [b'[1]', b'"What are his skills?"', b'42', b'{}', b'not json']
+
+
+@pytest.mark.parametrize("body", BAD_BODIES)
+@pytest.mark.parametrize("path", ['/ask', '/ask/batch', '/ask/stream'])
+def test_flask_rejects_bodies_that_are_not_objects(client, path, body):
+    """A body that is not a JSON object is a 400, not a 500."""
+    response = client.post(path, data=body, content_type='application/json')
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'No JSON data provided', 'status': 'error'}
+
+
+@pytest.mark.parametrize("body", BAD_BODIES)
+def test_async_ask_rejects_the_same_bodies(body):
+    """The native async /ask answers the same bad bodies exactly like Flask's."""
+    assert asgi_post('/ask', body) == (400, {'error': 'No JSON data provided', 'status': 'error'})
+
+
+def test_rate_limited_client_gets_retry_after(client, monkeypatch):
+    """Past its burst a client gets 429 with the seconds until its next token, and is served once it refilled."""
+    now = [1000.0]
+    monkeypatch.setattr(admission.time, 'time', lambda: now[0])
+    monkeypatch.setattr(api, 'admission', AdmissionController(client_rate=0.5, client_burst=2,
+                                                              max_queue_wait=0))
+    ask = lambda: client.post('/ask', json={'question': 'What are his skills?'})
+
+    assert [ask().status_code for _ in range(2)] == [200, 200]
+    response = ask()
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '2'
+    assert response.get_json()['retry_after_seconds'] == 2
+
+    now[0] += 1
+    assert ask().headers['Retry-After'] == '1'
+    now[0] += 1
+    assert ask().status_code == 200
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Behaviour tests for the portfolio chatbot
+Runs offline on the fake model backend with the default per-model token
+limits, so budgeting and routing are exercised without spending quota.
+"""
+
+import asyncio
+import threading
+import time
+
+from portfolio_chatbot import PortfolioChatbot
+
+# app.MAX_BATCH_SIZE (importing app would start loading its own chatbot)
+MAX_BATCH_SIZE = 50
+
+
+def fake_chatbot(**kwargs):
+    """Chatbot on the fake backend that answers instantly, with Groq's default model pool and limits."""
+    options = {'': {'latency': 0, 'distribution': 'fixed', 'tokens_per_second': 0}}
+    return PortfolioChatbot(llm_backend='fake', fake_llm_options=options,
+                            models=["gemma2-9b-it", "compound-beta-mini"], **kwargs)
+
+
+def test_full_batch_is_answered():
+    """A batch of MAX_BATCH_SIZE questions is spread over the models' budgets instead of refused."""
+
+    print("🧪 Full Batch Within the Token Budgets")
+    print("=" * 50)
+
+    chatbot = fake_chatbot()
+    questions = [f"Tell me about project number {n} and the technologies it used" for n in range(MAX_BATCH_SIZE)]
+    # The whole batch is estimated far above every model's tokens-per-minute limit
+    assert chatbot._estimate_tokens([chatbot._chain_inputs(q) for q in questions]) > 70000
+
+    results = chatbot.ask_many(questions, max_concurrency=4)
+
+    failed = [result for result in results if result['status'] != 'success']
+    usage = chatbot.get_usage_stats()
+    for model, stats in usage.items():
+        print(f"   {model}: {stats['requests']} requests, {stats['tokens_last_minute']} tokens")
+    assert not failed, failed[0]['error']
+    assert [result['question'] for result in results] == questions
+    assert sum(stats['requests'] for stats in usage.values()) == MAX_BATCH_SIZE
+    print(f"   ✅ All {MAX_BATCH_SIZE} questions answered")
+
+
+def test_batch_chunks_fit_the_budget():
+    """A chunk larger than any model's budget is split rather than failed."""
+    chatbot = fake_chatbot(model_limits={
+        "gemma2-9b-it": {'tokens_per_minute': 3000, 'tokens_per_day': None},
+        "compound-beta-mini": {'tokens_per_minute': 3000, 'tokens_per_day': None}
+    })
+    questions = ["What are his skills?", "How can I contact him?", "Tell me about his education"]
+
+    results = chatbot.ask_many(questions, max_concurrency=len(questions))
+
+    assert all(result['status'] == 'success' for result in results)
+
+
+def test_recovering_model_gets_one_probe_from_a_batch():
+    """A half-open model is sent a single question; the rest of the chunk follows once the probe succeeds."""
+    chatbot = fake_chatbot(use_retrieval=False)
+    model = chatbot.router.models[0]
+    chatbot.router.record_failure(model, cooldown=0.05)
+    time.sleep(0.1)
+
+    batches = []
+    chain_for = chatbot._chain_for
+
+    class RecordingChain:
+        def __init__(self, name):
+            self.chain = chain_for(name)
+            self.name = name
+            self.output_key = self.chain.output_key
+
+        def batch(self, inputs, **kwargs):
+            batches.append((self.name, len(inputs)))
+            return self.chain.batch(inputs, **kwargs)
+
+    chatbot._chain_for = RecordingChain
+    results = chatbot.ask_many([f"Tell me about topic {n}" for n in range(4)], max_concurrency=4)
+
+    assert all(result['status'] == 'success' for result in results)
+    assert batches == [(model, 1), (model, 3)]
+    # Batch calls feed the latency average and the hedging percentiles
+    assert chatbot.router.latency[model] is not None
+    assert chatbot.router.latency_percentile(model, 0.5) is not None
+
+
+def test_concurrent_picks_cannot_share_the_last_budget():
+    """Requests picked at the same time reserve their tokens, so they cannot all fit one remaining budget."""
+    limits = {'tokens_per_minute': 1000, 'tokens_per_day': None}
+    chatbot = fake_chatbot(use_retrieval=False, max_budget_wait=1.0,
+                           model_limits={"gemma2-9b-it": limits, "compound-beta-mini": limits})
+    # Each model's minute is already 60% spent; one more 300-token request fits, two do not
+    for model in chatbot.router.models:
+        chatbot.usage.record(model, 600, 0)
+
+    barrier = threading.Barrier(4)
+    picks = []
+
+    def pick():
+        barrier.wait()
+        picks.append(chatbot._pick_model(300, set())[0])
+
+    threads = [threading.Thread(target=pick) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(picks, key=str) == [None, None, "compound-beta-mini", "gemma2-9b-it"]
+    assert all(stats['reserved_tokens'] == 300 for stats in chatbot.get_usage_stats().values())
+
+
+def test_finished_call_settles_its_reservation():
+    """Answering, or failing to, gives the reserved tokens back to the budget."""
+    chatbot = fake_chatbot(use_retrieval=False)
+    chatbot.ask("What are his skills?")
+
+    assert all(stats['reserved_tokens'] == 0 for stats in chatbot.get_usage_stats().values())
+
+
+def test_follow_up_retrieves_earlier_topic():
+    """A follow-up question is searched together with the latest turn, so it gets that turn's knowledge."""
+    chatbot = fake_chatbot()
+    follow_up = "tell me more about the second one"
+    chatbot.conversations.record("session", "Where did he study?",
+                                 "He studied at RV Institute of Technology and Management, "
+                                 "and before that at K.L.E. Society's Polytechnic in Mahalingapur.")
+
+    history, recent = chatbot._session_history("session")
+    context = chatbot._chain_inputs(follow_up, history, recent)["context"]
+
+    assert "EDUCATION:" in context
+    assert "POLYTECHNIC MAHALINGAPUR" in context
+    # On its own the follow-up matches nothing and gets the default sections
+    assert "EDUCATION:" not in chatbot._chain_inputs(follow_up)["context"]
+
+
+
+def test_async_store_read_is_off_the_event_loop(tmp_path):
+    """An answer another worker stored is served to ask_async without reading SQLite on the loop thread."""
+    chatbot = fake_chatbot(store_path=str(tmp_path / "state.db"), use_retrieval=False)
+    chatbot.store.save_answer("what are his hobbies", chatbot.current_model, "stored answer")
+    assert chatbot.store.flush()
+
+    read_threads = []
+    get_answer = chatbot.store.get_answer
+
+    def recording_get_answer(*args):
+        read_threads.append(threading.current_thread())
+        return get_answer(*args)
+
+    chatbot.store.get_answer = recording_get_answer
+
+    async def ask():
+        return await chatbot.ask_async("What are his hobbies?"), threading.current_thread()
+
+    answer, loop_thread = asyncio.run(ask())
+    chatbot.store.close()
+
+    assert answer == "stored answer"
+    assert read_threads and loop_thread not in read_threads
+
+
+if __name__ == "__main__":
+    import sys
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for model switching
+Hammers PortfolioChatbot.ask from many threads while another thread keeps
+switching the preferred model, and checks that every answer came from the
+model its call was routed to. Runs offline with LangChain's fake chat model.
+"""
+
+import contextlib
+import io
+import random
+import threading
+import time
+from collections import Counter
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from chatbot_common import AnswerTimeout
+from portfolio_chatbot import PortfolioChatbot
+
+
+class StressChatbot(PortfolioChatbot):
+    """Chatbot whose models answer instantly with their own name, recording which model each call went to."""
+
+    def __init__(self, *args, **kwargs):
+        self.calls = {}
+        self._calls_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _make_llm(self, model):
+        return FakeListChatModel(responses=[f"answer from {model}"])
+
+    def _call(self, model, inputs):
+        # Recorded before the chain runs, so a call that ends up on another
+        # model's chain gives an answer that does not match
+        with self._calls_lock:
+            self.calls[inputs["user_input"]] = model
+        return super()._call(model, inputs)
+
+
+def test_ask_during_switches(threads=16, requests_per_thread=200, switch_interval=0.0005):
+    """Ask from many threads while the preferred model flips back and forth."""
+
+    print("🧪 Stress Testing ask() During Model Switches")
+    print("=" * 50)
+
+    chatbot = StressChatbot(api_key="stress-test", use_retrieval=False)
+    models = chatbot.router.models
+    answers = {}
+    errors = []
+    switches = 0
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def switcher():
+        # Open every other model's breaker so the router (and with it the
+        # preferred chain) moves to a random model while requests are in flight
+        nonlocal switches
+        while not done.is_set():
+            target = random.choice(models)
+            chatbot.router.record_success(target)
+            for model in models:
+                if model != target:
+                    chatbot.router.record_failure(model, cooldown=60)
+            switches += 1
+            time.sleep(switch_interval)
+
+    def worker(worker_id):
+        for i in range(requests_per_thread):
+            question = f"question {worker_id}-{i}"
+            try:
+                answer = chatbot.ask(question, use_cache=False)
+                with lock:
+                    answers[question] = answer
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+
+    # The switch messages would drown the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        switch_thread = threading.Thread(target=switcher, daemon=True)
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        started = time.time()
+        switch_thread.start()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        done.set()
+        switch_thread.join()
+        elapsed = time.time() - started
+
+    total = threads * requests_per_thread
+    # Between two routing changes every model can briefly be open; that is
+    # a refusal, not a torn answer
+    refused = [question for question, answer in answers.items() if question not in chatbot.calls]
+    mismatched = {question: (chatbot.calls[question], answer) for question, answer in answers.items()
+                  if question in chatbot.calls and answer != f"answer from {chatbot.calls[question]}"}
+    per_model = Counter(chatbot.calls[question] for question in answers if question in chatbot.calls)
+
+    print(f"\n📊 {total} requests from {threads} threads in {elapsed:.2f}s ({total / elapsed:.0f} req/s)")
+    print(f"🔄 Routing changes during the run: {switches}")
+    for model in models:
+        print(f"   answered by {model}: {per_model[model]}")
+    print(f"   refused while no model was available: {len(refused)}")
+
+    assert not errors, f"{len(errors)} requests raised, first: {errors[0]}"
+    assert len(answers) == total
+    assert not mismatched, f"{len(mismatched)} answers came from another model, e.g. {next(iter(mismatched.items()))}"
+    assert all(answers[question].startswith("Sorry, all models") for question in refused)
+    assert switches > 1 and len(per_model) == len(models)
+    print("   ✅ Every answer came from the model its call was routed to")
+
+
+def slow_chatbot(latency, **kwargs):
+    """Chatbot on the fake backend whose upstream calls take a fixed ``latency`` seconds."""
+    options = {'': {'latency': latency, 'distribution': 'fixed', 'tokens_per_second': 0}}
+    return PortfolioChatbot(llm_backend='fake', fake_llm_options=options, models=["model-a", "model-b"],
+                            use_retrieval=False, **kwargs)
+
+
+def ask_concurrently(chatbot, questions, timeout):
+    """Ask every question from its own thread; returns the answers or raised exceptions in order."""
+    results = [None] * len(questions)
+
+    def worker(index):
+        try:
+            results[index] = chatbot.ask(questions[index], timeout=timeout)
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(len(questions))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_deadline_callers_beyond_overdue_cap(callers=64):
+    """More concurrent callers with a deadline than max_overdue_calls are all answered."""
+
+    print("🧪 Concurrent Requests With a Deadline")
+    print("=" * 50)
+
+    chatbot = slow_chatbot(0.5, max_overdue_calls=32)
+
+    # Identical questions coalesce into one upstream call; the followers
+    # wait on its future without taking a pool thread
+    started = time.time()
+    answers = ask_concurrently(chatbot, ["What are his skills?"] * callers, timeout=25)
+    print(f"   {callers} identical questions answered in {time.time() - started:.2f}s")
+    assert not [answer for answer in answers if isinstance(answer, Exception)]
+    assert len(set(answers)) == 1
+    assert chatbot.inflight.stats()['upstream_calls'] == 1
+
+    started = time.time()
+    answers = ask_concurrently(chatbot, [f"distinct question {n}" for n in range(callers)], timeout=25)
+    print(f"   {callers} distinct questions answered in {time.time() - started:.2f}s")
+    assert not [answer for answer in answers if isinstance(answer, Exception)]
+    assert chatbot.get_deadline_stats()['overflows'] == 0
+    print("   ✅ No request was refused while its call was within the deadline")
+
+
+def test_overdue_calls_are_capped():
+    """Once max_overdue_calls calls run past their deadline, new requests with a deadline are refused."""
+    chatbot = slow_chatbot(1.0, max_overdue_calls=2)
+
+    answers = ask_concurrently(chatbot, ["first slow question", "second slow question"], timeout=0.1)
+    assert all(isinstance(answer, AnswerTimeout) for answer in answers)
+    assert chatbot.get_deadline_stats()['overdue_calls'] == 2
+
+    started = time.time()
+    try:
+        chatbot.ask("third question", timeout=25)
+    except AnswerTimeout:
+        pass
+    else:
+        raise AssertionError("a request was admitted while the overdue cap was reached")
+    assert time.time() - started < 0.5
+    assert chatbot.get_deadline_stats()['overflows'] == 1
+
+    # The cap frees up as the overdue calls finish
+    time.sleep(1.5)
+    assert chatbot.get_deadline_stats()['overdue_calls'] == 0
+    assert chatbot.ask("third question", timeout=25).startswith("[model-")
+
+
+
+def test_queued_primary_is_not_hedged():
+    """Time a call spends waiting for a pool thread does not count towards its hedge delay."""
+    chatbot = slow_chatbot(0.05, hedge_percentile=0.5, hedge_min_samples=1,
+                           request_threads=1, max_overdue_calls=0)
+    for model in chatbot.router.models:
+        chatbot.router.record_success(model, latency=0.3)
+
+    # Keep every hedge pool thread busy for longer than the hedge delay
+    busy = [chatbot._hedge_executor.submit(time.sleep, 0.6) for _ in range(chatbot._hedge_executor._max_workers)]
+    assert chatbot.ask("queued question").startswith("[model-a]")
+    for future in busy:
+        future.result()
+
+    stats = chatbot.get_hedge_stats()
+    assert stats['eligible_requests'] == 1
+    assert stats['hedged_requests'] == 0
+
+
+if __name__ == "__main__":
+    import sys
+    import pytest
+    sys.exit(pytest.main([__file__, "-q", "-s"]))
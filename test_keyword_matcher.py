@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the fallback keyword matcher
+Checks how overlapping keywords, word boundaries and shared keywords are
+scored, and when runner-up categories are combined with the best one.
+"""
+
+import pytest
+
+from keyword_matcher import KeywordMatcher
+
+
+def test_nested_keywords_count_once():
+    """A keyword inside a longer keyword's hit adds nothing, so plurals are not counted twice."""
+    matcher = KeywordMatcher({'hobbies': ['hobby', 'hobbies'], 'skills': ['tech', 'technology']})
+
+    assert matcher.scores("hobbies") == {'hobbies': 1.0}
+    assert matcher.scores("hobby") == {'hobbies': 1.0}
+    assert matcher.scores("technology and tech") == {'skills': 2.0}
+
+
+def test_overlapping_keywords_both_count():
+    """Keywords that overlap without one containing the other are both hits."""
+    matcher = KeywordMatcher({'a': ['abc'], 'b': ['cde']})
+
+    assert matcher.scores("abcde") == {'a': 1.0, 'b': 0.5}
+
+
+def test_shared_keyword_splits_its_weight():
+    """A keyword listed by two categories gives each half its weight."""
+    matcher = KeywordMatcher({'projects': ['work', 'project'], 'career': ['work', 'career']})
+
+    assert matcher.scores("work") == {'projects': 0.5, 'career': 0.5}
+    assert matcher.match("project work") == ['projects']
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("Does he know java?", ['java']),
+    ("Does he know javascript?", ['javascript']),
+    ("Java or JavaScript?", ['java', 'javascript'])
+])
+def test_longer_keyword_wins_at_a_word(question, expected):
+    """"java" does not match a question about "javascript" once "javascript" is a keyword itself."""
+    matcher = KeywordMatcher({'java': ['java'], 'javascript': ['javascript']})
+
+    assert matcher.match(question) == expected
+
+
+def test_mid_word_hit_counts_less():
+    """A hit that starts inside a word scores mid_word_factor; one that only ends inside a word scores fully."""
+    matcher = KeywordMatcher({'background': ['who'], 'projects': ['project']}, mid_word_factor=0.25)
+
+    assert matcher.scores("somewhowever") == {'background': 0.25}
+    assert matcher.scores("whole projects") == {'background': 1.0, 'projects': 1.0}
+
+
+def test_runner_up_is_combined_within_ratio():
+    """Categories scoring at least combine_ratio of the best are returned, best first, up to max_categories."""
+    matcher = KeywordMatcher({'a': ['alpha'], 'b': ['beta'], 'c': ['gamma']}, weights={'beta': 0.8, 'gamma': 0.5})
+
+    assert matcher.match("gamma beta alpha") == ['a', 'b']
+    assert matcher.match("gamma beta alpha", combine_ratio=0.4, max_categories=3) == ['a', 'b', 'c']
+    assert matcher.match("gamma beta alpha", combine_ratio=0.9) == ['a']
+    assert matcher.match("nothing relevant") == []
+
+
+def test_ties_go_to_the_earlier_category():
+    """Equal scores are ranked in the order the categories were given."""
+    matcher = KeywordMatcher({'first': ['one'], 'second': ['two']})
+
+    assert matcher.match("two one") == ['first', 'second']
+    assert matcher.match("two one", max_categories=1) == ['first']
+
+
+def test_phrase_keywords_scan_the_whole_question():
+    """Keywords with spaces are matched across words (without the per-word cache)."""
+    matcher = KeywordMatcher({'ml': ['machine learning'], 'web': ['web']})
+
+    assert matcher.match("Machine Learning and web projects") == ['ml', 'web']
+    assert matcher.scores("machine and learning") == {}
+
+
+def test_word_cache_is_bounded():
+    """The per-word score cache is cleared instead of growing past word_cache_size."""
+    matcher = KeywordMatcher({'a': ['alpha']}, word_cache_size=2)
+
+    for question in ("one two", "three alpha", "alpha four five"):
+        assert matcher.scores(question) == ({'a': 1.0} if 'alpha' in question else {})
+        assert len(matcher._word_scores) <= 2
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
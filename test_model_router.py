@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for model routing
+Checks that the preferred model follows availability right away but only
+moves to a faster model after the dwell time and by a clear margin.
+"""
+
+import pytest
+
+from model_router import ModelRouter
+
+
+def router_with_changes(**kwargs):
+    """Router over two models that records every preferred-model change."""
+    changes = []
+    router = ModelRouter(["model-a", "model-b"], priority_penalty=0,
+                         on_change=lambda old, new: changes.append((old, new)), **kwargs)
+    return router, changes
+
+
+def test_one_slow_call_does_not_switch():
+    """A faster model does not take over before the dwell time has passed."""
+    router, changes = router_with_changes(min_dwell=60)
+    router.record_success("model-b", latency=0.1)
+    router.record_success("model-a", latency=5.0)
+
+    assert router.ranked()[0] == "model-b"
+    assert router.preferred() == "model-a"
+    assert changes == []
+
+
+@pytest.mark.parametrize("latency_b, switches", [(0.9, False), (0.5, True)])
+def test_switch_needs_margin(latency_b, switches):
+    """After the dwell time the faster model only takes over if it is faster by the margin."""
+    router, changes = router_with_changes(min_dwell=0, switch_margin=0.2)
+    router.record_success("model-a", latency=1.0)
+    router.record_success("model-b", latency=latency_b)
+
+    assert router.preferred() == ("model-b" if switches else "model-a")
+    assert changes == ([("model-a", "model-b")] if switches else [])
+
+
+def test_unavailable_model_switches_at_once():
+    """An open breaker moves the preferred model immediately, whatever the dwell time."""
+    router, changes = router_with_changes(min_dwell=60)
+    router.record_failure("model-a", cooldown=30)
+
+    assert router.preferred() == "model-b"
+    assert changes == [("model-a", "model-b")]
+    assert not router.is_available("model-a")
+
+    router.reset()
+    assert router.preferred() == "model-a"
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent state store
+Checks that cached answers and circuit breaker cooldowns survive a
+restart, and that compaction only drops expired and surplus answers.
+"""
+
+import time
+
+import pytest
+
+from model_router import ModelRouter
+from portfolio_chatbot import PortfolioChatbot
+from state_store import StateStore
+
+MODELS = ["gemma2-9b-it", "compound-beta-mini"]
+
+
+def fake_chatbot(store_path):
+    """Chatbot on the fake backend that answers instantly and keeps its state in store_path."""
+    options = {'': {'latency': 0, 'distribution': 'fixed', 'tokens_per_second': 0}}
+    return PortfolioChatbot(llm_backend='fake', fake_llm_options=options, models=MODELS,
+                            use_retrieval=False, store_path=store_path)
+
+
+def test_answers_survive_a_reopen(tmp_path):
+    """Answers written before the store was closed are loaded and readable after reopening it."""
+    store = StateStore(str(tmp_path / "state.db"))
+    store.save_answer("what are his skills", "model-a", "Python and Java", stored_at=1000.0)
+    store.close()
+
+    reopened = StateStore(str(tmp_path / "state.db"), ttl=0)
+    try:
+        assert reopened.load_answers() == [("what are his skills", "model-a", "Python and Java", 1000.0)]
+        assert reopened.get_answer("what are his skills", "model-a") == ("Python and Java", 1000.0)
+        assert reopened.get_answer("what are his skills", "model-b") is None
+    finally:
+        reopened.close()
+
+
+def test_restarted_chatbot_serves_cached_answers_and_keeps_cooldowns(tmp_path):
+    """After a restart the answer comes from the store and a cooling-down model stays skipped until the same time."""
+    path = str(tmp_path / "state.db")
+    chatbot = fake_chatbot(path)
+    answer = chatbot.ask("What are his skills?")
+    chatbot._record_failure(MODELS[1], Exception("Error code: 429 - Rate limit reached. Please try again in 60s."))
+    open_until = chatbot.router.snapshot()[MODELS[1]]['open_until']
+    chatbot.store.close()
+
+    restarted = fake_chatbot(path)
+    try:
+        assert restarted.ask("What are his skills?") == answer
+        assert sum(stats['requests'] for stats in restarted.get_usage_stats().values()) == 0
+        assert not restarted.router.is_available(MODELS[1])
+        assert restarted.router.snapshot()[MODELS[1]]['open_until'] == open_until
+    finally:
+        restarted.store.close()
+
+
+def test_router_state_round_trips_through_the_store(tmp_path):
+    """An open breaker is restored with its open_until; one whose cooldown already ended comes back closed."""
+    router = ModelRouter(["model-a", "model-b", "model-c"])
+    router.record_failure("model-a", cooldown=60)
+    router.record_failure("model-b", cooldown=0.05)
+    router.record_success("model-c", latency=0.4)
+
+    store = StateStore(str(tmp_path / "state.db"))
+    store.save_state('router', router.snapshot())
+    store.close()
+    time.sleep(0.1)
+
+    reopened = StateStore(str(tmp_path / "state.db"))
+    restored = ModelRouter(["model-a", "model-b", "model-c"])
+    try:
+        restored.restore(reopened.load_state('router'))
+    finally:
+        reopened.close()
+
+    snapshot = restored.snapshot()
+    assert snapshot["model-a"]['state'] == 'open'
+    assert snapshot["model-a"]['open_until'] == router.snapshot()["model-a"]['open_until']
+    assert snapshot["model-b"]['state'] == 'closed'
+    assert restored.is_available("model-b")
+    assert snapshot["model-c"]['latency'] == pytest.approx(router.latency["model-c"])
+    assert restored.preferred() != "model-a"
+
+
+def test_compaction_keeps_the_newest_answers_intact(tmp_path):
+    """Compaction drops expired and surplus rows; the answers it keeps are unchanged, also after a reopen."""
+    path = str(tmp_path / "state.db")
+    store = StateStore(path, max_entries=3, ttl=3600, compact_slack=10)
+    now = time.time()
+    store.save_answer("expired question", "model-a", "old", stored_at=now - 7200)
+    long_answer = "A long answer. " * 500
+    for n in range(5):
+        store.save_answer(f"question {n}", "model-a", f"{long_answer}{n}", stored_at=now - 50 + n)
+    store.compact()
+
+    kept = [(question, answer) for question, _, answer, _ in store.load_answers(limit=100)]
+    assert kept == [(f"question {n}", f"{long_answer}{n}") for n in (2, 3, 4)]
+    assert store.compactions == 1 and store.rows_compacted == 3
+    store.close()
+
+    reopened = StateStore(path, max_entries=3)
+    try:
+        assert reopened.get_answer("question 4", "model-a")[0] == f"{long_answer}4"
+        assert reopened.get_answer("question 0", "model-a") is None
+    finally:
+        reopened.close()
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,164 @@
+"""
+Request tracing for Abhishek Ambi's Portfolio Chatbot
+Records how long each stage of a request took (parsing, cache lookup,
+prompt building, upstream calls, serialization) so the stages can be sent
+back in a Server-Timing header and optionally logged as JSON records.
+"""
+
+import contextvars
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+# The trace of the request being handled; code without a trace records nothing
+_current: "contextvars.ContextVar[Optional[Trace]]" = contextvars.ContextVar('trace', default=None)
+
+
+class Span:
+    """One timed stage of a request."""
+
+    __slots__ = ('name', 'start', 'duration', 'description')
+
+    def __init__(self, name: str, start: float, duration: float, description: Optional[str] = None):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.description = description
+
+
+class Trace:
+    """
+    Spans recorded for one request.
+
+    Spans may be added from other threads (upstream calls run on worker
+    pools) and may nest: an 'answer' span contains the 'upstream' spans of
+    the calls made for it.
+    """
+
+    def __init__(self, name: str):
+        """
+        Start a trace.
+
+        Args:
+            name: What is being traced (e.g. the route)
+        """
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, duration: float, description: Optional[str] = None, start: Optional[float] = None):
+        """Record a stage that took ``duration`` seconds."""
+        if start is None:
+            start = time.perf_counter() - duration
+        with self._lock:
+            self.spans.append(Span(name, start - self.started, duration, description))
+
+    @contextmanager
+    def span(self, name: str, description: Optional[str] = None) -> Iterator[None]:
+        """Time the enclosed block as a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, description, start)
+
+    def elapsed(self) -> float:
+        """Seconds since the trace started."""
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """
+        Format the spans as a Server-Timing header value.
+
+        Returns:
+            e.g. 'parse;dur=0.21, upstream;dur=812.4;desc="gemma2-9b-it", total;dur=815.3'
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        entries = []
+        for span in spans:
+            entry = f"{span.name};dur={span.duration * 1000:.2f}"
+            if span.description:
+                entry += ';desc="' + span.description.replace('\\', '').replace('"', "'") + '"'
+            entries.append(entry)
+        entries.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(entries)
+
+    def record(self, **fields: Any) -> Dict[str, Any]:
+        """
+        Build a structured trace record.
+
+        Args:
+            **fields: Extra fields to include (e.g. status, response_source)
+
+        Returns:
+            JSON-serializable record with the total and every span in milliseconds
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        return {
+            'trace': self.name,
+            'timestamp': time.time(),
+            'total_ms': round(self.elapsed() * 1000, 3),
+            **fields,
+            'spans': [{
+                'name': span.name,
+                'start_ms': round(span.start * 1000, 3),
+                'duration_ms': round(span.duration * 1000, 3),
+                **({'description': span.description} if span.description else {})
+            } for span in spans]
+        }
+
+
+def start_trace(name: str) -> contextvars.Token:
+    """
+    Make a new trace current for this thread or task.
+
+    Returns:
+        Token to pass to ``end_trace``
+    """
+    return _current.set(Trace(name))
+
+
+def end_trace(token: contextvars.Token):
+    """Restore whatever trace was current before ``start_trace``."""
+    _current.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    """The trace of the request being handled, if any."""
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, description: Optional[str] = None) -> Iterator[None]:
+    """Time the enclosed block as a stage of the current trace (does nothing without one)."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(name, description):
+        yield
+
+
+def bind(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Carry the current trace into work submitted to another thread.
+
+    Thread pools do not copy context variables, so ``pool.submit(bind(fn))``
+    is needed for spans recorded by ``fn`` to reach the request's trace.
+    """
+    if _current.get() is None:
+        return fn
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def log_record(record: Dict[str, Any]):
+    """Write a trace record as one JSON line on stdout."""
+    print(json.dumps(record, separators=(',', ':')), flush=True)
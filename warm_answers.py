@@ -0,0 +1,147 @@
+"""
+Warm answer store for Abhishek Ambi's Portfolio Chatbot
+Precomputes the answers to the fixed helper prompts so they can be
+served instantly, and keeps them fresh in the background.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, Tuple
+
+from answer_cache import normalize_question
+
+
+class WarmAnswerStore:
+    """
+    Precomputed answers for a fixed set of named prompts.
+
+    Answers are computed in parallel, looked up in O(1) by normalized
+    question plus the model that produced them (like the answer caches),
+    and refreshed by a background thread on a schedule or whenever a
+    refresh is requested (for example after the model in use failed).
+    """
+
+    def __init__(self, prompts: Dict[str, str], compute: Callable[[str], Tuple[str, str]],
+                 refresh_interval: float = 1800, max_workers: int = 4):
+        """
+        Initialize the warm answer store.
+
+        Args:
+            prompts: Mapping of prompt name to the fixed question text
+            compute: Function producing (answer, model) for a question (raises on failure)
+            refresh_interval: Seconds between background refreshes
+            max_workers: Maximum number of prompts computed in parallel
+        """
+        self.prompts = dict(prompts)
+        self.compute = compute
+        self.refresh_interval = refresh_interval
+        self.max_workers = max_workers
+
+        # (normalized question, model) -> (answer, computed_at); replaced wholesale on refresh
+        self._answers: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._refresh_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._warm_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh_time: Optional[float] = None
+
+    def get(self, question: str, model: str) -> Optional[str]:
+        """
+        Get the precomputed answer for a question.
+
+        Args:
+            question: The user's question
+            model: The model the answer must have come from
+
+        Returns:
+            The warm answer, or None if the question is not a prompt warmed with that model
+        """
+        entry = self._answers.get((normalize_question(question), model))
+        if entry is None:
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def warm(self) -> int:
+        """
+        Compute every prompt in parallel and publish the results.
+
+        Prompts that fail keep their previous answer, if any.
+
+        Returns:
+            Number of prompts computed successfully
+        """
+        with self._warm_lock:
+            questions = list(self.prompts.values())
+            workers = max(1, min(self.max_workers, len(questions)))
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {question: executor.submit(self.compute, question) for question in questions}
+
+            answers = dict(self._answers)
+            computed = 0
+            for question, future in futures.items():
+                try:
+                    answer, model = future.result()
+                    answers[(normalize_question(question), model)] = (answer, time.time())
+                    computed += 1
+                except Exception as e:
+                    self.failures += 1
+                    print(f"⚠️ Could not warm answer for '{question}': {e}")
+
+            self._answers = answers
+            self.refreshes += 1
+            self.last_refresh_time = time.time()
+            return computed
+
+    def start(self):
+        """Warm all prompts in a background thread and keep refreshing them."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._refresh_event.clear()
+        self._thread = threading.Thread(target=self._run, name="warm-answers", daemon=True)
+        self._thread.start()
+
+    def request_refresh(self):
+        """Ask the background thread to recompute all answers now."""
+        self._refresh_event.set()
+
+    def stop(self):
+        """Stop the background refresh thread."""
+        self._stop_event.set()
+        self._refresh_event.set()
+
+    def _run(self):
+        """Background loop: warm, then wait for the interval or a refresh request."""
+        while not self._stop_event.is_set():
+            computed = self.warm()
+            print(f"🔥 Warmed {computed}/{len(self.prompts)} canned answers")
+
+            self._refresh_event.wait(timeout=self.refresh_interval)
+            self._refresh_event.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get warm store statistics.
+
+        Returns:
+            Number of warmed prompts, hits, refreshes and last refresh age
+        """
+        return {
+            'prompts': len(self.prompts),
+            'warmed': len(self._answers),
+            'hits': self.hits,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'refresh_interval_seconds': self.refresh_interval,
+            'running': bool(self._thread and self._thread.is_alive()),
+            'last_refresh_age_seconds': (round(time.time() - self.last_refresh_time)
+                                         if self.last_refresh_time else None)
+        }